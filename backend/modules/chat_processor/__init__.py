@@ -7,9 +7,9 @@ Supports: ChatGPT, Claude, Gemini, Perplexity, DeepSeek.
 Usage:
     from modules.chat_processor import router          # FastAPI router
     from modules.chat_processor import parse_conversation, detect_platform
-    from modules.chat_processor import analyze_conversation
+    from modules.chat_processor import analyze_conversation, AsyncAnalyzer
 """
-from .analyzer import analyze_conversation
+from .analyzer import AsyncAnalyzer, analyze_conversation
 from .platforms import PLATFORM_REGISTRY, detect_platform, parse_conversation
 from .router import router
 
@@ -18,5 +18,6 @@ __all__ = [
     "parse_conversation",
     "detect_platform",
     "analyze_conversation",
+    "AsyncAnalyzer",
     "PLATFORM_REGISTRY",
 ]
@@ -0,0 +1,161 @@
+"""Background analysis queue - decouples ingest latency from LLM latency."""
+import asyncio
+import dataclasses
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from .analyzer import DEFAULT_MODEL, PROMPT_VERSION, AsyncAnalyzer, content_hash
+from .models import ParsedConversation
+from .storage import StorageEngine
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisQueue:
+    """Bounded queue of conversations awaiting LLM analysis.
+
+    Ingest enqueues and returns immediately; worker tasks on the event
+    loop run AsyncAnalyzer.analyze and persist the intelligence. Results
+    are cached by (content hash, model, PROMPT_VERSION), so re-ingested
+    content reuses its analysis without calling the provider. Status is
+    tracked per conversation for the most recent max_tracked entries.
+    """
+
+    def __init__(
+        self,
+        analyzer: AsyncAnalyzer,
+        storage: StorageEngine,
+        workers: int = 4,
+        maxsize: int = 1000,
+        max_tracked: int = 10_000,
+    ):
+        self.analyzer = analyzer
+        self.storage = storage
+        self.workers = workers
+        self.maxsize = maxsize
+        self.max_tracked = max_tracked
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._status: "OrderedDict[str, str]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Provider calls in flight per cache key, so identical content
+        # queued concurrently is analyzed once
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [
+            loop.create_task(self._worker(), name=f"chat-analysis-{i}")
+            for i in range(self.workers)
+        ]
+
+    def _set_status(self, conversation_id: str, status: str) -> None:
+        self._status[conversation_id] = status
+        self._status.move_to_end(conversation_id)
+        while len(self._status) > self.max_tracked:
+            self._status.popitem(last=False)
+
+    def enqueue(
+        self, conversation: ParsedConversation, model: str = DEFAULT_MODEL
+    ) -> str:
+        """Queue a conversation for analysis. Must be called on the event loop.
+
+        Returns "queued", "disabled" (no API key) or "queue_full".
+        """
+        if not self.analyzer.enabled:
+            return "disabled"
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((conversation, model))
+        except asyncio.QueueFull:
+            return "queue_full"
+        self._set_status(conversation.conversation_id, "queued")
+        return "queued"
+
+    def status(self, conversation_id: str) -> Optional[str]:
+        return self._status.get(conversation_id)
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.analyzer.enabled,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "maxsize": self.maxsize,
+            "workers": self.workers,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        while True:
+            conversation, model = await queue.get()
+            cid = conversation.conversation_id
+            try:
+                self._set_status(cid, "running")
+                cache_key = (content_hash(conversation), model, PROMPT_VERSION)
+                intel = await asyncio.to_thread(
+                    self.storage.get_cached_intelligence,
+                    cache_key, cid, conversation.platform,
+                )
+                if intel is not None:
+                    self.cache_hits += 1
+                    await asyncio.to_thread(self.storage.save_intelligence, intel)
+                    self._set_status(cid, "done")
+                    continue
+                pending = self._inflight.get(cache_key)
+                if pending is not None:
+                    intel = await asyncio.shield(pending)
+                    if intel is not None:
+                        self.cache_hits += 1
+                        intel = dataclasses.replace(
+                            intel,
+                            conversation_id=cid,
+                            platform=conversation.platform,
+                            tokens_used=0,
+                        )
+                        await asyncio.to_thread(self.storage.save_intelligence, intel)
+                        self._set_status(cid, "done")
+                        continue
+                self.cache_misses += 1
+                future = asyncio.get_running_loop().create_future()
+                self._inflight[cache_key] = future
+                try:
+                    intel = await self.analyzer.analyze(conversation, model)
+                    if intel is not None:
+                        # Why: a partial result (e.g. a window hit a 429)
+                        # must not become a permanent cache hit
+                        await asyncio.to_thread(
+                            self.storage.save_intelligence,
+                            intel,
+                            cache_key if intel.complete else None,
+                        )
+                finally:
+                    del self._inflight[cache_key]
+                    if not future.done():
+                        future.set_result(intel)
+                self._set_status(cid, "done" if intel is not None else "failed")
+            except Exception:
+                logger.exception("Analysis of %s failed", cid)
+                self._set_status(cid, "failed")
+            finally:
+                queue.task_done()
+
+    async def join(self) -> None:
+        """Wait until every queued conversation has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+        await self.analyzer.aclose()
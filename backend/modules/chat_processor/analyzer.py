@@ -1,13 +1,46 @@
 """Conversation Analysis Layer - OpenRouter LLM intelligence extraction."""
+import asyncio
 import json
 import os
 import logging
-from typing import Optional
+import random
+from typing import Any, Dict, List, Optional
 
+import httpx
 import requests
 
 from .models import ConversationIntelligence, ParsedConversation
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "google/gemini-2.5-flash"
+
+# Overridable so tests can point the analyzer at scripts/openrouter_stub.py
+OPENROUTER_BASE_URL = os.getenv(
+    "OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"
+).rstrip("/")
+
+# Bump whenever _SYSTEM_PROMPT or build_prompt changes: cached analyses
+# are keyed by it, so older results stop being reused
+PROMPT_VERSION = "2"
+
+# Rough chars-per-token for budgeting windows without a tokenizer
+_CHARS_PER_TOKEN = 4
+
+DEFAULT_WINDOW_TOKENS = 6000
+
+# Caps on merged list fields, so the reduce step stays a summary
+_MERGE_LIMITS = {
+    "main_topics": 15,
+    "technologies_mentioned": 30,
+    "decisions_made": 30,
+    "code_artifacts": 30,
+    "knowledge_extracted": 40,
+}
+
+# Responses worth retrying; anything else fails immediately
+_RETRY_STATUS = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+
 
 _SYSTEM_PROMPT = """Eres un analista experto en extraer inteligencia de conversaciones AI.
 Analiza la conversacion y devuelve SOLO JSON con este formato exacto:
@@ -23,17 +56,18 @@ Analiza la conversacion y devuelve SOLO JSON con este formato exacto:
 }"""
 
 
-def analyze_conversation(
-    conversation: ParsedConversation,
-    api_key: Optional[str] = None,
-    model: str = "google/gemini-2.5-flash",
-) -> Optional[ConversationIntelligence]:
-    """Analyze a parsed conversation and return structured intelligence."""
-    if api_key is None:
-        api_key = os.getenv("OPENROUTER_API_KEY", "")
-    if not api_key:
-        return None
+def content_hash(conversation: ParsedConversation) -> str:
+    """Analysis cache key: the conversation's content fingerprint.
 
+    Same normalization as deduplication (see models.message_hash), so
+    re-exports that differ only in ids, titles, timestamps or formatting
+    whitespace hash the same.
+    """
+    return conversation.fingerprint()
+
+
+def build_prompt(conversation: ParsedConversation) -> Optional[str]:
+    """User prompt for a conversation, or None if it is too short to analyze."""
     lines = []
     for msg in conversation.messages[:60]:
         role_label = "USUARIO" if msg.role == "user" else "ASISTENTE"
@@ -44,47 +78,375 @@ def analyze_conversation(
         return None
 
     title = conversation.title or "Sin titulo"
-    prompt = (
+    return (
         f"PLATAFORMA: {conversation.platform}" + chr(10)
         + f"TITULO: {title}" + chr(10)
         + f"MENSAJES: {len(conversation.messages)}" + chr(10) + chr(10)
         + "CONVERSACION:" + chr(10) + conv_text[:12000]
     )
 
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+def _message_lines(conversation: ParsedConversation) -> List[str]:
+    return [
+        f"{'USUARIO' if msg.role == 'user' else 'ASISTENTE'}: {msg.content}"
+        for msg in conversation.messages
+    ]
+
+
+def split_windows(lines: List[str], max_tokens: int) -> List[List[str]]:
+    """Group consecutive message lines into windows of at most max_tokens.
+
+    A single message longer than a window is cut into window-sized parts.
+    """
+    max_chars = max_tokens * _CHARS_PER_TOKEN
+    windows: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    for line in lines:
+        parts = [line[i:i + max_chars] for i in range(0, len(line), max_chars)] or [""]
+        for part in parts:
+            if current and size + len(part) > max_chars:
+                windows.append(current)
+                current, size = [], 0
+            current.append(part)
+            size += len(part) + 1
+    if current:
+        windows.append(current)
+    return windows
+
+
+def build_window_prompt(
+    conversation: ParsedConversation, window: List[str], index: int, total: int
+) -> str:
+    """User prompt for one window of a conversation analyzed in parts."""
+    title = conversation.title or "Sin titulo"
+    header = (
+        f"PLATAFORMA: {conversation.platform}" + chr(10)
+        + f"TITULO: {title}" + chr(10)
+        + f"MENSAJES: {len(conversation.messages)}" + chr(10)
+    )
+    if total > 1:
+        header += f"FRAGMENTO: {index + 1} de {total}" + chr(10)
+    return header + chr(10) + "CONVERSACION:" + chr(10) + chr(10).join(window)
+
+
+def _merge_unique(values: List[Any], key=None) -> List[Any]:
+    """Order-preserving union, ranked by how many windows mention a value."""
+    counts: Dict[Any, int] = {}
+    first: Dict[Any, Any] = {}
+    for value in values:
+        k = key(value) if key else (value.strip().lower() if isinstance(value, str) else value)
+        if k in ("", None):
+            continue
+        if k not in first:
+            first[k] = value
+        counts[k] = counts.get(k, 0) + 1
+    order = {k: i for i, k in enumerate(first)}
+    ranked = sorted(first, key=lambda k: (-counts[k], order[k]))
+    return [first[k] for k in ranked]
+
+
+def merge_results(results: List[Dict]) -> Dict:
+    """Reduce per-window analyses into one, deterministically and without an LLM.
+
+    List fields are unioned (case-insensitive) and ranked by how many
+    windows mention each item; summaries are concatenated in window order.
+    """
+    merged: Dict[str, Any] = {}
+    for field_name in ("main_topics", "technologies_mentioned",
+                       "decisions_made", "knowledge_extracted"):
+        values = [v for r in results for v in r.get(field_name) or []
+                  if isinstance(v, str)]
+        merged[field_name] = _merge_unique(values)[:_MERGE_LIMITS[field_name]]
+    artifacts = [a for r in results for a in r.get("code_artifacts") or []
+                 if isinstance(a, dict)]
+    merged["code_artifacts"] = _merge_unique(
+        artifacts,
+        key=lambda a: (str(a.get("language", "")).lower(),
+                       str(a.get("description", "")).strip().lower()),
+    )[:_MERGE_LIMITS["code_artifacts"]]
+    merged["summary"] = " ".join(
+        _merge_unique([r.get("summary") or "" for r in results])
+    )
+    merged["osint_relevance"] = " | ".join(
+        _merge_unique([r.get("osint_relevance") or "" for r in results])
+    )
+    return merged
+
+
+def _tokens_used(data: Dict, prompt: str) -> int:
+    usage = data.get("usage") or {}
+    total = usage.get("total_tokens")
+    if isinstance(total, int) and total > 0:
+        return total
+    content = data["choices"][0]["message"].get("content") or ""
+    return estimate_tokens(_SYSTEM_PROMPT + prompt) + estimate_tokens(content)
+
+
+def _request_body(prompt: str, model: str) -> Dict:
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ],
+        "temperature": 0.1,
+        "max_tokens": 2000,
+        "response_format": {"type": "json_object"},
+    }
+
+
+def _result_from_response(data: Dict) -> Dict:
+    result = json.loads(data["choices"][0]["message"]["content"])
+    if not isinstance(result, dict):
+        raise ValueError("analysis response is not a JSON object")
+    return result
+
+
+def _intelligence_from_result(
+    conversation: ParsedConversation,
+    result: Dict,
+    tokens_used: int = 0,
+    complete: bool = True,
+) -> ConversationIntelligence:
+    return ConversationIntelligence(
+        conversation_id=conversation.conversation_id,
+        platform=conversation.platform,
+        main_topics=result.get("main_topics", []),
+        technologies_mentioned=result.get("technologies_mentioned", []),
+        decisions_made=result.get("decisions_made", []),
+        code_artifacts=result.get("code_artifacts", []),
+        knowledge_extracted=result.get("knowledge_extracted", []),
+        osint_relevance=result.get("osint_relevance", ""),
+        summary=result.get("summary", ""),
+        tokens_used=tokens_used,
+        complete=complete,
+    )
+
+
+def analyze_conversation(
+    conversation: ParsedConversation,
+    api_key: Optional[str] = None,
+    model: str = DEFAULT_MODEL,
+) -> Optional[ConversationIntelligence]:
+    """Analyze a parsed conversation and return structured intelligence.
+
+    Blocking; async callers should use AsyncAnalyzer instead.
+    """
+    if api_key is None:
+        api_key = os.getenv("OPENROUTER_API_KEY", "")
+    if not api_key:
+        return None
+
+    prompt = build_prompt(conversation)
+    if prompt is None:
+        return None
+
     try:
         resp = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
+            f"{OPENROUTER_BASE_URL}/chat/completions",
             headers={
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json",
             },
-            json={
-                "model": model,
-                "messages": [
-                    {"role": "system", "content": _SYSTEM_PROMPT},
-                    {"role": "user", "content": prompt},
-                ],
-                "temperature": 0.1,
-                "max_tokens": 2000,
-                "response_format": {"type": "json_object"},
-            },
+            json=_request_body(prompt, model),
             timeout=60,
         )
         resp.raise_for_status()
         data = resp.json()
-        raw = data["choices"][0]["message"]["content"]
-        result = json.loads(raw)
-        return ConversationIntelligence(
-            conversation_id=conversation.conversation_id,
-            platform=conversation.platform,
-            main_topics=result.get("main_topics", []),
-            technologies_mentioned=result.get("technologies_mentioned", []),
-            decisions_made=result.get("decisions_made", []),
-            code_artifacts=result.get("code_artifacts", []),
-            knowledge_extracted=result.get("knowledge_extracted", []),
-            osint_relevance=result.get("osint_relevance", ""),
-            summary=result.get("summary", ""),
+        return _intelligence_from_result(
+            conversation, _result_from_response(data), _tokens_used(data, prompt)
         )
     except Exception as exc:
-        logging.getLogger(__name__).warning("Conversation analysis failed: %s", exc)
+        logger.warning("Conversation analysis failed: %s", exc)
         return None
+
+
+class AsyncAnalyzer:
+    """Non-blocking analyzer sharing one keep-alive HTTP client.
+
+    At most max_concurrency requests are in flight overall and at most
+    per_model_concurrency per model. Conversations longer than
+    window_tokens are analyzed map-reduce style: token-bounded windows are
+    analyzed concurrently (at most map_concurrency per conversation) and
+    merged by merge_results. Transport errors and retryable
+    statuses (429, 5xx) are retried with full-jitter exponential backoff,
+    honouring Retry-After when the server sends one.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        max_concurrency: int = 8,
+        per_model_concurrency: int = 4,
+        max_retries: int = 3,
+        backoff_base_s: float = 0.5,
+        backoff_max_s: float = 8.0,
+        timeout_s: float = 60.0,
+        window_tokens: int = DEFAULT_WINDOW_TOKENS,
+        map_concurrency: int = 4,
+        max_windows: int = 64,
+    ):
+        if max_concurrency < 1 or per_model_concurrency < 1:
+            raise ValueError("concurrency limits must be >= 1")
+        self.api_key = (
+            api_key if api_key is not None else os.getenv("OPENROUTER_API_KEY", "")
+        )
+        self.base_url = (base_url or OPENROUTER_BASE_URL).rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.per_model_concurrency = per_model_concurrency
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.timeout_s = timeout_s
+        self.window_tokens = window_tokens
+        self.map_concurrency = map_concurrency
+        self.max_windows = max_windows
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._global_sem: Optional[asyncio.Semaphore] = None
+        self._model_sems: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    def _bind_loop(self) -> None:
+        # Why: the client and semaphores belong to one event loop; rebuild
+        # them if we are now running on a different one
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            timeout=self.timeout_s,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+        )
+        self._global_sem = asyncio.Semaphore(self.max_concurrency)
+        self._model_sems = {}
+
+    def _model_sem(self, model: str) -> asyncio.Semaphore:
+        sem = self._model_sems.get(model)
+        if sem is None:
+            sem = self._model_sems[model] = asyncio.Semaphore(
+                self.per_model_concurrency
+            )
+        return sem
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max_s)
+            except ValueError:
+                pass
+        cap = min(self.backoff_max_s, self.backoff_base_s * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    async def complete(self, prompt: str, model: str = DEFAULT_MODEL) -> Dict:
+        """POST a chat completion, retrying transient failures.
+
+        Raises:
+            httpx.HTTPError: If the request still fails after max_retries.
+        """
+        self._bind_loop()
+        body = _request_body(prompt, model)
+        async with self._model_sem(model), self._global_sem:
+            attempt = 0
+            while True:
+                retry_after = None
+                try:
+                    resp = await self._client.post("/chat/completions", json=body)
+                    if resp.status_code not in _RETRY_STATUS:
+                        resp.raise_for_status()
+                        return resp.json()
+                    retry_after = resp.headers.get("Retry-After")
+                    error: Exception = httpx.HTTPStatusError(
+                        f"HTTP {resp.status_code}", request=resp.request, response=resp
+                    )
+                except httpx.TransportError as exc:
+                    error = exc
+                if attempt >= self.max_retries:
+                    raise error
+                delay = self._backoff(attempt, retry_after)
+                logger.info(
+                    "Analysis request failed (%s); retry %d/%d in %.2fs",
+                    error, attempt + 1, self.max_retries, delay,
+                )
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def analyze(
+        self, conversation: ParsedConversation, model: str = DEFAULT_MODEL
+    ) -> Optional[ConversationIntelligence]:
+        """Analyze the whole conversation, in windows if it is long.
+
+        Unlike analyze_conversation nothing is truncated, except that
+        more than max_windows windows are sampled. Failed windows are
+        skipped and the analysis fails only if every window fails; a
+        result missing windows (failed or sampled out) has
+        complete=False so callers do not cache it. tokens_used totals
+        the tokens of every provider call.
+        """
+        if not self.enabled:
+            return None
+        lines = _message_lines(conversation)
+        if sum(len(line) for line in lines) < 50:
+            return None
+        windows = split_windows(lines, self.window_tokens)
+        complete = len(windows) <= self.max_windows
+        if not complete:
+            # Why: bound the cost of pathological inputs; keep evenly
+            # spaced windows so the whole session is still represented
+            step = len(windows) / self.max_windows
+            windows = [windows[int(i * step)] for i in range(self.max_windows)]
+            logger.warning(
+                "Conversation %s needs more than %d windows; sampling",
+                conversation.conversation_id, self.max_windows,
+            )
+
+        limit = asyncio.Semaphore(self.map_concurrency)
+
+        async def analyze_window(index: int, window: List[str]):
+            prompt = build_window_prompt(conversation, window, index, len(windows))
+            async with limit:
+                data = await self.complete(prompt, model)
+            return _result_from_response(data), _tokens_used(data, prompt)
+
+        outcomes = await asyncio.gather(
+            *(analyze_window(i, w) for i, w in enumerate(windows)),
+            return_exceptions=True,
+        )
+        results, tokens = [], 0
+        for index, outcome in enumerate(outcomes):
+            if isinstance(outcome, asyncio.CancelledError):
+                # Why: shutdown, not a failed window
+                raise outcome
+            if isinstance(outcome, BaseException):
+                logger.warning(
+                    "Analysis of %s window %d/%d failed: %s",
+                    conversation.conversation_id, index + 1, len(windows), outcome,
+                )
+                complete = False
+                continue
+            results.append(outcome[0])
+            tokens += outcome[1]
+        if not results:
+            return None
+        result = results[0] if len(results) == 1 else merge_results(results)
+        return _intelligence_from_result(conversation, result, tokens, complete)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
@@ -0,0 +1,344 @@
+"""Bulk ingest of full platform exports (e.g. ChatGPT conversations.json)."""
+from __future__ import annotations
+import gzip
+import io
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional
+
+from ..chat_processors.json_stream import iter_json_items
+from .models import ParsedConversation
+from .platforms import PLATFORM_REGISTRY, detect_platform
+from .scan_service import ScanService
+from .storage import StorageEngine
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+_READ_CHUNK = 1024 * 1024
+_GZIP_MAGIC = b"\x1f\x8b"
+
+# Keys platform exports use for a conversation's own id
+_EXPORT_ID_KEYS = ("conversation_id", "id", "uuid")
+
+
+def iter_json_array(fp: IO[bytes], chunk_size: int = _READ_CHUNK) -> Iterator[Any]:
+    """Yield the items of a top-level JSON array without loading it whole.
+
+    A top-level object is yielded as a single item. Uses ijson when it is
+    installed, otherwise the strict chunked reader shared with the
+    Gemini exporter (modules/chat_processors/json_stream.py).
+    """
+    if ijson is not None and fp.seekable():
+        start = fp.tell()
+        head = fp.read(64).lstrip(b"\xef\xbb\xbf \t\r\n")
+        fp.seek(start)
+        prefix = "item" if head.startswith(b"[") else ""
+        yield from ijson.items(fp, prefix, use_float=True)
+        return
+    text = io.TextIOWrapper(fp, encoding="utf-8-sig")
+    try:
+        yield from iter_json_items(text, chunk_size)
+    finally:
+        # Why: closing the wrapper would close the caller's file
+        text.detach()
+
+
+def _export_id(item: Dict) -> Optional[str]:
+    for key in _EXPORT_ID_KEYS:
+        value = item.get(key)
+        if isinstance(value, str) and value:
+            return value
+    return None
+
+
+def parse_export_item(
+    item: Any, platform: str, source_url: Optional[str] = None
+) -> ParsedConversation:
+    """Parse one conversation object from a platform export.
+
+    The export's own conversation id is kept so re-importing the same
+    export updates rows instead of duplicating them.
+    """
+    conversation = PLATFORM_REGISTRY[platform].parse_fn(item, source_url)
+    if isinstance(item, dict):
+        export_id = _export_id(item)
+        if export_id:
+            conversation.conversation_id = export_id
+    return conversation
+
+
+@dataclass
+class BulkIngestJob:
+    job_id: str
+    platform: Optional[str]
+    batch_size: int
+    bytes_total: int = 0
+    status: str = "queued"  # queued, running, completed, failed
+    bytes_read: int = 0
+    processed: int = 0
+    ingested: int = 0
+    updated: int = 0
+    duplicates: int = 0
+    empty: int = 0
+    failed: int = 0
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # Per-conversation outcomes, appended as batches are written
+    results: List[Dict[str, Any]] = field(default_factory=list, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def to_dict(self) -> dict:
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        return {
+            "job_id": self.job_id,
+            "platform": self.platform,
+            "status": self.status,
+            "bytes_total": self.bytes_total,
+            "bytes_read": self.bytes_read,
+            "progress": (
+                round(self.bytes_read / self.bytes_total, 4)
+                if self.bytes_total else 0.0
+            ),
+            "processed": self.processed,
+            "ingested": self.ingested,
+            "updated": self.updated,
+            "duplicates": self.duplicates,
+            "empty": self.empty,
+            "failed": self.failed,
+            "error": self.error,
+            "elapsed_s": round(elapsed, 3),
+            "conversations_per_s": (
+                round(self.processed / elapsed, 1) if elapsed > 0 else 0.0
+            ),
+        }
+
+
+class _BulkRun:
+    """State of one running bulk ingest: dedup set and pending batch."""
+
+    def __init__(
+        self,
+        job: BulkIngestJob,
+        storage: StorageEngine,
+        scanner: ScanService,
+        source_url: str,
+    ):
+        self.job = job
+        self.storage = storage
+        self.scanner = scanner
+        self.source_url = source_url
+        self.seen: set = set()
+        self.pending: List[tuple] = []
+
+    def add(self, index: int, item: Any) -> None:
+        job = self.job
+        if job.platform is None:
+            job.platform = self._detect(item)
+        try:
+            conversation = parse_export_item(item, job.platform, self.source_url)
+        except Exception as e:
+            job.failed += 1
+            job.results.append({"index": index, "status": "failed", "error": str(e)})
+            return
+        if not conversation.messages:
+            job.empty += 1
+            job.results.append({
+                "index": index, "status": "empty",
+                "conversation_id": conversation.conversation_id,
+            })
+            return
+        fingerprint = conversation.fingerprint()
+        if fingerprint in self.seen:
+            job.duplicates += 1
+            job.results.append({
+                "index": index, "status": "duplicate",
+                "conversation_id": conversation.conversation_id,
+            })
+            return
+        self.seen.add(fingerprint)
+
+        # Why: large conversations are scanned in the process pool, so
+        # one huge export entry cannot stall the bulk thread on the GIL
+        scan = self.scanner.scan_blocking(conversation.messages)
+        findings = scan.findings
+        conversation.security_findings = [f.to_dict() for f in findings]
+        if findings:
+            conversation.warnings.append(
+                f"{len(findings)} security finding(s) detected"
+            )
+        if not scan.complete:
+            conversation.warnings.append(scan.warning)
+        self.pending.append((index, conversation, fingerprint))
+        if len(self.pending) >= job.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        job = self.job
+        stored = self.storage.existing_fingerprints([fp for _, _, fp in batch])
+        fresh = []
+        for index, conversation, fingerprint in batch:
+            if fingerprint in stored:
+                job.duplicates += 1
+                job.results.append({
+                    "index": index, "status": "duplicate",
+                    "conversation_id": stored[fingerprint],
+                })
+            else:
+                fresh.append((index, conversation))
+        conversations = [c for _, c in fresh]
+        existing = self.storage.existing_ids([c.conversation_id for c in conversations])
+        self.storage.save_conversations(conversations)
+        for index, conversation in fresh:
+            status = "updated" if conversation.conversation_id in existing else "ingested"
+            if status == "updated":
+                job.updated += 1
+            else:
+                job.ingested += 1
+            job.results.append({
+                "index": index,
+                "status": status,
+                "conversation_id": conversation.conversation_id,
+                "title": conversation.title,
+                "message_count": len(conversation.messages),
+                "security_findings": len(conversation.security_findings),
+            })
+
+    @staticmethod
+    def _detect(item: Any) -> str:
+        platform, _ = detect_platform(content_sample=item)
+        if platform is None:
+            raise ValueError("Could not detect platform; pass platform explicitly")
+        return platform
+
+
+def run_bulk_ingest(
+    job: BulkIngestJob,
+    path: Path,
+    storage: StorageEngine,
+    source_url: Optional[str] = None,
+    scanner: Optional[ScanService] = None,
+) -> BulkIngestJob:
+    """Stream-parse an export file and ingest every conversation in it.
+
+    Conversations are scanned for secrets, deduplicated by fingerprint
+    (within the upload and against stored conversations) and written in
+    transactions of job.batch_size.
+    Plain or gzip-compressed input is accepted. Without a scanner, one
+    is created for this run and shut down when it ends.
+    """
+    own_scanner = scanner is None
+    if own_scanner:
+        scanner = ScanService()
+    job.status = "running"
+    job.started_at = time.time()
+    run = _BulkRun(job, storage, scanner, source_url or f"bulk://{path.name}")
+    try:
+        with path.open("rb") as raw:
+            job.bytes_total = path.stat().st_size
+            head = raw.read(2)
+            raw.seek(0)
+            fp = gzip.GzipFile(fileobj=raw) if head == _GZIP_MAGIC else raw
+            for index, item in enumerate(iter_json_array(fp)):
+                job.processed += 1
+                run.add(index, item)
+                job.bytes_read = raw.tell()
+            run.flush()
+        job.bytes_read = job.bytes_total
+        job.status = "completed"
+    except Exception as e:
+        logger.exception("Bulk ingest %s failed", job.job_id)
+        job.error = str(e)
+        job.status = "failed"
+    finally:
+        job.finished_at = time.time()
+        if own_scanner:
+            scanner.shutdown()
+    logger.info("Bulk ingest %s: %s", job.job_id, job.to_dict())
+    return job
+
+
+class BulkIngestManager:
+    """Runs bulk ingest jobs one at a time in a background thread.
+
+    Jobs share the storage engine's single writer, so running them
+    sequentially costs no throughput. Finished jobs are kept in memory
+    (oldest evicted first) so clients can read their results.
+    """
+
+    def __init__(
+        self,
+        storage: StorageEngine,
+        max_jobs_kept: int = 100,
+        scanner: Optional[ScanService] = None,
+    ):
+        self.storage = storage
+        self.scanner = scanner or ScanService()
+        self.max_jobs_kept = max_jobs_kept
+        self._jobs: Dict[str, BulkIngestJob] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="chat-bulk-ingest"
+        )
+
+    def submit(
+        self,
+        path: Path,
+        platform: Optional[str] = None,
+        batch_size: int = 500,
+        source_url: Optional[str] = None,
+        delete_after: bool = True,
+    ) -> BulkIngestJob:
+        """Queue an export file for ingest. Returns the job immediately."""
+        if platform is not None and platform not in PLATFORM_REGISTRY:
+            raise ValueError(f"Unknown platform: {platform}")
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+        job = BulkIngestJob(
+            job_id=str(uuid.uuid4()), platform=platform, batch_size=batch_size
+        )
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._evict()
+        self._executor.submit(self._run, job, path, source_url, delete_after)
+        return job
+
+    def get(self, job_id: str) -> Optional[BulkIngestJob]:
+        return self._jobs.get(job_id)
+
+    def _run(
+        self,
+        job: BulkIngestJob,
+        path: Path,
+        source_url: Optional[str],
+        delete_after: bool,
+    ) -> None:
+        try:
+            run_bulk_ingest(job, path, self.storage, source_url, self.scanner)
+        finally:
+            if delete_after:
+                path.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        finished = [j for j in self._jobs.values() if j.finished]
+        excess = len(self._jobs) - self.max_jobs_kept
+        for job in sorted(finished, key=lambda j: j.created_at)[:max(excess, 0)]:
+            del self._jobs[job.job_id]
@@ -0,0 +1,125 @@
+"""Compressed encodings for stored conversation payloads."""
+import logging
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple, Union
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# chat_conversations.storage_format values
+FORMAT_JSON = 0  # UTF-8 JSON text
+FORMAT_ZLIB = 1  # zlib-compressed UTF-8 JSON blob
+FORMAT_ZSTD = 2  # zstd frame; references a trained dictionary by id if any
+
+FORMAT_NAMES = {FORMAT_JSON: "json", FORMAT_ZLIB: "zlib", FORMAT_ZSTD: "zstd"}
+
+COMPRESSION_CHOICES = ("none", "zlib", "zstd", "auto")
+
+_ZLIB_LEVEL = 6
+_ZSTD_LEVEL = 9
+
+Payload = Union[str, bytes]
+
+
+class PayloadCodec:
+    """Encodes JSON payloads in the configured storage format and decodes
+    any format, so rows written under older settings stay readable.
+
+    compression is "none", "zlib", "zstd" or "auto" (zstd when the
+    zstandard package is installed, otherwise zlib). zstd frames may use
+    a dictionary trained on stored conversations; the frame header names
+    its dictionary id, and every known dictionary stays loaded for decode.
+    """
+
+    def __init__(self, compression: str = "none"):
+        if compression not in COMPRESSION_CHOICES:
+            raise ValueError(
+                f"compression must be one of {COMPRESSION_CHOICES}, got {compression!r}"
+            )
+        if compression == "auto":
+            compression = "zstd" if zstandard is not None else "zlib"
+        if compression == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed; compressing with zlib")
+            compression = "zlib"
+        self.compression = compression
+        self.format = {"none": FORMAT_JSON, "zlib": FORMAT_ZLIB, "zstd": FORMAT_ZSTD}[
+            compression
+        ]
+        self._dictionaries: Dict[int, "zstandard.ZstdCompressionDict"] = {}
+        self.active_dictionary: Optional[int] = None
+        # Why: zstd (de)compressor objects are not safe to share across threads
+        self._local = threading.local()
+
+    def add_dictionary(self, data: bytes, active: bool = True) -> int:
+        """Load a zstd dictionary; new frames use it when active. Returns its id."""
+        if zstandard is None:
+            raise RuntimeError("zstd dictionaries need the zstandard package")
+        dictionary = zstandard.ZstdCompressionDict(data)
+        dict_id = dictionary.dict_id()
+        self._dictionaries[dict_id] = dictionary
+        if active:
+            self.active_dictionary = dict_id
+            self._local = threading.local()
+        return dict_id
+
+    def encode(self, text: str) -> Tuple[int, Payload]:
+        """(storage_format, value) for a JSON text. Empty text stays empty
+        in every format."""
+        if self.format == FORMAT_JSON or not text:
+            return self.format, text
+        data = text.encode("utf-8", "surrogatepass")
+        if self.format == FORMAT_ZLIB:
+            return FORMAT_ZLIB, zlib.compress(data, _ZLIB_LEVEL)
+        return FORMAT_ZSTD, self._compressor().compress(data)
+
+    def decode(self, storage_format: int, value: Optional[Payload]) -> Optional[str]:
+        """JSON text of a stored value in any known format."""
+        if not value or not storage_format:
+            return value
+        if storage_format == FORMAT_ZLIB:
+            data = zlib.decompress(value)
+        elif storage_format == FORMAT_ZSTD:
+            data = self._decompress_zstd(value)
+        else:
+            raise ValueError(f"Unknown storage_format {storage_format}")
+        return data.decode("utf-8", "surrogatepass")
+
+    def _compressor(self) -> "zstandard.ZstdCompressor":
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            dictionary = self._dictionaries.get(self.active_dictionary)
+            compressor = zstandard.ZstdCompressor(
+                level=_ZSTD_LEVEL, dict_data=dictionary
+            )
+            self._local.compressor = compressor
+        return compressor
+
+    def _decompress_zstd(self, value: bytes) -> bytes:
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed rows need the zstandard package")
+        dict_id = zstandard.get_frame_parameters(value).dict_id
+        decompressors = getattr(self._local, "decompressors", None)
+        if decompressors is None:
+            decompressors = self._local.decompressors = {}
+        decompressor = decompressors.get(dict_id)
+        if decompressor is None:
+            dictionary = None
+            if dict_id:
+                dictionary = self._dictionaries.get(dict_id)
+                if dictionary is None:
+                    raise ValueError(f"Unknown zstd dictionary id {dict_id}")
+            decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+            decompressors[dict_id] = decompressor
+        return decompressor.decompress(value)
+
+
+def train_dictionary(samples: List[bytes], dict_size: int = 112 * 1024) -> bytes:
+    """Train a zstd dictionary on sample payloads."""
+    if zstandard is None:
+        raise RuntimeError("zstd dictionaries need the zstandard package")
+    return zstandard.train_dictionary(dict_size, samples).as_bytes()
@@ -0,0 +1,325 @@
+"""Background ingest jobs - persistent queue, asyncio dispatcher, process pool."""
+import asyncio
+import json
+import logging
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from .analysis_queue import AnalysisQueue
+from .models import ParsedConversation
+from .platforms import PLATFORM_REGISTRY, parse_conversation
+from .security import scan_messages
+from .storage import StorageEngine
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class JobQueueFull(Exception):
+    """Raised when the ingest job queue is at max_queued."""
+
+
+def _parse_and_scan(
+    payload_path: str,
+    platform: Optional[str],
+    source_url: Optional[str],
+    options: Dict[str, Any],
+) -> ParsedConversation:
+    """CPU-bound half of an ingest job; runs in a worker process."""
+    data = Path(payload_path).read_bytes()
+    conversation = parse_conversation(
+        content=data, platform=platform, source_url=source_url, **options
+    )
+    if not conversation.messages:
+        raise ValueError("No messages extracted. Check format or platform.")
+    findings = scan_messages(conversation.messages)
+    conversation.security_findings = [f.to_dict() for f in findings]
+    if findings:
+        conversation.warnings.append(
+            f"{len(findings)} security finding(s) detected"
+        )
+    return conversation
+
+
+class IngestJobDispatcher:
+    """Runs ingest jobs (parse, scan, store, analyze) off the request path.
+
+    Jobs are rows in chat_jobs with their payload spooled under spool_dir,
+    so queued and interrupted jobs are resumed by start() after a restart.
+    Parsing and secret scanning run in a process pool; storage writes go
+    through the engine's writer thread and analysis is handed to the
+    AnalysisQueue. Progress events are fanned out to subscribers.
+    """
+
+    def __init__(
+        self,
+        storage: StorageEngine,
+        analysis: AnalysisQueue,
+        spool_dir: Path,
+        max_queued: int = 100,
+        workers: int = 2,
+        process_workers: Optional[int] = None,
+        max_attempts: int = 3,
+    ):
+        self.storage = storage
+        self.analysis = analysis
+        self.spool_dir = spool_dir
+        self.max_queued = max_queued
+        self.workers = workers
+        self.process_workers = process_workers or min(workers, os.cpu_count() or 1)
+        self.max_attempts = max_attempts
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self.resumed = 0
+
+    # --- lifecycle ---
+
+    async def start(self) -> None:
+        """Start workers and requeue jobs left unfinished by a previous run."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self._pool = ProcessPoolExecutor(max_workers=self.process_workers)
+        # Why: resumed jobs may exceed max_queued; the bound applies to new work
+        self._queue = asyncio.Queue()
+        self.resumed = 0
+        for job in await asyncio.to_thread(self.storage.unfinished_jobs):
+            if job["status"] == "running" and job["attempts"] >= self.max_attempts:
+                await self._update(
+                    job["job_id"], status="failed", stage="failed",
+                    error=f"Abandoned after {job['attempts']} interrupted attempts",
+                )
+                continue
+            await self._update(job["job_id"], status="queued", stage="resumed")
+            self._queue.put_nowait(job["job_id"])
+            self.resumed += 1
+        if self.resumed:
+            logger.info("Resumed %d unfinished ingest job(s)", self.resumed)
+        self._tasks = [
+            loop.create_task(self._worker(), name=f"chat-ingest-job-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel workers; in-flight jobs stay 'running' and resume on start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # --- submission ---
+
+    def check_capacity(self) -> None:
+        if self._queue is not None and self._queue.qsize() >= self.max_queued:
+            raise JobQueueFull(f"Ingest job queue is full ({self.max_queued} queued)")
+
+    def new_payload_path(self) -> Path:
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        return self.spool_dir / f"{uuid.uuid4()}.payload"
+
+    async def submit(
+        self,
+        content: Any,
+        platform: Optional[str] = None,
+        source_url: Optional[str] = None,
+        analyze: bool = True,
+        near_duplicates: bool = False,
+        **options: Any,
+    ) -> Dict:
+        """Spool content (bytes, text or decoded JSON) and queue a job."""
+        self.check_capacity()
+        if isinstance(content, str):
+            data = content.encode("utf-8")
+        elif isinstance(content, (bytes, bytearray)):
+            data = bytes(content)
+        else:
+            data = json.dumps(content, ensure_ascii=False).encode("utf-8")
+        path = self.new_payload_path()
+        await asyncio.to_thread(path.write_bytes, data)
+        return await self.submit_file(
+            path, platform, source_url, analyze, near_duplicates, **options
+        )
+
+    async def submit_file(
+        self,
+        path: Path,
+        platform: Optional[str] = None,
+        source_url: Optional[str] = None,
+        analyze: bool = True,
+        near_duplicates: bool = False,
+        **options: Any,
+    ) -> Dict:
+        """Queue a job for a payload already spooled under spool_dir.
+
+        The dispatcher owns the file from here and deletes it once the
+        job finishes (or is rejected).
+        """
+        try:
+            if platform is not None and platform not in PLATFORM_REGISTRY:
+                raise ValueError(f"Unknown platform: {platform}")
+            await self.start()
+            self.check_capacity()
+        except Exception:
+            path.unlink(missing_ok=True)
+            raise
+        job_id = str(uuid.uuid4())
+        params = {
+            "platform": platform,
+            "source_url": source_url,
+            "analyze": analyze,
+            "near_duplicates": near_duplicates,
+            "options": options,
+        }
+        await asyncio.to_thread(
+            self.storage.create_job, job_id, "ingest", params, str(path)
+        )
+        self._queue.put_nowait(job_id)
+        return await asyncio.to_thread(self.storage.get_job, job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self.storage.get_job(job_id)
+
+    def stats(self) -> Dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queued": self.max_queued,
+            "workers": self.workers,
+            "process_workers": self.process_workers,
+            "resumed": self.resumed,
+        }
+
+    # --- progress events ---
+
+    async def events(self, job_id: str) -> AsyncIterator[Dict]:
+        """Yield the job's current state, then each update until it finishes."""
+        queue: asyncio.Queue = asyncio.Queue()
+        # Why: subscribe before reading the snapshot so no update is missed
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            job = await asyncio.to_thread(self.storage.get_job, job_id)
+            if job is None:
+                return
+            event = _event_from_job(job)
+            while True:
+                yield event
+                if event["status"] in TERMINAL_STATUSES:
+                    return
+                last = event["updated_at"]
+                event = await queue.get()
+                # Updates already reflected in the snapshot are skipped
+                while event["updated_at"] <= last:
+                    event = await queue.get()
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+    async def _update(self, job_id: str, **fields: Any) -> None:
+        await asyncio.to_thread(self.storage.update_job, job_id, **fields)
+        subscribers = self._subscribers.get(job_id)
+        if subscribers:
+            job = await asyncio.to_thread(self.storage.get_job, job_id)
+            event = _event_from_job(job)
+            for queue in subscribers:
+                queue.put_nowait(event)
+
+    # --- workers ---
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        while True:
+            job_id = await queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception("Ingest job %s crashed", job_id)
+            finally:
+                queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = await asyncio.to_thread(self.storage.get_job, job_id)
+        if job is None or job["status"] in TERMINAL_STATUSES:
+            return
+        params = job["params"]
+        payload_path = job["payload_path"]
+        await self._update(
+            job_id, status="running", stage="parsing", progress=0.1, new_attempt=True
+        )
+        try:
+            pool = self._pool
+            try:
+                conversation = await self._loop.run_in_executor(
+                    pool,
+                    _parse_and_scan,
+                    payload_path,
+                    params.get("platform"),
+                    params.get("source_url"),
+                    params.get("options") or {},
+                )
+            except BrokenProcessPool:
+                # Why: a crashed worker process poisons the whole pool; every
+                # job in flight sees it, only the first replaces it
+                if self._pool is pool:
+                    self._pool = ProcessPoolExecutor(max_workers=self.process_workers)
+                    pool.shutdown(wait=False, cancel_futures=True)
+                raise RuntimeError("Parser process crashed")
+            await self._update(job_id, stage="storing", progress=0.7)
+            cid, match = await asyncio.to_thread(
+                self.storage.save_conversation_unique,
+                conversation,
+                bool(params.get("near_duplicates")),
+            )
+            if match in ("exact", "contained") or not params.get("analyze"):
+                analysis = "skipped"
+            else:
+                analysis = self.analysis.enqueue(conversation)
+            result = {
+                "conversation_id": cid,
+                "duplicate": match,
+                "platform": conversation.platform,
+                "message_count": len(conversation.messages),
+                "security_findings": len(conversation.security_findings),
+                "warnings": conversation.warnings,
+                "analysis": analysis,
+            }
+            await self._update(
+                job_id, status="completed", stage="done", progress=1.0, result=result
+            )
+        except Exception as e:
+            logger.warning("Ingest job %s failed: %s", job_id, e)
+            await self._update(job_id, status="failed", stage="failed", error=str(e))
+        if payload_path:
+            Path(payload_path).unlink(missing_ok=True)
+
+    async def join(self) -> None:
+        """Wait until every queued job has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+
+def _event_from_job(job: Dict) -> Dict:
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "progress": job["progress"],
+        "result": job["result"],
+        "error": job["error"],
+        "updated_at": job["updated_at"],
+    }
@@ -3,10 +3,35 @@ from __future__ import annotations
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import hashlib
+import sys
+import unicodedata
 import uuid
 
 
+# Messages hashed into ParsedConversation.prefix_fingerprint
+PREFIX_MESSAGES = 4
+
+
+def message_hash(role: str, content: str) -> str:
+    """SHA-256 of one message's role and NFC-normalized, whitespace-collapsed text."""
+    # Why: str.split() collapses the same whitespace as re \s+, ~4x faster
+    text = " ".join(unicodedata.normalize("NFC", content).split())
+    h = hashlib.sha256(role.encode("utf-8"))
+    h.update(b"\x1f")
+    h.update(text.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+def sequence_hash(hashes: Iterable[str]) -> str:
+    """SHA-256 over an ordered sequence of message hashes."""
+    h = hashlib.sha256()
+    for digest in hashes:
+        h.update(digest.encode("ascii"))
+    return h.hexdigest()
+
+
 class SecurityLevel(Enum):
     CRITICAL = "critical"
     HIGH = "high"
@@ -14,19 +39,27 @@ class SecurityLevel(Enum):
     LOW = "low"
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedMessage:
     role: str  # user, assistant, system, tool
     content: str
     timestamp: Optional[datetime] = None
     message_id: Optional[str] = None
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    # None until a parser attaches metadata; saves an empty dict per message
+    metadata: Optional[Dict[str, Any]] = None
+
+    def __post_init__(self) -> None:
+        if type(self.role) is str:
+            self.role = sys.intern(self.role)
 
     def to_dict(self) -> dict:
-        d = asdict(self)
-        if self.timestamp:
-            d["timestamp"] = self.timestamp.isoformat()
-        return d
+        return {
+            "role": self.role,
+            "content": self.content,
+            "timestamp": self.timestamp.isoformat() if self.timestamp else None,
+            "message_id": self.message_id,
+            "metadata": self.metadata if self.metadata is not None else {},
+        }
 
 
 @dataclass
@@ -53,6 +86,38 @@ class ParsedConversation:
             "message_count": len(self.messages),
         }
 
+    def message_hashes(self) -> List[str]:
+        return [message_hash(m.role, m.content) for m in self.messages]
+
+    def fingerprint(self) -> str:
+        """Content fingerprint: SHA-256 over the ordered message hashes.
+
+        Identical conversations share a fingerprint regardless of their
+        conversation_id, title, timestamps, platform or formatting
+        whitespace.
+        """
+        return sequence_hash(self.message_hashes())
+
+    def fingerprints(self) -> Tuple[str, Optional[str]]:
+        """(fingerprint, prefix_fingerprint), hashing each message once."""
+        hashes = self.message_hashes()
+        prefix = (
+            sequence_hash(hashes[:PREFIX_MESSAGES])
+            if len(hashes) >= PREFIX_MESSAGES else None
+        )
+        return sequence_hash(hashes), prefix
+
+    def prefix_fingerprint(self, length: int = PREFIX_MESSAGES) -> Optional[str]:
+        """Fingerprint of the first `length` messages (None if shorter).
+
+        Matches re-exports of a conversation that has since continued.
+        """
+        if len(self.messages) < length:
+            return None
+        return sequence_hash(
+            message_hash(m.role, m.content) for m in self.messages[:length]
+        )
+
 
 @dataclass
 class ConversationIntelligence:
@@ -65,6 +130,11 @@ class ConversationIntelligence:
     osint_relevance: str
     summary: str
     platform: str
+    # Provider tokens spent producing this analysis (0 for cache hits)
+    tokens_used: int = 0
+    # False when some windows failed or were sampled out; such results
+    # are stored but never cached
+    complete: bool = True
 
     def to_dict(self) -> dict:
         return asdict(self)
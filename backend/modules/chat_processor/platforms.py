@@ -2,6 +2,7 @@
 from __future__ import annotations
 import json
 import re
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Callable, Dict, List, Optional, Tuple
@@ -9,68 +10,214 @@ from typing import Any, Callable, Dict, List, Optional, Tuple
 from .models import ParsedConversation, ParsedMessage
 
 
+# Only the head of a payload is inspected, so detection cost does not grow
+# with upload size
+DETECTION_SAMPLE_CHARS = 64 * 1024
+
+_URL_CONFIDENCE = 0.95
+
+# Containers visited (and list items sampled per container) when
+# detecting the platform of an already-decoded JSON object
+_DETECTION_MAX_NODES = 256
+_DETECTION_ITEMS_PER_CONTAINER = 8
+
+
 @dataclass
 class PlatformConfig:
     name: str
     display_name: str
-    url_patterns: List[str]
+    icon: str
+    url_patterns: List[str]  # regexes matched against the source URL
+    # Literals matched case-insensitively: quoted JSON keys or transcript
+    # speaker headers, never bare names that occur in prose
     content_fingerprints: List[str]
     export_formats: List[str]
-    import_instructions: str
-    parse_fn: Callable
+    export_instructions: str
+    parse_fn: Callable  # (content, source_url=None, **options)
 
 
-def _parse_chatgpt(content: Any, source_url: str = None) -> ParsedConversation:
+def decode_payload(content: Any) -> Any:
+    """Decode raw ingest content exactly once.
+
+    Bytes and strings holding JSON become dicts/lists, other bytes become
+    text; already-decoded objects are returned unchanged. Parsers call
+    this themselves, so it is a no-op when content was decoded upstream.
+
+    Raises:
+        ValueError: If bytes are not valid UTF-8.
+    """
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        data = bytes(content) if isinstance(content, memoryview) else content
+        if data[:3] == b"\xef\xbb\xbf":
+            data = data[3:]
+        if data[:64].lstrip()[:1] in (b"{", b"["):
+            try:
+                return json.loads(data)
+            except ValueError:
+                pass
+        try:
+            return data.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise ValueError("Content must be UTF-8 encoded") from e
     if isinstance(content, str):
-        content = json.loads(content)
+        stripped = content.lstrip("\ufeff \t\r\n")
+        if stripped[:1] in ("{", "["):
+            try:
+                return json.loads(stripped)
+            except json.JSONDecodeError:
+                pass
+    return content
+
+
+def _chatgpt_message(
+    node: Dict, metadata: Optional[Dict[str, Any]] = None
+) -> Optional[ParsedMessage]:
+    msg = node.get("message") or {}
+    if not msg:
+        return None
+    role = (msg.get("author") or {}).get("role", "unknown")
+    if role in ("system", "tool"):
+        return None
+    parts = (msg.get("content") or {}).get("parts") or []
+    text = " ".join(str(pt) for pt in parts if isinstance(pt, str)).strip()
+    if not text:
+        return None
+    ts_raw = msg.get("create_time")
+    meta = {"model": (msg.get("metadata") or {}).get("model_slug")}
+    if metadata:
+        meta.update(metadata)
+    return ParsedMessage(
+        role=role, content=text, message_id=msg.get("id"),
+        timestamp=datetime.fromtimestamp(ts_raw) if ts_raw else None,
+        metadata=meta,
+    )
+
+
+def _chatgpt_leaf(mapping: Dict[str, Dict]) -> Optional[str]:
+    """Fallback when current_node is missing: the newest leaf node."""
+    best_id, best_time = None, None
+    for node_id, node in mapping.items():
+        if node.get("children"):
+            continue
+        ts = ((node.get("message") or {}).get("create_time")) or 0
+        if best_time is None or ts >= best_time:
+            best_id, best_time = node_id, ts
+    return best_id
+
+
+def _chatgpt_active_path(conv: Dict, mapping: Dict[str, Dict]) -> List[str]:
+    """Node ids from the root to current_node, following parent links."""
+    node_id = conv.get("current_node")
+    if node_id not in mapping:
+        node_id = _chatgpt_leaf(mapping)
+    path: List[str] = []
+    seen = set()
+    while node_id in mapping and node_id not in seen:
+        seen.add(node_id)
+        path.append(node_id)
+        node_id = mapping[node_id].get("parent")
+    path.reverse()
+    return path
+
+
+def _chatgpt_all_branches(
+    conv: Dict, mapping: Dict[str, Dict]
+) -> List[ParsedMessage]:
+    """Every message of the tree in depth-first order, tagged with branches.
+
+    The first child continues its parent's branch; each further child
+    (a regeneration or edit) opens a new branch. Iterative, so deep
+    trees do not hit the recursion limit.
+    """
+    active = set(_chatgpt_active_path(conv, mapping))
+    children: Dict[str, List[str]] = {}
+    roots: List[str] = []
+    for node_id, node in mapping.items():
+        parent = node.get("parent")
+        if parent in mapping:
+            children.setdefault(parent, []).append(node_id)
+        else:
+            roots.append(node_id)
+    for node_id, node in mapping.items():
+        # Why: prefer the export's own child order when it lists children
+        listed = [c for c in node.get("children") or [] if c in mapping]
+        if listed and set(listed) == set(children.get(node_id, ())):
+            children[node_id] = listed
+
     messages: List[ParsedMessage] = []
-    title = None
-    created_at = None
+    next_branch = len(roots)
+    # (node_id, branch_id, parent_branch_id)
+    stack = [(root, i, None) for i, root in reversed(list(enumerate(roots)))]
+    seen = set()
+    while stack:
+        node_id, branch, parent_branch = stack.pop()
+        if node_id in seen:
+            continue
+        seen.add(node_id)
+        msg = _chatgpt_message(mapping[node_id], {
+            "branch_id": branch,
+            "parent_branch_id": parent_branch,
+            "active": node_id in active,
+        })
+        if msg is not None:
+            messages.append(msg)
+        kids = children.get(node_id, [])
+        pushed = []
+        for idx, child in enumerate(kids):
+            if idx == 0:
+                pushed.append((child, branch, parent_branch))
+            else:
+                pushed.append((child, next_branch, branch))
+                next_branch += 1
+        stack.extend(reversed(pushed))
+    return messages
+
+
+def _parse_chatgpt(
+    content: Any, source_url: str = None, all_branches: bool = False, **options
+) -> ParsedConversation:
+    """Parse a ChatGPT export conversation.
+
+    By default only the active branch is emitted: the path from the root
+    to current_node, as shown in the ChatGPT UI. With all_branches=True
+    every message is emitted, with branch ids in its metadata.
+    """
+    content = decode_payload(content)
+    if isinstance(content, str):
+        raise ValueError("ChatGPT content must be a JSON export")
     if isinstance(content, list):
         conv = content[0] if content else {}
     else:
         conv = content
     title = conv.get("title")
+    created_at = None
     if conv.get("create_time"):
         created_at = datetime.fromtimestamp(conv["create_time"])
-    mapping = conv.get("mapping", {})
-    nodes = sorted(
-        [v for v in mapping.values() if v.get("message")],
-        key=lambda x: x.get("message", {}).get("create_time") or 0,
-    )
-    for node in nodes:
-        msg = node.get("message", {})
-        if not msg:
-            continue
-        author = msg.get("author", {})
-        role = author.get("role", "unknown")
-        if role in ("system", "tool"):
-            continue
-        parts = msg.get("content", {}).get("parts", [])
-        text = " ".join(str(pt) for pt in parts if isinstance(pt, str)).strip()
-        if not text:
-            continue
-        ts_raw = msg.get("create_time")
-        ts = datetime.fromtimestamp(ts_raw) if ts_raw else None
-        messages.append(ParsedMessage(
-            role=role, content=text, message_id=msg.get("id"),
-            timestamp=ts,
-            metadata={"model": msg.get("metadata", {}).get("model_slug")},
-        ))
+    mapping = conv.get("mapping") or {}
+    if all_branches:
+        messages = _chatgpt_all_branches(conv, mapping)
+    else:
+        messages = [
+            msg for msg in (
+                _chatgpt_message(mapping[node_id])
+                for node_id in _chatgpt_active_path(conv, mapping)
+            )
+            if msg is not None
+        ]
     return ParsedConversation(
         messages=messages, platform="chatgpt", title=title,
         created_at=created_at, source_url=source_url,
     )
 
 
-def _parse_claude(content: Any, source_url: str = None) -> ParsedConversation:
+def _parse_claude(
+    content: Any, source_url: str = None, **options
+) -> ParsedConversation:
     messages: List[ParsedMessage] = []
     title = None
+    content = decode_payload(content)
     if isinstance(content, str):
-        try:
-            content = json.loads(content)
-        except json.JSONDecodeError:
-            return _parse_markdown_generic(content, "claude", source_url)
+        return _parse_markdown_generic(content, "claude", source_url)
     if isinstance(content, dict):
         title = content.get("name") or content.get("title")
         raw_msgs = content.get("chat_messages", content.get("messages", []))
@@ -92,14 +239,14 @@ def _parse_claude(content: Any, source_url: str = None) -> ParsedConversation:
     )
 
 
-def _parse_gemini(content: Any, source_url: str = None) -> ParsedConversation:
+def _parse_gemini(
+    content: Any, source_url: str = None, **options
+) -> ParsedConversation:
     messages: List[ParsedMessage] = []
     title = None
+    content = decode_payload(content)
     if isinstance(content, str):
-        try:
-            content = json.loads(content)
-        except json.JSONDecodeError:
-            return _parse_markdown_generic(content, "gemini", source_url)
+        return _parse_markdown_generic(content, "gemini", source_url)
     if isinstance(content, dict):
         title = content.get("title") or content.get("name")
         raw_msgs = content.get("messages", content.get("history", []))
@@ -121,34 +268,34 @@ def _parse_gemini(content: Any, source_url: str = None) -> ParsedConversation:
     )
 
 
-def _parse_perplexity(content: Any, source_url: str = None) -> ParsedConversation:
+def _parse_perplexity(
+    content: Any, source_url: str = None, **options
+) -> ParsedConversation:
+    content = decode_payload(content)
     if isinstance(content, str):
-        try:
-            data = json.loads(content)
-            msgs_raw = data.get("messages", [])
-            messages = []
-            for msg in msgs_raw:
-                role = msg.get("role", "unknown")
-                text = msg.get("content", "").strip()
-                if text:
-                    messages.append(ParsedMessage(role=role, content=text))
-            return ParsedConversation(
-                messages=messages, platform="perplexity",
-                title=data.get("title"), source_url=source_url,
-            )
-        except json.JSONDecodeError:
-            return _parse_markdown_generic(content, "perplexity", source_url)
-    return ParsedConversation(messages=[], platform="perplexity", source_url=source_url)
+        return _parse_markdown_generic(content, "perplexity", source_url)
+    messages: List[ParsedMessage] = []
+    title = None
+    if isinstance(content, dict):
+        title = content.get("title")
+        for msg in content.get("messages", []):
+            role = msg.get("role", "unknown")
+            text = msg.get("content", "").strip()
+            if text:
+                messages.append(ParsedMessage(role=role, content=text))
+    return ParsedConversation(
+        messages=messages, platform="perplexity", title=title, source_url=source_url,
+    )
 
 
-def _parse_deepseek(content: Any, source_url: str = None) -> ParsedConversation:
+def _parse_deepseek(
+    content: Any, source_url: str = None, **options
+) -> ParsedConversation:
     messages: List[ParsedMessage] = []
     title = None
+    content = decode_payload(content)
     if isinstance(content, str):
-        try:
-            content = json.loads(content)
-        except json.JSONDecodeError:
-            return _parse_markdown_generic(content, "deepseek", source_url)
+        return _parse_markdown_generic(content, "deepseek", source_url)
     if isinstance(content, dict):
         title = content.get("title") or content.get("name")
         raw_msgs = content.get("messages", content.get("conversation", []))
@@ -166,26 +313,320 @@ def _parse_deepseek(content: Any, source_url: str = None) -> ParsedConversation:
     )
 
 
+_MD_SPEAKERS = "user|human|you|assistant|ai|claude|gemini|gpt|deepseek"
+
+# Transcript formats in priority order: (speaker header, line that ends
+# a message body). Headers span a whole line; terminators match its start.
+_MD_FORMATS: Tuple[Tuple[re.Pattern, re.Pattern], ...] = (
+    # "## User:" ... ends at any "## " heading
+    (re.compile(rf"##\s*({_MD_SPEAKERS}|perplexity):\s*", re.IGNORECASE),
+     re.compile(r"##(?:\s|$)")),
+    # "**User:**" ... ends at any line starting with "**"
+    (re.compile(rf"\*\*({_MD_SPEAKERS}):\*\*\s*", re.IGNORECASE),
+     re.compile(r"\*\*")),
+    # "User:" ... ends at any "Human:/User:/Assistant:/AI:" line
+    (re.compile(r"(human|user|assistant|ai):\s*", re.IGNORECASE),
+     re.compile(r"(?:human|user|assistant|ai):", re.IGNORECASE)),
+)
+
+# Cheap prefilter: a line can only end or start a message if it matches
+_MD_CANDIDATE_RE = re.compile(r"##|\*\*|(?:human|user|assistant|ai):", re.IGNORECASE)
+
+_MD_BLANK_RE = re.compile(r"\s*")
+
+
+def _scan_markdown(content: str) -> List[Tuple[str, str]]:
+    """Split a Markdown/plain transcript into (speaker, text) pairs.
+
+    One pass over the lines runs a small state machine per format; the
+    highest-priority format that found any header wins. Bodies are
+    sliced from content once per message, so there is no backtracking.
+
+    The first non-blank body line only ends a message when it is itself
+    a speaker header, so a reply may open with "## Overview" or
+    "**Short answer:**".
+    """
+    spans: List[List[Tuple[str, int, int]]] = [[] for _ in _MD_FORMATS]
+    # (speaker, body start, start of the first non-blank body line)
+    open_msgs: List[Optional[Tuple[str, int, int]]] = [None] * len(_MD_FORMATS)
+    length = len(content)
+    pos = 0
+    while True:
+        eol = content.find("\n", pos)
+        last_line = eol == -1
+        if last_line:
+            eol = length
+        if _MD_CANDIDATE_RE.match(content, pos, eol):
+            for idx, (header_re, end_re) in enumerate(_MD_FORMATS):
+                current = open_msgs[idx]
+                if (
+                    current is not None
+                    and end_re.match(content, pos, eol)
+                    and (pos != current[2] or header_re.fullmatch(content, pos, eol))
+                ):
+                    spans[idx].append((current[0], current[1], pos - 1))
+                    current = open_msgs[idx] = None
+                # Why: a header needs a body line after it, and a header
+                # that does not end the open body is part of that body
+                if current is None and not last_line:
+                    header = header_re.fullmatch(content, pos, eol)
+                    if header:
+                        blank_end = _MD_BLANK_RE.match(content, eol + 1).end()
+                        first_line = content.rfind("\n", eol, blank_end) + 1
+                        open_msgs[idx] = (header.group(1), eol + 1, first_line)
+        if last_line:
+            break
+        pos = eol + 1
+
+    for idx, current in enumerate(open_msgs):
+        if current is not None:
+            spans[idx].append((current[0], current[1], length))
+    for found in spans:
+        if found:
+            return [(speaker, content[start:end].strip()) for speaker, start, end in found]
+    return []
+
+
 def _parse_markdown_generic(
     content: str, platform: str, source_url: str = None
 ) -> ParsedConversation:
     messages: List[ParsedMessage] = []
-    patterns = [
-        "(?:^|\n)##\s*(User|Human|You|Assistant|AI|Claude|Gemini|GPT|DeepSeek|Perplexity):\s*\n(.*?)(?=\n##\s|\Z)",
-        "(?:^|\n)\*\*(User|Human|You|Assistant|AI|Claude|Gemini|GPT|DeepSeek):\*\*\s*\n(.*?)(?=\n\*\*|\Z)",
-        "(?:^|\n)(Human|User|Assistant|AI):\s*\n(.*?)(?=\n(?:Human|User|Assistant|AI):|\Z)",
-    ]
-    for pattern in patterns:
-        matches = list(re.finditer(pattern, content, re.IGNORECASE | re.DOTALL))
-        if matches:
-            for m in matches:
-                speaker = m.group(1).strip().lower()
-                text = m.group(2).strip()
-                if not text:
-                    continue
-                role = "user" if speaker in ("user", "human", "you") else "assistant"
-                messages.append(ParsedMessage(role=role, content=text))
-            break
+    for speaker, text in _scan_markdown(content):
+        if not text:
+            continue
+        role = "user" if speaker.lower() in ("user", "human", "you") else "assistant"
+        messages.append(ParsedMessage(role=role, content=text))
     return ParsedConversation(messages=messages, platform=platform, source_url=source_url)
 
 
+PLATFORM_REGISTRY: Dict[str, PlatformConfig] = {
+    "chatgpt": PlatformConfig(
+        name="chatgpt",
+        display_name="ChatGPT",
+        icon="openai",
+        url_patterns=[r"(?:chat\.openai\.com|chatgpt\.com)"],
+        content_fingerprints=['"mapping"', '"current_node"', '"model_slug"'],
+        export_formats=["json"],
+        export_instructions=(
+            "Settings > Data controls > Export data, then upload "
+            "conversations.json from the emailed archive."
+        ),
+        parse_fn=_parse_chatgpt,
+    ),
+    "claude": PlatformConfig(
+        name="claude",
+        display_name="Claude",
+        icon="anthropic",
+        url_patterns=[r"claude\.ai"],
+        content_fingerprints=['"chat_messages"', '"sender"', "## claude:", "**claude:**"],
+        export_formats=["json", "md", "txt"],
+        export_instructions=(
+            "Settings > Account > Export data, or copy the conversation "
+            "as Markdown and paste it here."
+        ),
+        parse_fn=_parse_claude,
+    ),
+    "gemini": PlatformConfig(
+        name="gemini",
+        display_name="Gemini",
+        icon="google",
+        url_patterns=[r"(?:gemini|bard|aistudio)\.google\.com"],
+        content_fingerprints=['"history"', '"parts"', "## gemini:", "**gemini:**"],
+        export_formats=["json", "md", "txt"],
+        export_instructions=(
+            "Export the chat from Google AI Studio (Get code > JSON) or "
+            "via Google Takeout, or paste the conversation as Markdown."
+        ),
+        parse_fn=_parse_gemini,
+    ),
+    "perplexity": PlatformConfig(
+        name="perplexity",
+        display_name="Perplexity",
+        icon="perplexity",
+        url_patterns=[r"perplexity\.ai"],
+        content_fingerprints=['"web_results"', "## perplexity:"],
+        export_formats=["json", "md"],
+        export_instructions=(
+            "Open the thread, use Share > Export as Markdown, and upload "
+            "the file."
+        ),
+        parse_fn=_parse_perplexity,
+    ),
+    "deepseek": PlatformConfig(
+        name="deepseek",
+        display_name="DeepSeek",
+        icon="deepseek",
+        url_patterns=[r"(?:chat\.)?deepseek\.com"],
+        content_fingerprints=['"reasoning_content"', "## deepseek:", "**deepseek:**"],
+        export_formats=["json", "md"],
+        export_instructions=(
+            "Settings > Data > Export data, or copy the conversation as "
+            "Markdown and paste it here."
+        ),
+        parse_fn=_parse_deepseek,
+    ),
+}
+
+
+def _build_detectors() -> Tuple[re.Pattern, re.Pattern, Dict[str, Tuple[str, str]]]:
+    """Compile one URL regex and one fingerprint regex for all platforms."""
+    url_alternatives = []
+    fp_alternatives = []
+    fp_groups: Dict[str, Tuple[str, str]] = {}
+    for idx, (name, cfg) in enumerate(PLATFORM_REGISTRY.items()):
+        url_alternatives.append(
+            f"(?P<u{idx}>" + "|".join(cfg.url_patterns) + ")"
+        )
+        for fp_idx, fingerprint in enumerate(cfg.content_fingerprints):
+            group = f"f{idx}_{fp_idx}"
+            fp_alternatives.append(f"(?P<{group}>{re.escape(fingerprint)})")
+            fp_groups[group] = (name, fingerprint.lower())
+    url_re = re.compile("|".join(url_alternatives), re.IGNORECASE)
+    fp_re = re.compile("|".join(fp_alternatives), re.IGNORECASE)
+    return url_re, fp_re, fp_groups
+
+
+_URL_RE, _FINGERPRINT_RE, _FINGERPRINT_GROUPS = _build_detectors()
+_URL_GROUPS = {f"u{i}": name for i, name in enumerate(PLATFORM_REGISTRY)}
+
+# Quoted fingerprints ('"mapping"') name JSON keys; decoded objects are
+# matched on their keys instead of on serialized text
+_KEY_FINGERPRINTS: Dict[str, set] = {
+    name: {
+        fp[1:-1].lower() for fp in cfg.content_fingerprints
+        if len(fp) > 2 and fp[0] == fp[-1] == '"'
+    }
+    for name, cfg in PLATFORM_REGISTRY.items()
+}
+
+
+def _detect_from_url(url: str) -> Optional[str]:
+    m = _URL_RE.search(url)
+    return _URL_GROUPS[m.lastgroup] if m else None
+
+
+def _detect_from_content(sample: str) -> Tuple[Optional[str], float]:
+    """Score platforms by distinct fingerprints found in one regex pass."""
+    hits: Dict[str, set] = {}
+    for m in _FINGERPRINT_RE.finditer(sample):
+        name, fingerprint = _FINGERPRINT_GROUPS[m.lastgroup]
+        hits.setdefault(name, set()).add(fingerprint)
+    if not hits:
+        return None, 0.0
+
+    best_name, best_score = None, 0.0
+    for name, found in hits.items():
+        total = len(PLATFORM_REGISTRY[name].content_fingerprints)
+        score = 0.4 + 0.5 * len(found) / total
+        if score > best_score:
+            best_name, best_score = name, score
+    return best_name, best_score
+
+
+def _sample_keys(obj: Any) -> set:
+    """Keys of a decoded JSON value, from a bounded breadth-first walk."""
+    keys: set = set()
+    pending = deque([obj])
+    visited = 0
+    while pending and visited < _DETECTION_MAX_NODES:
+        node = pending.popleft()
+        visited += 1
+        if isinstance(node, dict):
+            children = []
+            for key, value in node.items():
+                if isinstance(key, str):
+                    keys.add(key.lower())
+                if isinstance(value, (dict, list)) and len(children) < _DETECTION_ITEMS_PER_CONTAINER:
+                    children.append(value)
+            pending.extend(children)
+        elif isinstance(node, list):
+            pending.extend(
+                item for item in node[:_DETECTION_ITEMS_PER_CONTAINER]
+                if isinstance(item, (dict, list))
+            )
+    return keys
+
+
+def _detect_from_object(obj: Any) -> Tuple[Optional[str], float]:
+    """Score platforms by fingerprint keys present in a decoded object."""
+    keys = _sample_keys(obj)
+    best_name, best_score = None, 0.0
+    for name, fingerprints in _KEY_FINGERPRINTS.items():
+        found = fingerprints & keys
+        if not found:
+            continue
+        total = len(PLATFORM_REGISTRY[name].content_fingerprints)
+        score = 0.4 + 0.5 * len(found) / total
+        if score > best_score:
+            best_name, best_score = name, score
+    return best_name, best_score
+
+
+def detect_platform(
+    url: Optional[str] = None,
+    content_sample: Optional[Any] = None,
+) -> Tuple[Optional[str], float]:
+    """Detect the source platform from a URL and/or content.
+
+    Only the first DETECTION_SAMPLE_CHARS of text content are scanned;
+    decoded JSON (dict/list) is matched on its keys without re-serializing.
+    Returns (platform name or None, confidence in [0, 1]).
+    """
+    url_platform = _detect_from_url(url) if url else None
+
+    content_platform, content_conf = None, 0.0
+    if isinstance(content_sample, (dict, list)):
+        content_platform, content_conf = _detect_from_object(content_sample)
+    elif content_sample:
+        if isinstance(content_sample, (bytes, bytearray)):
+            sample = content_sample[:DETECTION_SAMPLE_CHARS].decode(
+                "utf-8", errors="ignore"
+            )
+        else:
+            sample = str(content_sample)[:DETECTION_SAMPLE_CHARS]
+        content_platform, content_conf = _detect_from_content(sample)
+
+    if url_platform:
+        if content_platform == url_platform:
+            return url_platform, 1.0
+        return url_platform, _URL_CONFIDENCE
+    return content_platform, content_conf
+
+
+def parse_conversation(
+    content: Any,
+    platform: Optional[str] = None,
+    source_url: Optional[str] = None,
+    **options: Any,
+) -> ParsedConversation:
+    """Parse content with the given platform's parser, detecting it if omitted.
+
+    content may be raw bytes, text or already-decoded JSON; it is decoded
+    once here and handed to the parser as an object. Text whose platform
+    cannot be detected is parsed as a generic Markdown transcript under
+    platform "unknown", and text detected as a JSON-only platform (e.g.
+    a transcript pasted with a chatgpt.com URL) under that platform.
+    Parser options (e.g. all_branches for ChatGPT)
+    are passed through; parsers ignore options they do not know.
+    """
+    content = decode_payload(content)
+    detected = not platform
+    if platform:
+        platform = platform.strip().lower()
+    else:
+        platform, _ = detect_platform(url=source_url, content_sample=content)
+
+    if not platform:
+        if isinstance(content, str):
+            return _parse_markdown_generic(content, "unknown", source_url)
+        raise ValueError("Could not detect platform; specify it explicitly")
+
+    cfg = PLATFORM_REGISTRY.get(platform)
+    if cfg is None:
+        raise ValueError(
+            f"Unsupported platform {platform!r}; "
+            f"expected one of {sorted(PLATFORM_REGISTRY)}"
+        )
+    if detected and isinstance(content, str) and cfg.export_formats == ["json"]:
+        return _parse_markdown_generic(content, platform, source_url)
+    return cfg.parse_fn(content, source_url, **options)
@@ -0,0 +1,209 @@
+"""Incremental feed of stored conversations into the RAG index (modules/rag)."""
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .storage import StorageEngine
+
+logger = logging.getLogger(__name__)
+
+RAG_DIR = Path(__file__).parent.parent / "rag"
+
+# Set CHAT_RAG_BRIDGE=0 to keep chat ingests out of the RAG index
+ENABLED = os.environ.get("CHAT_RAG_BRIDGE", "1") != "0"
+
+CONSUMER = "rag"
+
+
+def _indexer_class():
+    # Why: modules/rag uses flat imports (retriever.py: from indexer import ...)
+    if str(RAG_DIR) not in sys.path:
+        sys.path.insert(0, str(RAG_DIR))
+    from indexer import KnowledgeIndexer
+    return KnowledgeIndexer
+
+
+def conversation_chunks(conversation: Dict, max_chunk_chars: int = 2000) -> List[Dict]:
+    """Chunk a stored conversation the way consolidator.extract_knowledge_chunks
+    chunks exports, so both pipelines produce interchangeable chunks."""
+    chunks: List[Dict] = []
+    current = ""
+    count = 0
+
+    def flush() -> None:
+        if current.strip():
+            chunks.append({
+                "text": current.strip(),
+                "source": conversation["platform"],
+                "conversation_id": conversation["conversation_id"],
+                "title": conversation.get("title") or "",
+                "message_count": count,
+            })
+
+    for msg in conversation["messages"]:
+        text = f"[{msg.get('role', '')}]: {msg.get('content', '')}\n"
+        if len(current) + len(text) > max_chunk_chars:
+            flush()
+            current, count = text, 1
+        else:
+            current += text
+            count += 1
+    flush()
+    return chunks
+
+
+class RagBridge:
+    """Keeps the RAG index in step with the chat processor database.
+
+    A background thread follows the change feed - conversations past an
+    (ingested_at, conversation_id) watermark kept in chat_feed_watermarks;
+    re-ingested conversations get a new ingested_at and come round again.
+    Each batch is chunked and upserted into the index per conversation.
+    The index is saved once the feed is drained (a save rewrites all of
+    it), and only then does the watermark advance, so a crash re-indexes
+    conversations rather than skipping them.
+    """
+
+    def __init__(
+        self,
+        storage: StorageEngine,
+        index_dir: Optional[Path] = None,
+        batch_size: int = 100,
+        interval_s: float = 5.0,
+        max_chunk_chars: int = 2000,
+        consumer: str = CONSUMER,
+    ):
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+        self.storage = storage
+        self.index_dir = index_dir
+        self.batch_size = batch_size
+        self.interval_s = interval_s
+        self.max_chunk_chars = max_chunk_chars
+        self.consumer = consumer
+        self._indexer = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.metrics: Dict = {
+            "batches": 0,
+            "conversations_indexed": 0,
+            "chunks_added": 0,
+            "chunks_removed": 0,
+            "errors": 0,
+            "last_error": None,
+            "last_batch_ms": None,
+            "last_sync_at": None,
+        }
+
+    def _ensure_indexer(self):
+        if self._indexer is None:
+            self._indexer = _indexer_class()(index_dir=self.index_dir)
+            self._indexer.load()
+        return self._indexer
+
+    def _index_batch(self, indexer, watermark) -> List[Dict]:
+        """Chunk and upsert one batch past watermark, without saving."""
+        batch = list(islice(
+            self.storage.iter_export(after=watermark, batch_size=self.batch_size),
+            self.batch_size,
+        ))
+        if not batch:
+            return batch
+        start = time.perf_counter()
+        chunks: List[Dict] = []
+        for conversation in batch:
+            chunks.extend(conversation_chunks(conversation, self.max_chunk_chars))
+        removed, added = indexer.upsert_conversations(
+            chunks, {c["conversation_id"] for c in batch}
+        )
+        metrics = self.metrics
+        metrics["batches"] += 1
+        metrics["conversations_indexed"] += len(batch)
+        metrics["chunks_added"] += added
+        metrics["chunks_removed"] += removed
+        metrics["last_batch_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return batch
+
+    def sync(self) -> int:
+        """Index batches until the feed is drained, then save the index and
+        advance the watermark. Returns conversations indexed."""
+        with self._lock:
+            indexer = self._ensure_indexer()
+            watermark = self.storage.get_watermark(self.consumer)
+            total = 0
+            while not self._stop.is_set():
+                batch = self._index_batch(indexer, watermark)
+                if batch:
+                    total += len(batch)
+                    watermark = (batch[-1]["ingested_at"], batch[-1]["conversation_id"])
+                if len(batch) < self.batch_size:
+                    break
+            self.metrics["last_sync_at"] = datetime.utcnow().isoformat()
+            if total:
+                indexer.save()
+                self.storage.set_watermark(self.consumer, watermark)
+            return total
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="chat-rag-bridge", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                logger.exception("RAG bridge sync failed")
+                self.metrics["errors"] += 1
+                self.metrics["last_error"] = str(e)
+            self._stop.wait(self.interval_s)
+
+    def status(self) -> Dict:
+        """Watermark, backlog, lag and freshness of the RAG index."""
+        watermark = self.storage.get_watermark(self.consumer)
+        backlog = self.storage.feed_backlog(watermark)
+        now = datetime.utcnow()
+        oldest = backlog["oldest"]
+        last_sync = self.metrics["last_sync_at"]
+        status = {
+            "enabled": ENABLED,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "indexed_through": watermark[0] if watermark else None,
+            "pending_conversations": backlog["pending"],
+            # Age of the oldest conversation not yet indexed
+            "lag_s": (
+                round((now - datetime.fromisoformat(oldest)).total_seconds(), 3)
+                if oldest else 0.0
+            ),
+            "seconds_since_sync": (
+                round((now - datetime.fromisoformat(last_sync)).total_seconds(), 3)
+                if last_sync else None
+            ),
+            **self.metrics,
+        }
+        if self._indexer is not None:
+            stats = self._indexer.get_stats()
+            status["index"] = {
+                "chunks": stats.total_chunks,
+                "conversations": stats.total_conversations,
+                "index_dir": str(self._indexer.index_dir),
+            }
+        return status
@@ -1,27 +1,86 @@
 """FastAPI router for Chat Processor endpoints."""
+import asyncio
 import json
+import tempfile
+import zlib
+from contextlib import asynccontextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi import (
+    APIRouter, HTTPException, Query, UploadFile, File, Form, WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
-from .platforms import PLATFORM_REGISTRY, detect_platform, parse_conversation
-from .security import scan_messages
-from .analyzer import analyze_conversation
-from .storage import (
-    init_db,
-    save_conversation,
-    save_intelligence,
-    list_conversations,
-    get_conversation,
-    search_conversations,
+from .platforms import (
+    PLATFORM_REGISTRY,
+    decode_payload,
+    detect_platform,
+    parse_conversation,
 )
+from .scan_service import ScanService
+from .analysis_queue import AnalysisQueue
+from .analyzer import PROMPT_VERSION, AsyncAnalyzer
+from .bulk import BulkIngestManager
+from .jobs import IngestJobDispatcher, JobQueueFull
+from .models import ParsedConversation
+from .rag_bridge import ENABLED as RAG_BRIDGE_ENABLED, RagBridge
+from .storage import FACET_FIELDS, StorageEngine, get_engine
+
+
+@asynccontextmanager
+async def _lifespan(app):
+    _start_services()
+    # Resume ingest jobs interrupted by the last shutdown
+    await _JOBS.start()
+    if RAG_BRIDGE_ENABLED:
+        _RAG.start()
+    yield
+    await asyncio.to_thread(_RAG.stop)
+    await _JOBS.stop()
+    _SCAN_SERVICE.shutdown()
+    await _ANALYSIS.stop()
+
 
-router = APIRouter(prefix="/api/chat", tags=["chat_processor"])
+router = APIRouter(prefix="/api/chat", tags=["chat_processor"], lifespan=_lifespan)
 
 _DB_PATH = Path(__file__).parent.parent.parent / "chat_processor.db"
-init_db(_DB_PATH)
+
+_SCAN_SERVICE = ScanService()
+
+# Created by _start_services when the app starts, not at import: every
+# modules.chat_processor submodule imports this one via the package, and
+# that includes worker processes spawned by ScanService and
+# IngestJobDispatcher (spawn is the default on Windows), which must not
+# open the database or start threads.
+_STORAGE: Optional[StorageEngine] = None
+_BULK: Optional[BulkIngestManager] = None
+_ANALYSIS: Optional[AnalysisQueue] = None
+_JOBS: Optional[IngestJobDispatcher] = None
+_RAG: Optional[RagBridge] = None
+
+
+def _start_services() -> None:
+    global _STORAGE, _BULK, _ANALYSIS, _JOBS, _RAG
+    if _STORAGE is not None:
+        return
+    _STORAGE = get_engine(_DB_PATH)
+    _STORAGE.start_message_migration()
+    _BULK = BulkIngestManager(_STORAGE, scanner=_SCAN_SERVICE)
+    _ANALYSIS = AnalysisQueue(AsyncAnalyzer(), _STORAGE)
+    _JOBS = IngestJobDispatcher(
+        _STORAGE, _ANALYSIS, spool_dir=_DB_PATH.parent / "chat_jobs"
+    )
+    _RAG = RagBridge(_STORAGE)
+
+_UPLOAD_CHUNK = 1024 * 1024
+MAX_UPLOAD_BYTES = 128 * 1024 * 1024
+_RESULTS_POLL_S = 0.25
+_JOB_RETRY_AFTER_S = 5
+_EXPORT_CHUNK = 64 * 1024
 
 
 class IngestRequest(BaseModel):
@@ -29,6 +88,10 @@ class IngestRequest(BaseModel):
     platform: Optional[str] = None
     source_url: Optional[str] = None
     analyze: bool = True
+    # ChatGPT: emit every regeneration branch, not just the active one
+    all_branches: bool = False
+    # Also treat continuations of stored conversations as duplicates
+    near_duplicates: bool = False
 
 
 class DetectRequest(BaseModel):
@@ -39,18 +102,34 @@ class DetectRequest(BaseModel):
 @router.post("/ingest")
 async def ingest_conversation(req: IngestRequest) -> Dict:
     """Ingest a conversation from any supported platform."""
+    return await _ingest(
+        req.content, req.platform, req.source_url, req.analyze,
+        near_duplicates=req.near_duplicates,
+        all_branches=req.all_branches,
+    )
+
+
+async def _ingest(
+    content: Any,
+    platform: Optional[str],
+    source_url: Optional[str],
+    analyze: bool,
+    near_duplicates: bool = False,
+    **options: Any,
+) -> Dict:
+    """Parse, scan, store and queue analysis for one conversation.
+
+    content may be raw bytes, text or decoded JSON; it is decoded once,
+    by parse_conversation, off the event loop. Content already stored is
+    not written or analyzed again; the existing id is returned.
+    """
     try:
-        # Normalize content to string (may arrive as dict from JSON body)
-        raw_content = req.content
-        if isinstance(raw_content, (dict, list)):
-            import json as _json
-            content_str = _json.dumps(raw_content, ensure_ascii=False)
-        else:
-            content_str = str(raw_content)
-        conversation = parse_conversation(
-            content=content_str,
-            platform=req.platform,
-            source_url=req.source_url,
+        conversation = await asyncio.to_thread(
+            parse_conversation,
+            content=content,
+            platform=platform,
+            source_url=source_url,
+            **options,
         )
     except Exception as e:
         raise HTTPException(status_code=422, detail=f"Parse failed: {e}")
@@ -61,31 +140,64 @@ async def ingest_conversation(req: IngestRequest) -> Dict:
             detail="No messages extracted. Check format or platform.",
         )
 
-    findings = scan_messages(conversation.messages)
+    # Why: skip the secret scan for content that is already stored
+    duplicate = await asyncio.to_thread(
+        _STORAGE.find_duplicate, conversation, near_duplicates
+    )
+    if duplicate is not None and duplicate[1] != "extended":
+        return await _duplicate_response(conversation, *duplicate)
+
+    scan = await _SCAN_SERVICE.scan(conversation.messages)
+    findings = scan.findings
     conversation.security_findings = [f.to_dict() for f in findings]
 
     if findings:
         conversation.warnings.append(
             f"{len(findings)} security finding(s) detected"
         )
+    if not scan.complete:
+        conversation.warnings.append(scan.warning)
 
-    cid = save_conversation(conversation, _DB_PATH)
+    cid, match = await asyncio.to_thread(
+        _STORAGE.save_conversation_unique, conversation, near_duplicates
+    )
+    if match in ("exact", "contained"):
+        return await _duplicate_response(conversation, cid, match)
 
-    intelligence = None
-    if req.analyze:
-        intel = analyze_conversation(conversation)
-        if intel:
-            save_intelligence(intel, _DB_PATH)
-            intelligence = intel.to_dict()
+    # Analysis runs in the background; poll /conversations/{id}/analysis
+    analysis = _ANALYSIS.enqueue(conversation) if analyze else "skipped"
 
     return {
         "status": "ok",
         "conversation_id": cid,
+        "duplicate": match,
         "platform": conversation.platform,
         "message_count": len(conversation.messages),
         "security_findings": len(findings),
+        "security_scan_complete": scan.complete,
         "warnings": conversation.warnings,
-        "intelligence": intelligence,
+        "intelligence": None,
+        "analysis": analysis,
+    }
+
+
+async def _duplicate_response(
+    conversation: ParsedConversation, existing_id: str, match: str
+) -> Dict:
+    # Why: the upload itself may not have been scanned; report what the
+    # stored conversation was found to contain
+    findings = await asyncio.to_thread(_STORAGE.get_security_findings, existing_id)
+    return {
+        "status": "duplicate",
+        "conversation_id": existing_id,
+        "duplicate": match,
+        "platform": conversation.platform,
+        "message_count": len(conversation.messages),
+        "security_findings": len(findings) if findings is not None else None,
+        "security_scan_complete": None,
+        "warnings": [],
+        "intelligence": None,
+        "analysis": "skipped",
     }
 
 
@@ -137,26 +249,247 @@ async def list_platforms() -> Dict:
 
 @router.get("/conversations")
 async def list_convs(
-    platform: Optional[str] = None, limit: int = 50
+    platform: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
 ) -> Dict:
-    """List stored conversations (metadata only)."""
-    convs = list_conversations(limit=limit, platform=platform, db_path=_DB_PATH)
-    return {"conversations": convs, "total": len(convs)}
+    """List stored conversations (metadata only), newest first.
+
+    Pass next_cursor back as cursor for the following page; total is the
+    number of stored conversations matching the platform filter.
+    """
+    limit = max(1, min(limit, 500))
+    try:
+        page = await asyncio.to_thread(
+            _STORAGE.list_conversations_page, limit, platform, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page["count"] = len(page["conversations"])
+    return page
+
+
+@router.get("/facets")
+async def facet_counts(
+    facet_type: Optional[str] = None,
+    limit: int = 20,
+) -> Dict:
+    """Top intelligence facet values (topic, technology, decision) by
+    number of analyzed conversations; all types unless facet_type is set."""
+    limit = max(1, min(limit, 500))
+    types = [facet_type] if facet_type else list(FACET_FIELDS)
+    try:
+        return {
+            t: await asyncio.to_thread(_STORAGE.facet_counts, t, limit) for t in types
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/facets/cooccurrence")
+async def facet_cooccurrence(
+    facet_type: str,
+    value: Optional[str] = None,
+    with_type: Optional[str] = None,
+    limit: int = 20,
+) -> Dict:
+    """Facets seen alongside (facet_type, value), or without value the most
+    frequent facet_type x with_type pairs."""
+    limit = max(1, min(limit, 500))
+    try:
+        rows = await asyncio.to_thread(
+            _STORAGE.facet_cooccurrence, facet_type, value, with_type, limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "facet_type": facet_type,
+        "value": value,
+        "with_type": with_type,
+        "results": rows,
+    }
+
+
+@router.get("/facets/conversations")
+async def list_convs_by_facets(
+    topic: List[str] = Query(default=[]),
+    technology: List[str] = Query(default=[]),
+    decision: List[str] = Query(default=[]),
+    platform: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> Dict:
+    """Conversations carrying every given facet (e.g. ?technology=Python
+    &topic=docker), newest first, paged like /conversations."""
+    facets = (
+        [("topic", v) for v in topic]
+        + [("technology", v) for v in technology]
+        + [("decision", v) for v in decision]
+    )
+    limit = max(1, min(limit, 500))
+    try:
+        page = await asyncio.to_thread(
+            _STORAGE.list_conversations_by_facets, facets, limit, platform, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page["count"] = len(page["conversations"])
+    return page
 
 
 @router.get("/conversations/{conversation_id}")
 async def get_conv(conversation_id: str) -> Dict:
     """Get full conversation including messages and intelligence."""
-    conv = get_conversation(conversation_id, _DB_PATH)
+    conv = await asyncio.to_thread(_STORAGE.get_conversation, conversation_id)
     if not conv:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return conv
 
 
+@router.get("/conversations/{conversation_id}/messages")
+async def get_conv_messages(
+    conversation_id: str, after_seq: int = -1, limit: int = 50
+) -> Dict:
+    """Page through a conversation's messages; pass next_after_seq back as after_seq."""
+    limit = max(1, min(limit, 500))
+    page = await asyncio.to_thread(
+        _STORAGE.get_messages, conversation_id, after_seq=after_seq, limit=limit
+    )
+    if page is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return page
+
+
+@router.get("/conversations/{conversation_id}/analysis")
+async def get_conv_analysis(conversation_id: str) -> Dict:
+    """Background analysis status and, once done, the intelligence."""
+    stored = await asyncio.to_thread(_STORAGE.get_intelligence, conversation_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    intelligence = stored["intelligence"]
+    status = _ANALYSIS.status(conversation_id)
+    if status is None:
+        status = "done" if intelligence else "not_queued"
+    return {
+        "conversation_id": conversation_id,
+        "status": status,
+        "intelligence": intelligence,
+        "queue": _ANALYSIS.stats(),
+    }
+
+
+@router.get("/analysis/cache")
+async def analysis_cache_stats() -> Dict:
+    """Analysis cache entries and hits per model and prompt version."""
+    return {
+        "prompt_version": PROMPT_VERSION,
+        "entries": await asyncio.to_thread(_STORAGE.analysis_cache_stats),
+        "session": _ANALYSIS.stats(),
+    }
+
+
+@router.delete("/analysis/cache/{model:path}")
+async def invalidate_analysis_cache(
+    model: str, prompt_version: Optional[str] = None
+) -> Dict:
+    """Drop cached analyses for a model, e.g. after a model upgrade."""
+    removed = await asyncio.to_thread(
+        _STORAGE.invalidate_analysis_cache, model, prompt_version
+    )
+    return {"model": model, "prompt_version": prompt_version, "removed": removed}
+
+
+@router.get("/storage/compression")
+async def storage_compression_report(sample_size: int = 200) -> Dict:
+    """Bytes saved by payload compression and its decode latency."""
+    sample_size = max(0, min(sample_size, 2000))
+    return await asyncio.to_thread(_STORAGE.compression_report, sample_size)
+
+
+@router.post("/storage/recompress", status_code=202)
+async def storage_recompress() -> Dict:
+    """Re-encode stored payloads with the configured codec in the background.
+
+    The codec is set with CHAT_DB_COMPRESSION (none, zlib, zstd, auto).
+    """
+    if not _STORAGE.start_recompression():
+        raise HTTPException(status_code=409, detail="Recompression already running")
+    return {"status": "started", "compression": _STORAGE.codec.compression}
+
+
+@router.get("/export")
+async def export_conversations(
+    platform: Optional[str] = None,
+    since: Optional[str] = None,
+    has_intelligence: Optional[bool] = None,
+    gzip: bool = False,
+) -> StreamingResponse:
+    """Stream stored conversations with messages and intelligence as NDJSON.
+
+    One conversation per line, oldest ingest first. since is an ISO
+    timestamp compared with ingested_at (inclusive), so an incremental
+    pull can resume from the last ingested_at it saw. With gzip=true the
+    stream is gzip-encoded (Content-Encoding: gzip).
+    """
+    if since is not None:
+        try:
+            datetime.fromisoformat(since)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid since: {since!r}")
+    rows = _STORAGE.iter_export(
+        platform=platform, since=since, has_intelligence=has_intelligence
+    )
+    headers = {"Content-Disposition": 'attachment; filename="chat_export.ndjson"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    # A sync iterator: Starlette pulls it from a worker thread
+    return StreamingResponse(
+        _export_chunks(rows, gzip), media_type="application/x-ndjson", headers=headers
+    )
+
+
+def _export_chunks(rows: Iterator[Dict], compress: bool) -> Iterator[bytes]:
+    """NDJSON lines coalesced into ~_EXPORT_CHUNK byte chunks, optionally gzipped."""
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buf = bytearray()
+    for row in rows:
+        buf += json.dumps(row, ensure_ascii=False).encode("utf-8")
+        buf += b"\n"
+        if len(buf) >= _EXPORT_CHUNK:
+            chunk = gz.compress(bytes(buf)) if gz else bytes(buf)
+            buf.clear()
+            if chunk:
+                yield chunk
+    tail = gz.compress(bytes(buf)) + gz.flush() if gz else bytes(buf)
+    if tail:
+        yield tail
+
+
+@router.get("/rag/status")
+async def rag_bridge_status() -> Dict:
+    """Freshness and lag of the RAG index fed from this database."""
+    return await asyncio.to_thread(_RAG.status)
+
+
+@router.post("/rag/sync")
+async def rag_bridge_sync() -> Dict:
+    """Index everything past the watermark now instead of at the next poll."""
+    indexed = await asyncio.to_thread(_RAG.sync)
+    return {"indexed": indexed, **await asyncio.to_thread(_RAG.status)}
+
+
 @router.get("/search")
-async def search_convs(q: str, limit: int = 20) -> Dict:
-    """Search conversations by content."""
-    results = search_conversations(q, limit=limit, db_path=_DB_PATH)
+async def search_convs(
+    q: str,
+    limit: int = 20,
+    platform: Optional[str] = None,
+    prefix: bool = True,
+) -> Dict:
+    """Full-text search over titles and messages, ranked by BM25."""
+    limit = max(1, min(limit, 500))
+    results = await asyncio.to_thread(
+        _STORAGE.search_conversations, q, limit=limit, platform=platform, prefix=prefix
+    )
     return {"query": q, "results": results, "count": len(results)}
 
 
@@ -165,23 +498,205 @@ async def ingest_upload(
     file: UploadFile = File(...),
     platform: Optional[str] = Form(None),
     analyze: bool = Form(True),
+    all_branches: bool = Form(False),
+    near_duplicates: bool = Form(False),
 ) -> Dict:
-    """Upload a conversation file (JSON, MD, TXT)."""
-    raw = await file.read()
+    """Upload a conversation file (JSON, MD, TXT).
+
+    The spooled upload is read in chunks into a single buffer and decoded
+    once; files over MAX_UPLOAD_BYTES belong on /ingest/bulk.
+    """
+    buf = bytearray()
+    while chunk := await file.read(_UPLOAD_CHUNK):
+        buf += chunk
+        if len(buf) > MAX_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=(
+                    f"Upload exceeds {MAX_UPLOAD_BYTES} bytes; "
+                    "use /api/chat/ingest/bulk for full exports"
+                ),
+            )
     try:
-        content_str = raw.decode("utf-8")
-    except Exception:
+        content = await asyncio.to_thread(decode_payload, buf)
+    except ValueError:
         raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+    del buf
+    return await _ingest(
+        content, platform, f"upload://{file.filename}", analyze,
+        near_duplicates=near_duplicates,
+        all_branches=all_branches,
+    )
 
+
+@router.post("/ingest/bulk")
+async def ingest_bulk(
+    file: UploadFile = File(...),
+    platform: Optional[str] = Form(None),
+    batch_size: int = Form(500),
+) -> Dict:
+    """Ingest a full platform export (e.g. ChatGPT conversations.json).
+
+    The upload is spooled to disk and processed in the background; poll
+    the job or stream its per-conversation results as NDJSON.
+    """
+    with tempfile.NamedTemporaryFile(
+        prefix="chat-bulk-", suffix=".json", delete=False
+    ) as tmp:
+        while chunk := await file.read(_UPLOAD_CHUNK):
+            await asyncio.to_thread(tmp.write, chunk)
     try:
-        content: Any = json.loads(content_str)
-    except json.JSONDecodeError:
-        content = content_str
-
-    req = IngestRequest(
-        content=content,
-        platform=platform,
-        source_url=f"upload://{file.filename}",
-        analyze=analyze,
+        job = _BULK.submit(
+            Path(tmp.name),
+            platform=platform,
+            batch_size=batch_size,
+            source_url=f"upload://{file.filename}",
+        )
+    except ValueError as e:
+        Path(tmp.name).unlink(missing_ok=True)
+        raise HTTPException(status_code=422, detail=str(e))
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "status_url": f"/api/chat/ingest/bulk/{job.job_id}",
+        "results_url": f"/api/chat/ingest/bulk/{job.job_id}/results",
+    }
+
+
+@router.get("/ingest/bulk/{job_id}")
+async def bulk_job_status(job_id: str) -> Dict:
+    """Progress and counters of a bulk ingest job."""
+    job = _BULK.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.get("/ingest/bulk/{job_id}/results")
+async def bulk_job_results(job_id: str) -> StreamingResponse:
+    """Stream per-conversation results as NDJSON while the job runs.
+
+    The final line is {"job": <status>} once the job has finished.
+    """
+    job = _BULK.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def _stream():
+        sent = 0
+        while True:
+            finished = job.finished
+            results = job.results
+            while sent < len(results):
+                yield json.dumps(results[sent], ensure_ascii=False) + "\n"
+                sent += 1
+            if finished:
+                break
+            await asyncio.sleep(_RESULTS_POLL_S)
+        yield json.dumps({"job": job.to_dict()}) + "\n"
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+
+def _job_response(job: Dict) -> Dict:
+    job_id = job["job_id"]
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "status_url": f"/api/chat/jobs/{job_id}",
+        "events_url": f"/api/chat/jobs/{job_id}/events",
+    }
+
+
+def _queue_full(e: JobQueueFull) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(e), "queue": _JOBS.stats()},
+        headers={"Retry-After": str(_JOB_RETRY_AFTER_S)},
     )
-    return await ingest_conversation(req)
+
+
+@router.post("/jobs", status_code=202)
+async def submit_ingest_job(req: IngestRequest):
+    """Queue an ingest in the background; returns 429 when the queue is full.
+
+    Follow progress via GET /jobs/{id} or the /jobs/{id}/events WebSocket.
+    """
+    try:
+        job = await _JOBS.submit(
+            req.content, req.platform, req.source_url, req.analyze,
+            near_duplicates=req.near_duplicates,
+            all_branches=req.all_branches,
+        )
+    except JobQueueFull as e:
+        return _queue_full(e)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return _job_response(job)
+
+
+@router.post("/jobs/upload", status_code=202)
+async def submit_ingest_job_upload(
+    file: UploadFile = File(...),
+    platform: Optional[str] = Form(None),
+    analyze: bool = Form(True),
+    all_branches: bool = Form(False),
+    near_duplicates: bool = Form(False),
+):
+    """Queue an uploaded conversation file; it is spooled to disk unparsed."""
+    try:
+        _JOBS.check_capacity()
+    except JobQueueFull as e:
+        return _queue_full(e)
+    path = _JOBS.new_payload_path()
+    size = 0
+    with path.open("wb") as fp:
+        while chunk := await file.read(_UPLOAD_CHUNK):
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                fp.close()
+                path.unlink(missing_ok=True)
+                raise HTTPException(
+                    status_code=413,
+                    detail=(
+                        f"Upload exceeds {MAX_UPLOAD_BYTES} bytes; "
+                        "use /api/chat/ingest/bulk for full exports"
+                    ),
+                )
+            await asyncio.to_thread(fp.write, chunk)
+    try:
+        job = await _JOBS.submit_file(
+            path, platform, f"upload://{file.filename}", analyze,
+            near_duplicates=near_duplicates,
+            all_branches=all_branches,
+        )
+    except JobQueueFull as e:
+        return _queue_full(e)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}")
+async def ingest_job_status(job_id: str) -> Dict:
+    """Status, stage, progress and (once completed) result of an ingest job."""
+    job = await asyncio.to_thread(_JOBS.get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {**job, "queue": _JOBS.stats()}
+
+
+@router.websocket("/jobs/{job_id}/events")
+async def ingest_job_events(websocket: WebSocket, job_id: str) -> None:
+    """Push the job's state on connect and on every change until it finishes."""
+    await websocket.accept()
+    sent = False
+    try:
+        async for event in _JOBS.events(job_id):
+            await websocket.send_json(event)
+            sent = True
+        if not sent:
+            await websocket.send_json({"job_id": job_id, "error": "Job not found"})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
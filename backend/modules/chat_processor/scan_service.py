@@ -0,0 +1,212 @@
+"""Security scanning service - offloads large scans to a process pool."""
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from .models import ParsedMessage
+from .security import SecurityFinding, merge_findings, scan_items
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScanReport:
+    findings: List[SecurityFinding] = field(default_factory=list)
+    complete: bool = True
+    scanned_messages: int = 0
+    total_messages: int = 0
+    elapsed_s: float = 0.0
+    # Chunks dropped because their scan raised, or missed the time budget
+    failed_chunks: int = 0
+    timed_out_chunks: int = 0
+
+    @property
+    def warning(self) -> Optional[str]:
+        if self.complete:
+            return None
+        reasons = []
+        if self.failed_chunks:
+            reasons.append(f"{self.failed_chunks} chunk(s) failed")
+        if self.timed_out_chunks:
+            reasons.append(
+                f"{self.timed_out_chunks} chunk(s) exceeded the time budget"
+            )
+        return (
+            f"Security scan incomplete: {self.scanned_messages}/"
+            f"{self.total_messages} messages scanned ({'; '.join(reasons)})"
+        )
+
+
+class ScanService:
+    """Scan conversations without blocking the event loop.
+
+    Small conversations are scanned inline. Larger ones are split into
+    chunks of consecutive messages, scanned in a process pool (regex work
+    holds the GIL) and merged in message order. Chunks that fail or are
+    not finished within the time budget are dropped and the report is
+    marked incomplete, counting each kind separately. A pool broken by a
+    crashed worker fails its chunks and is replaced for the next scan.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        chunk_chars: int = 1_000_000,
+        inline_threshold_chars: int = 200_000,
+        time_budget_s: float = 10.0,
+    ):
+        if chunk_chars < 1:
+            raise ValueError(f"chunk_chars must be >= 1, got {chunk_chars}")
+        if time_budget_s <= 0:
+            raise ValueError(f"time_budget_s must be > 0, got {time_budget_s}")
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_chars = chunk_chars
+        self.inline_threshold_chars = inline_threshold_chars
+        self.time_budget_s = time_budget_s
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def _chunk(
+        self, messages: List[ParsedMessage]
+    ) -> List[List[Tuple[int, str, str]]]:
+        chunks: List[List[Tuple[int, str, str]]] = []
+        current: List[Tuple[int, str, str]] = []
+        size = 0
+        for i, msg in enumerate(messages):
+            current.append((i, msg.role, msg.content))
+            size += len(msg.content)
+            if size >= self.chunk_chars:
+                chunks.append(current)
+                current, size = [], 0
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def scan(
+        self,
+        messages: List[ParsedMessage],
+        time_budget_s: Optional[float] = None,
+    ) -> ScanReport:
+        """Scan messages, returning partial findings if the budget runs out."""
+        started = time.perf_counter()
+        if self._is_small(messages):
+            return self._scan_inline(messages, started)
+
+        pool = self._get_pool()
+        chunks = self._chunk(messages)
+        futures = [asyncio.wrap_future(f) for f in self._submit(pool, chunks)]
+        await asyncio.wait(futures, timeout=self._budget(time_budget_s))
+        return self._report(messages, chunks, futures, pool, started)
+
+    def scan_blocking(
+        self,
+        messages: List[ParsedMessage],
+        time_budget_s: Optional[float] = None,
+    ) -> ScanReport:
+        """scan() for callers on a worker thread, such as bulk ingest."""
+        started = time.perf_counter()
+        if self._is_small(messages):
+            return self._scan_inline(messages, started)
+
+        pool = self._get_pool()
+        chunks = self._chunk(messages)
+        futures = self._submit(pool, chunks)
+        wait(futures, timeout=self._budget(time_budget_s))
+        return self._report(messages, chunks, futures, pool, started)
+
+    def _is_small(self, messages: List[ParsedMessage]) -> bool:
+        total_chars = sum(len(m.content) for m in messages)
+        return total_chars <= self.inline_threshold_chars
+
+    def _budget(self, time_budget_s: Optional[float]) -> float:
+        return time_budget_s if time_budget_s is not None else self.time_budget_s
+
+    @staticmethod
+    def _scan_inline(messages: List[ParsedMessage], started: float) -> ScanReport:
+        items = [(i, m.role, m.content) for i, m in enumerate(messages)]
+        return ScanReport(
+            findings=merge_findings([scan_items(items)]),
+            scanned_messages=len(messages),
+            total_messages=len(messages),
+            elapsed_s=time.perf_counter() - started,
+        )
+
+    @staticmethod
+    def _submit(
+        pool: ProcessPoolExecutor, chunks: List[List[Tuple[int, str, str]]]
+    ) -> List[Future]:
+        futures = []
+        for chunk in chunks:
+            try:
+                future = pool.submit(scan_items, chunk)
+            except BrokenProcessPool as e:
+                future = Future()
+                future.set_exception(e)
+            futures.append(future)
+        return futures
+
+    def _report(
+        self,
+        messages: List[ParsedMessage],
+        chunks: List[List[Tuple[int, str, str]]],
+        futures: list,
+        pool: ProcessPoolExecutor,
+        started: float,
+    ) -> ScanReport:
+        results = []
+        scanned = 0
+        failed = timed_out = 0
+        for chunk, future in zip(chunks, futures):
+            if not future.done():
+                # Why: a chunk already running in a worker cannot be
+                # interrupted; its result is simply discarded
+                future.cancel()
+                timed_out += 1
+                continue
+            if future.cancelled():
+                # e.g. the pool was shut down under the scan
+                failed += 1
+                continue
+            if future.exception() is not None:
+                logger.warning("Security scan chunk failed: %s", future.exception())
+                if isinstance(future.exception(), BrokenProcessPool):
+                    self._replace_pool(pool)
+                failed += 1
+                continue
+            results.append(future.result())
+            scanned += len(chunk)
+
+        complete = not (failed or timed_out)
+        report = ScanReport(
+            findings=merge_findings(results),
+            complete=complete,
+            scanned_messages=scanned,
+            total_messages=len(messages),
+            elapsed_s=time.perf_counter() - started,
+            failed_chunks=failed,
+            timed_out_chunks=timed_out,
+        )
+        if not complete:
+            logger.warning(report.warning)
+        return report
+
+    def _replace_pool(self, pool: ProcessPoolExecutor) -> None:
+        # Why: a crashed worker process poisons the whole pool; every scan
+        # in flight sees it, only the first replaces it
+        if self._pool is pool:
+            self._pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -1,7 +1,10 @@
 """Security scanner for chat conversations."""
+import hashlib
 import re
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from .models import ParsedMessage, SecurityLevel
 
@@ -35,41 +38,173 @@ _SECRET_PATTERNS: Dict[str, str] = {
     "GitHub Token": r"ghp_[a-zA-Z0-9]{36}",
     "JWT Token": r"eyJ[a-zA-Z0-9_-]*\.eyJ[a-zA-Z0-9_-]*\.[a-zA-Z0-9_-]*",
     "Private Key": r"-----BEGIN (?:RSA |EC )?PRIVATE KEY-----",
-    "Generic API Key": r"api[_-]?key[\s:=]+[" + _QCHARS + r"]?([a-zA-Z0-9_-]{20,})[" + _QCHARS + r"]?",
+    "Generic API Key": r"api[_-]?key[\s:=]+[" + _QCHARS + r"]?(?:[a-zA-Z0-9_-]{20,})[" + _QCHARS + r"]?",
 }
 
 _PII_PATTERNS: Dict[str, str] = {
-    "SSN": r"\d{3}-\d{2}-\d{4}",
-    "Credit Card": r"\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}",
+    "SSN": r"\b\d{3}-\d{2}-\d{4}\b",
+    "Credit Card": r"\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b",
     "Password literal": r"password\s*=\s*[" + _QCHARS + r"][^" + _QCHARS + r"]{4,}[" + _QCHARS + r"]",
 }
 
-_detected_secrets: set = set()
+_SECRET_REMEDIATION = "Remove secret and rotate it immediately"
+_PII_REMEDIATION = "Remove PII or ensure GDPR compliance"
 
+# (name, type, lowercase literal every match must contain). A pattern only
+# runs when its literal occurs in the lowercased message, which C-level
+# substring search rules out for most messages at memory speed.
+_PREFILTERED: List[Tuple[str, str, str]] = [
+    ("OpenAI API Key", "secret", "sk-"),
+    ("OpenRouter Key", "secret", "sk-or-v1-"),
+    ("Anthropic Key", "secret", "sk-ant-api03-"),
+    ("AWS Access Key", "secret", "akia"),
+    ("GitHub Token", "secret", "ghp_"),
+    ("JWT Token", "secret", "eyj"),
+    ("Private Key", "secret", "-----begin"),
+    ("Generic API Key", "secret", "api"),
+    ("Password literal", "pii", "password"),
+]
 
-def scan_messages(messages: List[ParsedMessage]) -> List[SecurityFinding]:
-    findings: List[SecurityFinding] = []
-    for i, msg in enumerate(messages):
-        content = msg.content
-        for name, pattern in _SECRET_PATTERNS.items():
-            for match in re.finditer(pattern, content, re.IGNORECASE):
-                val = match.group(0)
-                if val not in _detected_secrets:
-                    _detected_secrets.add(val)
-                    findings.append(SecurityFinding(
-                        level=SecurityLevel.CRITICAL.value,
-                        type="secret",
-                        description=f"{name} detected",
-                        location=f"message_{i} ({msg.role})",
-                        remediation="Remove secret and rotate it immediately",
-                    ))
-        for name, pattern in _PII_PATTERNS.items():
-            if re.search(pattern, content, re.IGNORECASE):
-                findings.append(SecurityFinding(
+_COMPILED: Dict[str, re.Pattern] = {
+    name: re.compile(pattern, re.IGNORECASE)
+    for name, pattern in {**_SECRET_PATTERNS, **_PII_PATTERNS}.items()
+}
+
+# SSN and Credit Card share a leading \b\d{3}, so one pass finds both
+_DIGIT_PII_RE = re.compile(
+    r"\b\d{3}(?:(?P<ssn>-\d{2}-\d{4}\b)"
+    r"|(?P<card>\d[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b))"
+)
+_DIGIT_PII_NAMES = {"ssn": "SSN", "card": "Credit Card"}
+
+
+class SecretCache:
+    """Bounded LRU of hashed secret values seen across conversations.
+
+    Only SHA-256 digests are kept, never the secrets themselves.
+    """
+
+    def __init__(self, maxsize: int = 10_000):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be >= 1, got {maxsize}")
+        self.maxsize = maxsize
+        self._digests: "OrderedDict[bytes, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def seen(self, digest: bytes) -> bool:
+        """Record digest; return True if it was already present."""
+        with self._lock:
+            if digest in self._digests:
+                self._digests.move_to_end(digest)
+                return True
+            self._digests[digest] = None
+            if len(self._digests) > self.maxsize:
+                self._digests.popitem(last=False)
+            return False
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+
+def _digest(value: str) -> bytes:
+    return hashlib.sha256(value.encode("utf-8", errors="replace")).digest()
+
+
+def _iter_matches(content: str) -> Iterator[Tuple[str, str, str]]:
+    """Yield (type, name, value) for every secret and the first hit of each PII type."""
+    lowered = content.lower()
+    for name, kind, literal in _PREFILTERED:
+        if literal not in lowered:
+            continue
+        pattern = _COMPILED[name]
+        if kind == "secret":
+            for m in pattern.finditer(content):
+                yield kind, name, m.group()
+        else:
+            m = pattern.search(content)
+            if m:
+                yield kind, name, m.group()
+
+    m = _DIGIT_PII_RE.search(content)
+    if m:
+        name = _DIGIT_PII_NAMES[m.lastgroup]
+        yield "pii", name, m.group()
+        # Why: matches of the combined pattern cannot overlap, so look for
+        # the other type with its own pattern
+        other = "Credit Card" if name == "SSN" else "SSN"
+        m = _COMPILED[other].search(content)
+        if m:
+            yield "pii", other, m.group()
+
+
+def scan_items(
+    items: List[Tuple[int, str, str]],
+) -> List[Tuple[SecurityFinding, Optional[bytes]]]:
+    """Scan (index, role, content) items; the building block for scan_messages.
+
+    Returns findings paired with the secret's digest (None for PII) so
+    results of separately scanned chunks can be deduplicated when merged.
+    Secrets are deduplicated within items. Module-level so it can run in a
+    worker process.
+    """
+    results: List[Tuple[SecurityFinding, Optional[bytes]]] = []
+    seen_secrets: set = set()
+    for i, role, content in items:
+        location = f"message_{i} ({role})"
+        seen_pii: set = set()
+        for kind, name, value in _iter_matches(content):
+            if kind == "secret":
+                digest = _digest(value)
+                if digest in seen_secrets:
+                    continue
+                seen_secrets.add(digest)
+                results.append((SecurityFinding(
+                    level=SecurityLevel.CRITICAL.value,
+                    type="secret",
+                    description=f"{name} detected",
+                    location=location,
+                    remediation=_SECRET_REMEDIATION,
+                ), digest))
+            elif name not in seen_pii:
+                seen_pii.add(name)
+                results.append((SecurityFinding(
                     level=SecurityLevel.HIGH.value,
                     type="pii",
                     description=f"{name} detected",
-                    location=f"message_{i} ({msg.role})",
-                    remediation="Remove PII or ensure GDPR compliance",
-                ))
+                    location=location,
+                    remediation=_PII_REMEDIATION,
+                ), None))
+    return results
+
+
+def merge_findings(
+    chunk_results: Iterable[List[Tuple[SecurityFinding, Optional[bytes]]]],
+    global_cache: Optional[SecretCache] = None,
+) -> List[SecurityFinding]:
+    """Merge per-chunk scan_items results in order, deduplicating secrets."""
+    findings: List[SecurityFinding] = []
+    seen_secrets: set = set()
+    for results in chunk_results:
+        for finding, digest in results:
+            if digest is not None:
+                if digest in seen_secrets:
+                    continue
+                seen_secrets.add(digest)
+                if global_cache is not None and global_cache.seen(digest):
+                    continue
+            findings.append(finding)
     return findings
+
+
+def scan_messages(
+    messages: List[ParsedMessage],
+    global_cache: Optional[SecretCache] = None,
+) -> List[SecurityFinding]:
+    """Scan messages for secrets and PII using precompiled patterns.
+
+    A secret is reported once per conversation; with global_cache it is
+    also suppressed if already reported for an earlier conversation.
+    PII is reported at most once per type per message.
+    """
+    items = [(i, msg.role, msg.content) for i, msg in enumerate(messages)]
+    return merge_findings([scan_items(items)], global_cache)
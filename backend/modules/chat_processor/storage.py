@@ -1,121 +1,1876 @@
 """SQLite storage for parsed conversations and intelligence."""
+import base64
 import json
+import logging
+import os
+import queue
+import re
 import sqlite3
-from datetime import datetime
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from .models import ConversationIntelligence, ParsedConversation
+from .codec import (
+    FORMAT_NAMES,
+    FORMAT_ZSTD,
+    PayloadCodec,
+    train_dictionary,
+    zstandard,
+)
+from .models import (
+    PREFIX_MESSAGES,
+    ConversationIntelligence,
+    ParsedConversation,
+    message_hash,
+    sequence_hash,
+)
+
+logger = logging.getLogger(__name__)
 
 _DEFAULT_DB = Path(__file__).parent.parent.parent / "chat_processor.db"
 
+# Payload encoding for new writes: none, zlib, zstd or auto (see codec.py)
+_DEFAULT_COMPRESSION = os.environ.get("CHAT_DB_COMPRESSION", "none")
 
-def _get_conn(db_path: Path = _DEFAULT_DB) -> sqlite3.Connection:
-    db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(db_path), timeout=30)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    return conn
+# Applied once per connection when it is opened
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=30000",
+)
 
+# Statement texts are module constants so every call reuses the
+# connection's prepared-statement cache
 
-def init_db(db_path: Path = _DEFAULT_DB) -> None:
-    """Create tables if they do not exist."""
-    conn = _get_conn(db_path)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS chat_conversations (
-            conversation_id TEXT PRIMARY KEY,
-            platform TEXT NOT NULL,
-            title TEXT,
-            source_url TEXT,
-            message_count INTEGER DEFAULT 0,
-            created_at TEXT,
-            ingested_at TEXT NOT NULL,
-            messages_json TEXT NOT NULL,
-            warnings_json TEXT,
-            security_findings_json TEXT
-        )
-    """)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS chat_intelligence (
-            conversation_id TEXT PRIMARY KEY,
-            platform TEXT,
-            summary TEXT,
-            main_topics_json TEXT,
-            technologies_json TEXT,
-            decisions_json TEXT,
-            code_artifacts_json TEXT,
-            knowledge_json TEXT,
-            osint_relevance TEXT,
-            analyzed_at TEXT NOT NULL
-        )
-    """)
-    conn.execute(
-        "CREATE INDEX IF NOT EXISTS idx_cc_platform ON chat_conversations(platform)"
+# Message rows are the stored copy of message text; messages_json is ''
+# for conversations saved or migrated since. Why not WITHOUT ROWID: long
+# content is kept inline in the primary-key b-tree, which bloats it
+_MESSAGES_TABLE = """
+    CREATE TABLE IF NOT EXISTS chat_messages (
+        conversation_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        ts TEXT,
+        message_id TEXT,
+        metadata_json TEXT,
+        PRIMARY KEY (conversation_id, seq)
+    )
+    """
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS chat_conversations (
+        conversation_id TEXT PRIMARY KEY,
+        platform TEXT NOT NULL,
+        title TEXT,
+        source_url TEXT,
+        message_count INTEGER DEFAULT 0,
+        created_at TEXT,
+        ingested_at TEXT NOT NULL,
+        messages_json TEXT NOT NULL,
+        warnings_json TEXT,
+        security_findings_json TEXT,
+        fingerprint TEXT,
+        prefix_fingerprint TEXT,
+        storage_format INTEGER NOT NULL DEFAULT 0,
+        payload_bytes INTEGER
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS chat_intelligence (
+        conversation_id TEXT PRIMARY KEY,
+        platform TEXT,
+        summary TEXT,
+        main_topics_json TEXT,
+        technologies_json TEXT,
+        decisions_json TEXT,
+        code_artifacts_json TEXT,
+        knowledge_json TEXT,
+        osint_relevance TEXT,
+        analyzed_at TEXT NOT NULL,
+        tokens_used INTEGER NOT NULL DEFAULT 0
     )
-    conn.execute(
-        "CREATE INDEX IF NOT EXISTS idx_cc_ingested ON chat_conversations(ingested_at)"
+    """,
+    _MESSAGES_TABLE,
+    """
+    CREATE TABLE IF NOT EXISTS chat_analysis_cache (
+        content_hash TEXT NOT NULL,
+        model TEXT NOT NULL,
+        prompt_version TEXT NOT NULL,
+        result_json TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0,
+        last_hit_at TEXT,
+        PRIMARY KEY (content_hash, model, prompt_version)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS chat_jobs (
+        job_id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        status TEXT NOT NULL,
+        stage TEXT,
+        progress REAL NOT NULL DEFAULT 0,
+        params_json TEXT NOT NULL,
+        payload_path TEXT,
+        result_json TEXT,
+        error TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
     )
-    conn.commit()
-    conn.close()
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_cj_status ON chat_jobs(status, created_at)",
+    """
+    CREATE TABLE IF NOT EXISTS chat_feed_watermarks (
+        consumer TEXT PRIMARY KEY,
+        ingested_at TEXT NOT NULL,
+        conversation_id TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS chat_compression_dicts (
+        dict_id INTEGER PRIMARY KEY,
+        data BLOB NOT NULL,
+        samples INTEGER NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """,
+    # Covering indexes for keyset-paginated listing: the list columns ride
+    # along so a page is read from the index alone, and (platform, ...)
+    # serves filtered listing without a sort step
+    """
+    CREATE INDEX IF NOT EXISTS idx_cc_list ON chat_conversations(
+        ingested_at, conversation_id,
+        platform, title, source_url, message_count, created_at)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_cc_platform_list ON chat_conversations(
+        platform, ingested_at, conversation_id,
+        title, source_url, message_count, created_at)
+    """,
+    # Superseded by the covering indexes above (they share their prefixes)
+    "DROP INDEX IF EXISTS idx_cc_platform",
+    "DROP INDEX IF EXISTS idx_cc_ingested",
+)
+
+# Conversation counts per platform, kept exact by triggers so totals never
+# need a COUNT(*) scan
+_COUNT_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS chat_conversation_counts (
+        platform TEXT PRIMARY KEY,
+        conversations INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS chat_conversation_counts_ai
+    AFTER INSERT ON chat_conversations BEGIN
+        INSERT INTO chat_conversation_counts(platform, conversations)
+        VALUES (new.platform, 1)
+        ON CONFLICT(platform) DO UPDATE SET conversations = conversations + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS chat_conversation_counts_ad
+    AFTER DELETE ON chat_conversations BEGIN
+        UPDATE chat_conversation_counts SET conversations = conversations - 1
+        WHERE platform = old.platform;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS chat_conversation_counts_au
+    AFTER UPDATE OF platform ON chat_conversations
+    WHEN old.platform IS NOT new.platform BEGIN
+        UPDATE chat_conversation_counts SET conversations = conversations - 1
+        WHERE platform = old.platform;
+        INSERT INTO chat_conversation_counts(platform, conversations)
+        VALUES (new.platform, 1)
+        ON CONFLICT(platform) DO UPDATE SET conversations = conversations + 1;
+    END
+    """,
+)
+
+_SQL_SEED_COUNTS = """INSERT INTO chat_conversation_counts(platform, conversations)
+    SELECT platform, COUNT(*) FROM chat_conversations GROUP BY platform"""
+
+_SQL_COUNT_ALL = "SELECT coalesce(SUM(conversations), 0) FROM chat_conversation_counts"
+
+_SQL_COUNT_PLATFORM = (
+    "SELECT conversations FROM chat_conversation_counts WHERE platform = ?"
+)
+
+# Intelligence list fields normalized into (facet_type, value) rows so
+# analytics group and filter in SQL instead of parsing every JSON blob.
+# value compares case-insensitively: "Python" and "python" are one facet.
+FACET_FIELDS = {
+    "topic": ("main_topics", "main_topics_json"),
+    "technology": ("technologies_mentioned", "technologies_json"),
+    "decision": ("decisions_made", "decisions_json"),
+}
+
+_FACET_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS chat_facets (
+        facet_type TEXT NOT NULL,
+        value TEXT NOT NULL COLLATE NOCASE,
+        conversation_id TEXT NOT NULL,
+        PRIMARY KEY (facet_type, value, conversation_id)
+    ) WITHOUT ROWID
+    """,
+    # Replacing a conversation's facets and co-occurrence self-joins
+    """
+    CREATE INDEX IF NOT EXISTS idx_cf_conversation
+    ON chat_facets(conversation_id, facet_type, value)
+    """,
+)
+
+_SQL_SEED_FACETS = """INSERT OR IGNORE INTO chat_facets(facet_type, value, conversation_id)
+    SELECT ?, trim(j.value, char(32, 9, 10, 13)), i.conversation_id
+    FROM chat_intelligence i, json_each(i.{column}) j
+    WHERE json_valid(i.{column}) AND j.type = 'text'
+      AND trim(j.value, char(32, 9, 10, 13)) != ''"""
+
+_SQL_DELETE_FACETS = "DELETE FROM chat_facets WHERE conversation_id = ?"
+
+_SQL_INSERT_FACET = """INSERT OR IGNORE INTO chat_facets(facet_type, value, conversation_id)
+    VALUES (?, ?, ?)"""
+
+_SQL_FACET_COUNTS = """SELECT value, COUNT(*) AS conversations FROM chat_facets
+    WHERE facet_type = ? GROUP BY value
+    ORDER BY conversations DESC, value LIMIT ?"""
+
+_SQL_FACET_COOCCURRENCE = """SELECT o.facet_type, o.value, COUNT(*) AS conversations
+    FROM chat_facets f JOIN chat_facets o ON o.conversation_id = f.conversation_id
+    WHERE f.facet_type = ? AND f.value = ?
+      AND NOT (o.facet_type = f.facet_type AND o.value = f.value){with_type}
+    GROUP BY o.facet_type, o.value
+    ORDER BY conversations DESC, o.facet_type, o.value LIMIT ?"""
+
+# Pairs within one facet type are counted once (a.value < b.value)
+_SQL_FACET_PAIRS = """SELECT a.value AS value, b.value AS other_value,
+        COUNT(*) AS conversations
+    FROM chat_facets a JOIN chat_facets b
+      ON b.conversation_id = a.conversation_id AND b.facet_type = ?
+    WHERE a.facet_type = ?{same_type}
+    GROUP BY a.value, b.value
+    ORDER BY conversations DESC, a.value, b.value LIMIT ?"""
+
+_SQL_FACET_SIZE = "SELECT COUNT(*) FROM chat_facets WHERE facet_type = ? AND value = ?"
+
+# Filter by facets: walk the rarest facet's index range and probe the
+# others per conversation, instead of intersecting every facet's rows
+_FACET_FILTER_FROM = """ FROM chat_facets f
+    JOIN chat_conversations c ON c.conversation_id = f.conversation_id
+    WHERE f.facet_type = ? AND f.value = ?"""
+
+_FACET_FILTER_EXISTS = """ AND EXISTS (SELECT 1 FROM chat_facets o
+    WHERE o.conversation_id = c.conversation_id
+      AND o.facet_type = ? AND o.value = ?)"""
+
+_FACET_FILTER_LIST = (
+    "SELECT c.conversation_id, c.platform, c.title, c.source_url, "
+    "c.message_count, c.created_at, c.ingested_at"
+)
+
+_FACET_FILTER_ORDER = " ORDER BY c.ingested_at DESC, c.conversation_id DESC LIMIT ?"
+
+# Full-text index over titles and message text. It is an external-content
+# table: the text lives once, in chat_conversations and chat_messages, and
+# the view below is what FTS5 reads back for snippet() and 'rebuild'. Its
+# rowid mirrors the chat_conversations rowid.
+_FTS_SCHEMA = (
+    # Why: triggers of the earlier internal-content index, which called
+    # the app-only chat_payload() function
+    "DROP TRIGGER IF EXISTS chat_conversations_fts_ai",
+    "DROP TRIGGER IF EXISTS chat_conversations_fts_ad",
+    "DROP TRIGGER IF EXISTS chat_conversations_fts_au",
+    """
+    CREATE VIEW IF NOT EXISTS chat_conversations_fts_source AS
+    SELECT c.rowid AS conv_rowid, c.conversation_id, c.title,
+        (SELECT group_concat(content, char(10))
+         FROM (SELECT m.content FROM chat_messages m
+               WHERE m.conversation_id = c.conversation_id
+               ORDER BY m.seq)) AS content
+    FROM chat_conversations c
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS chat_conversations_fts USING fts5(
+        title, content,
+        content = 'chat_conversations_fts_source',
+        content_rowid = 'conv_rowid',
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+)
+
+# An external-content index is kept in step by the writer: a conversation
+# is unindexed with its current text before it changes and indexed after.
+# 'delete' must be given exactly the text that was indexed.
+_SQL_FTS_UNINDEX = """INSERT INTO chat_conversations_fts
+        (chat_conversations_fts, rowid, title, content)
+    SELECT 'delete', conv_rowid, title, content
+    FROM chat_conversations_fts_source WHERE conversation_id = ?"""
+
+_SQL_FTS_INDEX = """INSERT INTO chat_conversations_fts(rowid, title, content)
+    SELECT conv_rowid, title, content
+    FROM chat_conversations_fts_source WHERE conversation_id = ?"""
+
+_SQL_FTS_REBUILD = (
+    "INSERT INTO chat_conversations_fts(chat_conversations_fts) VALUES ('rebuild')"
+)
+
+# Why: an upsert keeps the row (and its rowid, the full-text index key)
+# in place; INSERT OR REPLACE would delete it and assign a new one
+_SQL_SAVE_CONVERSATION = """INSERT INTO chat_conversations
+    (conversation_id, platform, title, source_url, message_count,
+     created_at, ingested_at, messages_json, warnings_json,
+     security_findings_json, fingerprint, prefix_fingerprint,
+     storage_format, payload_bytes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(conversation_id) DO UPDATE SET
+        platform = excluded.platform,
+        title = excluded.title,
+        source_url = excluded.source_url,
+        message_count = excluded.message_count,
+        created_at = excluded.created_at,
+        ingested_at = excluded.ingested_at,
+        messages_json = excluded.messages_json,
+        warnings_json = excluded.warnings_json,
+        security_findings_json = excluded.security_findings_json,
+        fingerprint = excluded.fingerprint,
+        prefix_fingerprint = excluded.prefix_fingerprint,
+        storage_format = excluded.storage_format,
+        payload_bytes = excluded.payload_bytes"""
+
+_SQL_DELETE_MESSAGES = "DELETE FROM chat_messages WHERE conversation_id = ?"
+
+_SQL_INSERT_MESSAGE = """INSERT INTO chat_messages
+    (conversation_id, seq, role, content, ts, message_id, metadata_json)
+    VALUES (?, ?, ?, ?, ?, ?, ?)"""
+
+_SQL_MESSAGES_PAGE = """SELECT seq, role, content, ts, message_id, metadata_json
+    FROM chat_messages
+    WHERE conversation_id = ? AND seq > ?
+    ORDER BY seq LIMIT ?"""
+
+_SQL_CONVERSATION_MESSAGES = """SELECT role, content, ts, message_id, metadata_json
+    FROM chat_messages WHERE conversation_id = ? ORDER BY seq"""
+
+_SQL_BATCH_MESSAGES = """SELECT conversation_id, role, content, ts, message_id,
+        metadata_json
+    FROM chat_messages WHERE conversation_id IN ({placeholders})
+    ORDER BY conversation_id, seq"""
+
+_SQL_GET_MESSAGES_JSON = """SELECT storage_format, messages_json
+    FROM chat_conversations WHERE conversation_id = ?"""
+
+# Conversations whose messages are still in messages_json, walked in
+# rowid order through idx_cc_unmigrated
+_SQL_UNMIGRATED_BATCH = """SELECT rowid, conversation_id, storage_format, messages_json
+    FROM chat_conversations
+    WHERE messages_json != '' AND rowid > ?
+    ORDER BY rowid LIMIT ?"""
+
+_SQL_CLEAR_MESSAGES_JSON = """UPDATE chat_conversations
+    SET messages_json = '', payload_bytes = payload_bytes - ?
+    WHERE rowid = ?"""
+
+_SQL_SAVE_INTELLIGENCE = """INSERT OR REPLACE INTO chat_intelligence
+    (conversation_id, platform, summary, main_topics_json,
+     technologies_json, decisions_json, code_artifacts_json,
+     knowledge_json, osint_relevance, analyzed_at, tokens_used)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+# Columns added after the first release: (table, column, definition)
+_COLUMN_MIGRATIONS = (
+    ("chat_intelligence", "tokens_used", "INTEGER NOT NULL DEFAULT 0"),
+    ("chat_conversations", "fingerprint", "TEXT"),
+    ("chat_conversations", "prefix_fingerprint", "TEXT"),
+    ("chat_conversations", "storage_format", "INTEGER NOT NULL DEFAULT 0"),
+    ("chat_conversations", "payload_bytes", "INTEGER"),
+)
+
+# Indexes on migrated columns, created after _COLUMN_MIGRATIONS
+_MIGRATED_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_cc_fingerprint ON chat_conversations(fingerprint)",
+    "CREATE INDEX IF NOT EXISTS idx_cc_prefix_fingerprint "
+    "ON chat_conversations(prefix_fingerprint)",
+    # Why: partial, so it only holds rows migrate_messages has yet to reach
+    "CREATE INDEX IF NOT EXISTS idx_cc_unmigrated "
+    "ON chat_conversations(conversation_id) WHERE messages_json != ''",
+)
+
+# chat_messages was first created WITHOUT ROWID; copied into a rowid table
+_MESSAGES_REBUILD = (
+    # Why: a view over a table blocks renaming it; _FTS_SCHEMA recreates it
+    "DROP VIEW IF EXISTS chat_conversations_fts_source",
+    "ALTER TABLE chat_messages RENAME TO chat_messages_without_rowid",
+    _MESSAGES_TABLE,
+    "INSERT INTO chat_messages SELECT * FROM chat_messages_without_rowid",
+    "DROP TABLE chat_messages_without_rowid",
+)
+
+# Content-fingerprint deduplication
+_SQL_FIND_BY_FINGERPRINT = """SELECT conversation_id FROM chat_conversations
+    WHERE fingerprint = ? LIMIT 1"""
+
+_SQL_FIND_BY_PREFIX = """SELECT conversation_id, storage_format, messages_json
+    FROM chat_conversations
+    WHERE prefix_fingerprint = ? ORDER BY message_count DESC LIMIT ?"""
+
+_SQL_UNFINGERPRINTED_BATCH = """SELECT rowid, conversation_id,
+        storage_format, messages_json
+    FROM chat_conversations
+    WHERE rowid > ? AND fingerprint IS NULL ORDER BY rowid LIMIT ?"""
+
+_SQL_SET_FINGERPRINTS = """UPDATE chat_conversations
+    SET fingerprint = ?, prefix_fingerprint = ? WHERE conversation_id = ?"""
+
+# Payload compression
+_STORED_BYTES_EXPR = (
+    "length(CAST(messages_json AS BLOB))"
+    " + coalesce(length(CAST(warnings_json AS BLOB)), 0)"
+    " + coalesce(length(CAST(security_findings_json AS BLOB)), 0)"
+)
+
+_SQL_COMPRESSION_STATS = (
+    "SELECT storage_format, COUNT(*) AS conversations, "
+    f"SUM({_STORED_BYTES_EXPR}) AS stored_bytes, "
+    f"SUM(coalesce(payload_bytes, {_STORED_BYTES_EXPR})) AS payload_bytes "
+    "FROM chat_conversations GROUP BY storage_format"
+)
+
+_PAYLOAD_COLUMNS = ("messages_json", "warnings_json", "security_findings_json")
+
+_SQL_DECODE_SAMPLE = """SELECT storage_format, messages_json, warnings_json,
+        security_findings_json
+    FROM chat_conversations
+    WHERE storage_format = ? ORDER BY random() LIMIT ?"""
+
+_SQL_DICTIONARY_SAMPLE = """SELECT storage_format, messages_json, warnings_json,
+        security_findings_json
+    FROM chat_conversations
+    ORDER BY random() LIMIT ?"""
+
+_SQL_RECOMPRESS_BATCH = f"""SELECT rowid, storage_format, messages_json,
+        warnings_json, security_findings_json, {_STORED_BYTES_EXPR} AS stored_bytes
+    FROM chat_conversations
+    WHERE rowid > ? AND storage_format != ? ORDER BY rowid LIMIT ?"""
+
+_SQL_SET_PAYLOADS = """UPDATE chat_conversations
+    SET messages_json = ?, warnings_json = ?, security_findings_json = ?,
+        storage_format = ?, payload_bytes = ?
+    WHERE rowid = ?"""
+
+_SQL_SAVE_DICTIONARY = """INSERT OR REPLACE INTO chat_compression_dicts
+    (dict_id, data, samples, created_at) VALUES (?, ?, ?, ?)"""
+
+_SQL_LOAD_DICTIONARIES = "SELECT dict_id, data FROM chat_compression_dicts ORDER BY created_at"
+
+# Bytes per table and index; dbstat is compiled into most SQLite builds
+_SQL_TABLE_BYTES = """SELECT name, SUM(pgsize) AS bytes FROM dbstat
+    GROUP BY name ORDER BY bytes DESC"""
+
+# zstd needs a few hundred samples to train a useful dictionary
+_MIN_DICTIONARY_SAMPLES = 200
+
+# Conversations sharing a prefix fingerprint compared message by message
+_NEAR_DUPLICATE_CANDIDATES = 20
+
+# Analysis cache, keyed by (content_hash, model, prompt_version)
+_SQL_CACHE_GET = """SELECT result_json FROM chat_analysis_cache
+    WHERE content_hash = ? AND model = ? AND prompt_version = ?"""
+
+_SQL_CACHE_HIT = """UPDATE chat_analysis_cache SET hits = hits + 1, last_hit_at = ?
+    WHERE content_hash = ? AND model = ? AND prompt_version = ?"""
+
+_SQL_CACHE_PUT = """INSERT OR REPLACE INTO chat_analysis_cache
+    (content_hash, model, prompt_version, result_json, created_at)
+    VALUES (?, ?, ?, ?, ?)"""
+
+_SQL_CACHE_STATS = """SELECT model, prompt_version, COUNT(*) AS entries,
+        COALESCE(SUM(hits), 0) AS hits, MAX(created_at) AS newest
+    FROM chat_analysis_cache
+    GROUP BY model, prompt_version ORDER BY model, prompt_version"""
+
+# Intelligence fields shared between conversations with identical content
+_CACHE_EXCLUDED_FIELDS = ("conversation_id", "platform", "tokens_used", "complete")
+
+_SQL_CREATE_JOB = """INSERT INTO chat_jobs
+    (job_id, kind, status, params_json, payload_path, created_at, updated_at)
+    VALUES (?, ?, 'queued', ?, ?, ?, ?)"""
+
+# NULL leaves a field unchanged
+_SQL_UPDATE_JOB = """UPDATE chat_jobs SET
+        status = COALESCE(?, status),
+        stage = COALESCE(?, stage),
+        progress = COALESCE(?, progress),
+        result_json = COALESCE(?, result_json),
+        error = COALESCE(?, error),
+        attempts = attempts + ?,
+        updated_at = ?
+    WHERE job_id = ?"""
+
+_SQL_GET_JOB = "SELECT * FROM chat_jobs WHERE job_id = ?"
+
+_SQL_UNFINISHED_JOBS = """SELECT * FROM chat_jobs
+    WHERE status IN ('queued', 'running') ORDER BY created_at"""
+
+# Newest first; ties on ingested_at (batch writes) broken by id. The
+# *_AFTER variants continue below a keyset cursor (ingested_at, id).
+_LIST_COLUMNS = (
+    "SELECT conversation_id, platform, title, source_url, "
+    "message_count, created_at, ingested_at FROM chat_conversations "
+)
+
+_LIST_ORDER = "ORDER BY ingested_at DESC, conversation_id DESC LIMIT ?"
+
+_SQL_LIST = _LIST_COLUMNS + _LIST_ORDER
+
+_SQL_LIST_AFTER = (
+    _LIST_COLUMNS + "WHERE (ingested_at, conversation_id) < (?, ?) " + _LIST_ORDER
+)
+
+_SQL_LIST_PLATFORM = _LIST_COLUMNS + "WHERE platform = ? " + _LIST_ORDER
+
+_SQL_LIST_PLATFORM_AFTER = (
+    _LIST_COLUMNS
+    + "WHERE platform = ? AND (ingested_at, conversation_id) < (?, ?) "
+    + _LIST_ORDER
+)
+
+_SQL_GET_CONVERSATION = "SELECT * FROM chat_conversations WHERE conversation_id = ?"
+
+_SQL_CONVERSATION_EXISTS = "SELECT 1 FROM chat_conversations WHERE conversation_id = ?"
+
+_SQL_GET_SECURITY_FINDINGS = """SELECT storage_format, security_findings_json
+    FROM chat_conversations WHERE conversation_id = ?"""
+
+# Export walks (ingested_at, conversation_id) upwards from a keyset
+_SQL_EXPORT_BATCH = """SELECT * FROM chat_conversations c
+    WHERE (c.ingested_at, c.conversation_id) > (?, ?){platform}{intelligence}
+    ORDER BY c.ingested_at, c.conversation_id LIMIT ?"""
+
+_SQL_EXPORT_PLATFORM = " AND c.platform = ?"
+
+# Change-feed consumers (e.g. the RAG bridge) and their watermarks
+_SQL_GET_WATERMARK = "SELECT * FROM chat_feed_watermarks WHERE consumer = ?"
+
+_SQL_SET_WATERMARK = """INSERT INTO chat_feed_watermarks
+    (consumer, ingested_at, conversation_id, updated_at) VALUES (?, ?, ?, ?)
+    ON CONFLICT(consumer) DO UPDATE SET
+        ingested_at = excluded.ingested_at,
+        conversation_id = excluded.conversation_id,
+        updated_at = excluded.updated_at"""
+
+# Backlog past a watermark: a range scan over idx_cc_list
+_SQL_FEED_BACKLOG = """SELECT COUNT(*) AS pending, MIN(ingested_at) AS oldest
+    FROM chat_conversations WHERE (ingested_at, conversation_id) > (?, ?)"""
+
+_SQL_EXPORT_INTELLIGENCE = {
+    True: " AND EXISTS (SELECT 1 FROM chat_intelligence i"
+          " WHERE i.conversation_id = c.conversation_id)",
+    False: " AND NOT EXISTS (SELECT 1 FROM chat_intelligence i"
+           " WHERE i.conversation_id = c.conversation_id)",
+}
+
+_SQL_GET_INTELLIGENCE = "SELECT * FROM chat_intelligence WHERE conversation_id = ?"
+
+_SEARCH_LIKE_MATCH = """(EXISTS (SELECT 1 FROM chat_messages m
+            WHERE m.conversation_id = c.conversation_id AND m.content LIKE ?1)
+        OR (c.messages_json != ''
+            AND chat_payload(c.storage_format, c.messages_json) LIKE ?1))"""
+
+_SQL_SEARCH_LIKE = f"""SELECT c.conversation_id, c.platform, c.title,
+        c.message_count, c.ingested_at
+    FROM chat_conversations c
+    WHERE {_SEARCH_LIKE_MATCH}
+    ORDER BY c.ingested_at DESC LIMIT ?2"""
+
+_SQL_SEARCH_LIKE_PLATFORM = f"""SELECT c.conversation_id, c.platform, c.title,
+        c.message_count, c.ingested_at
+    FROM chat_conversations c
+    WHERE c.platform = ?3 AND {_SEARCH_LIKE_MATCH}
+    ORDER BY c.ingested_at DESC LIMIT ?2"""
+
+# bm25 weights: a hit in the title counts five times a hit in the messages.
+# Ordering by rank lets FTS5 sort and stop at LIMIT, so snippet() reads
+# back message text only for the rows returned.
+_SQL_SEARCH_FTS = """SELECT c.conversation_id, c.platform, c.title,
+        c.message_count, c.ingested_at,
+        chat_conversations_fts.rank AS score,
+        snippet(chat_conversations_fts, 1, '<mark>', '</mark>', '…', 16) AS snippet
+    FROM chat_conversations_fts
+    JOIN chat_conversations c ON c.rowid = chat_conversations_fts.rowid
+    WHERE chat_conversations_fts MATCH ?
+      AND chat_conversations_fts.rank MATCH 'bm25(5.0, 1.0)'
+    ORDER BY chat_conversations_fts.rank LIMIT ?"""
+
+_SQL_SEARCH_FTS_PLATFORM = """SELECT c.conversation_id, c.platform, c.title,
+        c.message_count, c.ingested_at,
+        chat_conversations_fts.rank AS score,
+        snippet(chat_conversations_fts, 1, '<mark>', '</mark>', '…', 16) AS snippet
+    FROM chat_conversations_fts
+    JOIN chat_conversations c ON c.rowid = chat_conversations_fts.rowid
+    WHERE chat_conversations_fts MATCH ? AND c.platform = ?
+      AND chat_conversations_fts.rank MATCH 'bm25(5.0, 1.0)'
+    ORDER BY chat_conversations_fts.rank LIMIT ?"""
+
+_FTS_TOKEN_RE = re.compile(r"[^\s\"]+")
+
+
+def _fts_query(query: str, prefix: bool = True) -> str:
+    """Turn free text into a safe FTS5 MATCH expression.
+
+    Every token is quoted so FTS5 operators in user input are taken
+    literally. A trailing '*' makes a token a prefix query, and with
+    prefix=True the last token is one too (search-as-you-type).
+    """
+    tokens = _FTS_TOKEN_RE.findall(query)
+    terms = []
+    for i, token in enumerate(tokens):
+        star = token.endswith("*") or (prefix and i == len(tokens) - 1)
+        token = token.rstrip("*")
+        if not token:
+            continue
+        terms.append('"' + token + '"' + ("*" if star else ""))
+    return " ".join(terms)
+
+
+def _message_rows(conversation_id: str, messages: List[Dict]) -> Iterator[tuple]:
+    """chat_messages rows for serialized messages (ParsedMessage.to_dict shape)."""
+    for seq, msg in enumerate(messages):
+        metadata = msg.get("metadata")
+        yield (
+            conversation_id,
+            seq,
+            msg.get("role", ""),
+            msg.get("content", ""),
+            msg.get("timestamp"),
+            msg.get("message_id"),
+            json.dumps(metadata, ensure_ascii=False) if metadata else None,
+        )
+
+
+def _facet_rows(intel: ConversationIntelligence) -> Iterator[tuple]:
+    """chat_facets rows for an analysis; blank and non-text values are dropped."""
+    for facet_type, (attr, _) in FACET_FIELDS.items():
+        for value in getattr(intel, attr) or []:
+            if isinstance(value, str) and value.strip():
+                yield facet_type, value.strip(), intel.conversation_id
+
+
+def _stored_message(row: sqlite3.Row) -> Dict:
+    """A chat_messages row in ParsedMessage.to_dict shape."""
+    metadata_json = row["metadata_json"]
+    return {
+        "role": row["role"],
+        "content": row["content"],
+        "timestamp": row["ts"],
+        "message_id": row["message_id"],
+        "metadata": json.loads(metadata_json) if metadata_json else {},
+    }
+
+
+def _message_from_row(row: sqlite3.Row) -> Dict:
+    return {"seq": row["seq"], **_stored_message(row)}
+
+
+def _intelligence_from_row(row: sqlite3.Row) -> Dict:
+    intel = dict(row)
+    intel["main_topics"] = json.loads(intel.pop("main_topics_json") or "[]")
+    intel["technologies"] = json.loads(intel.pop("technologies_json") or "[]")
+    intel["decisions"] = json.loads(intel.pop("decisions_json") or "[]")
+    intel["code_artifacts"] = json.loads(intel.pop("code_artifacts_json") or "[]")
+    intel["knowledge"] = json.loads(intel.pop("knowledge_json") or "[]")
+    return intel
+
+
+def encode_cursor(row: Dict) -> str:
+    """Opaque keyset cursor for the position after a listed row."""
+    raw = json.dumps([row["ingested_at"], row["conversation_id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ingested_at, conversation_id = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(ingested_at, str) or not isinstance(conversation_id, str):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return ingested_at, conversation_id
+
+
+def _check_facet_type(facet_type: str) -> None:
+    if facet_type not in FACET_FIELDS:
+        raise ValueError(
+            f"Unknown facet type {facet_type!r}; expected one of {sorted(FACET_FIELDS)}"
+        )
+
+
+def _payload_bytes(*texts: Optional[str]) -> int:
+    return sum(len(t.encode("utf-8", "surrogatepass")) for t in texts if t is not None)
+
+
+def _stored_message_hashes(messages: List[Dict]) -> List[str]:
+    return [
+        message_hash(m.get("role") or "", m.get("content") or "") for m in messages
+    ]
+
+
+def _database_bytes(conn: sqlite3.Connection) -> Dict:
+    """File size of the database and the part of it in use. Freed pages are
+    reused by new rows; VACUUM (then rebuild_fts) returns them to the
+    filesystem."""
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return {
+        "db_bytes": page_size * page_count,
+        "free_bytes": page_size * free_pages,
+        "used_bytes": page_size * (page_count - free_pages),
+    }
+
+
+def _fts5_available(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+class StorageEngine:
+    """Long-lived connections to the chat processor database.
+
+    Owns one writer connection (serialized by a lock, one transaction per
+    ``writer()`` block) and a pool of read-only reader connections, which
+    WAL mode lets run concurrently with the writer. PRAGMAs are applied
+    once per connection and prepared statements are cached per connection.
+    """
+
+    def __init__(
+        self,
+        db_path: Path = _DEFAULT_DB,
+        readers: int = 4,
+        cached_statements: int = 256,
+        compression: str = _DEFAULT_COMPRESSION,
+    ):
+        if readers < 1:
+            raise ValueError(f"readers must be >= 1, got {readers}")
+        self.db_path = db_path
+        self._cached_statements = cached_statements
+        self.codec = PayloadCodec(compression)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._write_lock = threading.Lock()
+        self._writer = self._connect()
+        self.fts_enabled = _fts5_available(self._writer)
+        if not self.fts_enabled:
+            logger.warning("SQLite FTS5 unavailable; search falls back to LIKE")
+        self.init_schema()
+        self._load_dictionaries()
+        with self.writer() as conn:
+            self._last_ingested_at = conn.execute(
+                "SELECT MAX(ingested_at) FROM chat_conversations"
+            ).fetchone()[0] or ""
+        self._migration_thread: Optional[threading.Thread] = None
+        self._recompression_thread: Optional[threading.Thread] = None
+        self.recompression: Dict = {"status": "idle"}
+        self._stop = threading.Event()
+
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._all_readers: List[sqlite3.Connection] = []
+        for _ in range(readers):
+            conn = self._connect()
+            conn.execute("PRAGMA query_only=ON")
+            self._readers.put(conn)
+            self._all_readers.append(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=30,
+            check_same_thread=False,
+            cached_statements=self._cached_statements,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        conn.create_function(
+            "chat_payload", 2, self.codec.decode, deterministic=True
+        )
+        return conn
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a reader connection for the duration of the block."""
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Hold the writer connection; commits on success, rolls back on error."""
+        with self._write_lock:
+            try:
+                yield self._writer
+                self._writer.commit()
+            except BaseException:
+                self._writer.rollback()
+                raise
+
+    def init_schema(self) -> None:
+        """Create tables if they do not exist."""
+        with self.writer() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            for table, column, definition in _COLUMN_MIGRATIONS:
+                columns = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            for statement in _MIGRATED_INDEXES:
+                conn.execute(statement)
+            messages_sql = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE name = 'chat_messages'"
+            ).fetchone()[0]
+            if "WITHOUT ROWID" in messages_sql.upper():
+                for statement in _MESSAGES_REBUILD:
+                    conn.execute(statement)
+            counts_existed = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'chat_conversation_counts'"
+            ).fetchone()
+            for statement in _COUNT_SCHEMA:
+                conn.execute(statement)
+            if not counts_existed:
+                conn.execute(_SQL_SEED_COUNTS)
+            facets_existed = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'chat_facets'"
+            ).fetchone()
+            for statement in _FACET_SCHEMA:
+                conn.execute(statement)
+            if not facets_existed:
+                # Why: one-shot backfill from intelligence stored before facets
+                for facet_type, (_, column) in FACET_FIELDS.items():
+                    conn.execute(_SQL_SEED_FACETS.format(column=column), (facet_type,))
+            if not self.fts_enabled:
+                return
+            row = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE name = 'chat_conversations_fts'"
+            ).fetchone()
+            # Why: the earlier index kept its own copy of every message
+            stale = row is not None and "content_rowid" not in row[0]
+            if stale:
+                conn.execute("DROP TABLE chat_conversations_fts")
+            for statement in _FTS_SCHEMA:
+                conn.execute(statement)
+        if row is None or stale:
+            # Why: one-shot build for databases created before this index
+            indexed = self.rebuild_fts()
+            if indexed:
+                logger.info("Built full-text index over %d conversations", indexed)
+
+    def rebuild_fts(self) -> int:
+        """Rebuild the full-text index from scratch (e.g. after VACUUM,
+        which may renumber chat_conversations rowids, or after rows were
+        changed outside StorageEngine). Returns count."""
+        if not self.fts_enabled:
+            return 0
+        with self.writer() as conn:
+            conn.execute(_SQL_FTS_REBUILD)
+            return conn.execute("SELECT COUNT(*) FROM chat_conversations").fetchone()[0]
+
+    def close(self) -> None:
+        self._stop.set()
+        for thread in (self._migration_thread, self._recompression_thread):
+            if thread is not None:
+                thread.join()
+        with self._write_lock:
+            self._writer.close()
+        for conn in self._all_readers:
+            conn.close()
+
+    def _ingest_stamp(self) -> str:
+        """ingested_at for the current write transaction; call with the
+        writer held.
+
+        Stamps are strictly increasing in commit order, so a change-feed
+        watermark over (ingested_at, conversation_id) never passes a row
+        that has yet to commit.
+        """
+        # Why: a stamp taken before waiting on the lock can commit after a
+        # later one; the clock may also step back
+        now = datetime.utcnow()
+        stamp = now.isoformat(timespec="microseconds")
+        if stamp <= self._last_ingested_at:
+            last = datetime.fromisoformat(self._last_ingested_at)
+            stamp = (last + timedelta(microseconds=1)).isoformat(timespec="microseconds")
+        self._last_ingested_at = stamp
+        return stamp
+
+    def save_conversation(self, conversation: ParsedConversation) -> str:
+        """Persist a ParsedConversation. Returns conversation_id."""
+        with self.writer() as conn:
+            self._write_conversation(conn, conversation, self._ingest_stamp())
+        return conversation.conversation_id
+
+    def save_conversations(self, conversations: List[ParsedConversation]) -> int:
+        """Persist a batch of conversations in a single transaction."""
+        with self.writer() as conn:
+            now = self._ingest_stamp()
+            for conversation in conversations:
+                self._write_conversation(conn, conversation, now)
+        return len(conversations)
+
+    def _write_conversation(
+        self, conn: sqlite3.Connection, conversation: ParsedConversation, now: str
+    ) -> None:
+        messages = [m.to_dict() for m in conversation.messages]
+        fingerprint, prefix_fingerprint = conversation.fingerprints()
+        texts = (
+            "",  # messages_json: the messages are stored in chat_messages
+            json.dumps(conversation.warnings, ensure_ascii=False),
+            json.dumps(conversation.security_findings, ensure_ascii=False),
+        )
+        storage_format, encoded = self._encode_payloads(texts)
+        if self.fts_enabled:
+            conn.execute(_SQL_FTS_UNINDEX, (conversation.conversation_id,))
+        conn.execute(
+            _SQL_SAVE_CONVERSATION,
+            (
+                conversation.conversation_id,
+                conversation.platform,
+                conversation.title,
+                conversation.source_url,
+                len(conversation.messages),
+                conversation.created_at.isoformat() if conversation.created_at else None,
+                now,
+                *encoded,
+                fingerprint,
+                prefix_fingerprint,
+                storage_format,
+                _payload_bytes(*texts),
+            ),
+        )
+        conn.execute(_SQL_DELETE_MESSAGES, (conversation.conversation_id,))
+        conn.executemany(
+            _SQL_INSERT_MESSAGE,
+            _message_rows(conversation.conversation_id, messages),
+        )
+        if self.fts_enabled:
+            conn.execute(_SQL_FTS_INDEX, (conversation.conversation_id,))
+
+    def save_conversation_unique(
+        self, conversation: ParsedConversation, near_duplicates: bool = False
+    ) -> Tuple[str, Optional[str]]:
+        """Persist a conversation unless its content is already stored.
+
+        Returns (conversation_id, match) where match is None for a new
+        conversation, "exact" or "contained" when an existing one was
+        kept (its id is returned, nothing is written), or "extended" when
+        the new conversation continues a stored one and replaced it in
+        place. Near-duplicate matching ("contained"/"extended") compares
+        message hashes and only runs with near_duplicates=True.
+        """
+        with self.writer() as conn:
+            duplicate = self._find_duplicate(conn, conversation, near_duplicates)
+            if duplicate is not None:
+                existing_id, match = duplicate
+                if match != "extended":
+                    return existing_id, match
+                conversation.conversation_id = existing_id
+            self._write_conversation(conn, conversation, self._ingest_stamp())
+        return conversation.conversation_id, duplicate and duplicate[1]
+
+    def find_duplicate(
+        self, conversation: ParsedConversation, near_duplicates: bool = False
+    ) -> Optional[Tuple[str, str]]:
+        """(existing conversation_id, match) for stored content, or None.
+
+        See save_conversation_unique for the match values.
+        """
+        with self.reader() as conn:
+            return self._find_duplicate(conn, conversation, near_duplicates)
+
+    def _find_duplicate(
+        self,
+        conn: sqlite3.Connection,
+        conversation: ParsedConversation,
+        near_duplicates: bool,
+    ) -> Optional[Tuple[str, str]]:
+        row = conn.execute(
+            _SQL_FIND_BY_FINGERPRINT, (conversation.fingerprint(),)
+        ).fetchone()
+        if row is not None:
+            return row[0], "exact"
+        prefix = conversation.prefix_fingerprint() if near_duplicates else None
+        if prefix is None:
+            return None
+        hashes = conversation.message_hashes()
+        candidates = conn.execute(
+            _SQL_FIND_BY_PREFIX, (prefix, _NEAR_DUPLICATE_CANDIDATES)
+        ).fetchall()
+        for row in candidates:
+            stored = _stored_message_hashes(self._read_messages(conn, row))
+            if hashes == stored[:len(hashes)]:
+                return row["conversation_id"], "contained"
+            if stored == hashes[:len(stored)]:
+                return row["conversation_id"], "extended"
+        return None
+
+    def existing_fingerprints(self, fingerprints: List[str]) -> Dict[str, str]:
+        """Map of the given fingerprints already stored to a conversation_id."""
+        found: Dict[str, str] = {}
+        with self.reader() as conn:
+            for start in range(0, len(fingerprints), 500):
+                chunk = fingerprints[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    "SELECT fingerprint, conversation_id FROM chat_conversations "
+                    f"WHERE fingerprint IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                found.update((r[0], r[1]) for r in rows)
+        return found
+
+    def backfill_fingerprints(self, batch_size: int = 200) -> int:
+        """Compute fingerprints of conversations stored before they existed."""
+        filled = 0
+        last_rowid = 0
+        while not self._stop.is_set():
+            with self.writer() as conn:
+                batch = conn.execute(
+                    _SQL_UNFINGERPRINTED_BATCH, (last_rowid, batch_size)
+                ).fetchall()
+                for row in batch:
+                    hashes = _stored_message_hashes(self._read_messages(conn, row))
+                    prefix = (
+                        sequence_hash(hashes[:PREFIX_MESSAGES])
+                        if len(hashes) >= PREFIX_MESSAGES else None
+                    )
+                    conn.execute(
+                        _SQL_SET_FINGERPRINTS,
+                        (sequence_hash(hashes), prefix, row["conversation_id"]),
+                    )
+            if not batch:
+                break
+            last_rowid = batch[-1]["rowid"]
+            filled += len(batch)
+        if filled:
+            logger.info("Backfilled fingerprints of %d conversations", filled)
+        return filled
+
+    def existing_ids(self, conversation_ids: List[str]) -> set:
+        """The subset of conversation_ids already stored."""
+        found = set()
+        with self.reader() as conn:
+            # Why: stay well under SQLite's bound-parameter limit
+            for start in range(0, len(conversation_ids), 500):
+                chunk = conversation_ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    "SELECT conversation_id FROM chat_conversations "
+                    f"WHERE conversation_id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                found.update(r[0] for r in rows)
+        return found
+
+    def save_intelligence(
+        self,
+        intel: ConversationIntelligence,
+        cache_key: Optional[Tuple[str, str, str]] = None,
+    ) -> None:
+        """Persist intelligence analysis results.
+
+        With cache_key (content_hash, model, prompt_version) the result is
+        also stored in the analysis cache, in the same transaction.
+        """
+        now = datetime.utcnow().isoformat()
+        with self.writer() as conn:
+            if cache_key is not None:
+                result = {
+                    k: v for k, v in intel.to_dict().items()
+                    if k not in _CACHE_EXCLUDED_FIELDS
+                }
+                conn.execute(
+                    _SQL_CACHE_PUT,
+                    (*cache_key, json.dumps(result, ensure_ascii=False), now),
+                )
+            conn.execute(
+                _SQL_SAVE_INTELLIGENCE,
+                (
+                    intel.conversation_id,
+                    intel.platform,
+                    intel.summary,
+                    json.dumps(intel.main_topics, ensure_ascii=False),
+                    json.dumps(intel.technologies_mentioned, ensure_ascii=False),
+                    json.dumps(intel.decisions_made, ensure_ascii=False),
+                    json.dumps(intel.code_artifacts, ensure_ascii=False),
+                    json.dumps(intel.knowledge_extracted, ensure_ascii=False),
+                    intel.osint_relevance,
+                    now,
+                    intel.tokens_used,
+                ),
+            )
+            conn.execute(_SQL_DELETE_FACETS, (intel.conversation_id,))
+            conn.executemany(_SQL_INSERT_FACET, _facet_rows(intel))
+
+    def get_cached_intelligence(
+        self,
+        cache_key: Tuple[str, str, str],
+        conversation_id: str,
+        platform: str,
+    ) -> Optional[ConversationIntelligence]:
+        """Cached analysis for cache_key, rebound to the given conversation.
+
+        Counts a hit when found. Returns None on a miss.
+        """
+        with self.reader() as conn:
+            row = conn.execute(_SQL_CACHE_GET, cache_key).fetchone()
+        if row is None:
+            return None
+        with self.writer() as conn:
+            conn.execute(_SQL_CACHE_HIT, (datetime.utcnow().isoformat(), *cache_key))
+        return ConversationIntelligence(
+            conversation_id=conversation_id,
+            platform=platform,
+            **json.loads(row["result_json"]),
+        )
+
+    def analysis_cache_stats(self) -> List[Dict]:
+        """Entry and hit counts per (model, prompt_version)."""
+        with self.reader() as conn:
+            rows = conn.execute(_SQL_CACHE_STATS).fetchall()
+        return [dict(r) for r in rows]
+
+    def invalidate_analysis_cache(
+        self, model: str, prompt_version: Optional[str] = None
+    ) -> int:
+        """Drop cached analyses of a model (optionally one prompt version)."""
+        with self.writer() as conn:
+            if prompt_version is None:
+                cur = conn.execute(
+                    "DELETE FROM chat_analysis_cache WHERE model = ?", (model,)
+                )
+            else:
+                cur = conn.execute(
+                    "DELETE FROM chat_analysis_cache "
+                    "WHERE model = ? AND prompt_version = ?",
+                    (model, prompt_version),
+                )
+            return cur.rowcount
+
+    def create_job(
+        self, job_id: str, kind: str, params: Dict, payload_path: Optional[str]
+    ) -> None:
+        """Record a new queued job."""
+        now = datetime.utcnow().isoformat()
+        with self.writer() as conn:
+            conn.execute(
+                _SQL_CREATE_JOB,
+                (job_id, kind, json.dumps(params, ensure_ascii=False),
+                 payload_path, now, now),
+            )
+
+    def update_job(
+        self,
+        job_id: str,
+        status: Optional[str] = None,
+        stage: Optional[str] = None,
+        progress: Optional[float] = None,
+        result: Optional[Dict] = None,
+        error: Optional[str] = None,
+        new_attempt: bool = False,
+    ) -> None:
+        """Update the given job fields; None leaves a field unchanged."""
+        with self.writer() as conn:
+            conn.execute(
+                _SQL_UPDATE_JOB,
+                (
+                    status, stage, progress,
+                    json.dumps(result, ensure_ascii=False) if result is not None else None,
+                    error,
+                    1 if new_attempt else 0,
+                    datetime.utcnow().isoformat(),
+                    job_id,
+                ),
+            )
+
+    @staticmethod
+    def _job_from_row(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job["params"] = json.loads(job.pop("params_json") or "{}")
+        result_json = job.pop("result_json")
+        job["result"] = json.loads(result_json) if result_json else None
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        with self.reader() as conn:
+            row = conn.execute(_SQL_GET_JOB, (job_id,)).fetchone()
+        return self._job_from_row(row) if row else None
+
+    def unfinished_jobs(self) -> List[Dict]:
+        """Queued or running jobs, oldest first (for resume after restart)."""
+        with self.reader() as conn:
+            rows = conn.execute(_SQL_UNFINISHED_JOBS).fetchall()
+        return [self._job_from_row(r) for r in rows]
+
+    def list_conversations(
+        self,
+        limit: int = 50,
+        platform: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+    ) -> List[Dict]:
+        """List stored conversations (metadata only, no messages), newest first.
+
+        after is the (ingested_at, conversation_id) of the last row of the
+        previous page; the next page is an index seek, so deep pages cost
+        the same as the first.
+        """
+        with self.reader() as conn:
+            if platform and after:
+                rows = conn.execute(
+                    _SQL_LIST_PLATFORM_AFTER, (platform, *after, limit)
+                ).fetchall()
+            elif platform:
+                rows = conn.execute(_SQL_LIST_PLATFORM, (platform, limit)).fetchall()
+            elif after:
+                rows = conn.execute(_SQL_LIST_AFTER, (*after, limit)).fetchall()
+            else:
+                rows = conn.execute(_SQL_LIST, (limit,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def list_conversations_page(
+        self,
+        limit: int = 50,
+        platform: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict:
+        """One page of list_conversations with an opaque next_cursor.
+
+        Raises ValueError for a malformed cursor.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        rows = self.list_conversations(limit + 1, platform, after)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "conversations": rows,
+            "total": self.count_conversations(platform),
+            "next_cursor": encode_cursor(rows[-1]) if has_more else None,
+        }
+
+    def count_conversations(self, platform: Optional[str] = None) -> int:
+        """Stored conversations (per platform), from the trigger-kept counts."""
+        with self.reader() as conn:
+            if platform:
+                row = conn.execute(_SQL_COUNT_PLATFORM, (platform,)).fetchone()
+            else:
+                row = conn.execute(_SQL_COUNT_ALL).fetchone()
+        return row[0] if row else 0
+
+    def facet_counts(self, facet_type: str, limit: int = 20) -> List[Dict]:
+        """Most frequent values of a facet type with their conversation counts."""
+        _check_facet_type(facet_type)
+        with self.reader() as conn:
+            rows = conn.execute(_SQL_FACET_COUNTS, (facet_type, limit)).fetchall()
+        return [dict(r) for r in rows]
+
+    def facet_cooccurrence(
+        self,
+        facet_type: str,
+        value: Optional[str] = None,
+        with_type: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[Dict]:
+        """Facets that appear in the same conversations.
+
+        With value: the facets most often seen alongside (facet_type,
+        value), optionally only of with_type. Without: the most frequent
+        (value, other_value) pairs of facet_type x with_type (default the
+        same type).
+        """
+        _check_facet_type(facet_type)
+        if with_type is not None:
+            _check_facet_type(with_type)
+        with self.reader() as conn:
+            if value is not None:
+                sql = _SQL_FACET_COOCCURRENCE.format(
+                    with_type=" AND o.facet_type = ?" if with_type else ""
+                )
+                params = (facet_type, value, *((with_type,) if with_type else ()), limit)
+            else:
+                with_type = with_type or facet_type
+                sql = _SQL_FACET_PAIRS.format(
+                    same_type=" AND a.value < b.value" if with_type == facet_type else ""
+                )
+                params = (with_type, facet_type, limit)
+            rows = conn.execute(sql, params).fetchall()
+        return [dict(r) for r in rows]
+
+    def list_conversations_by_facets(
+        self,
+        facets: List[Tuple[str, str]],
+        limit: int = 50,
+        platform: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict:
+        """Page of conversations carrying every (facet_type, value), newest
+        first, in the list_conversations_page shape.
+
+        Raises ValueError for an unknown facet type or malformed cursor.
+        """
+        if not facets:
+            raise ValueError("At least one facet is required")
+        for facet_type, _ in facets:
+            _check_facet_type(facet_type)
+        after = decode_cursor(cursor) if cursor else None
+        facets = list(dict.fromkeys(facets))
+        with self.reader() as conn:
+            facets.sort(key=lambda f: conn.execute(_SQL_FACET_SIZE, f).fetchone()[0])
+            where = _FACET_FILTER_FROM + _FACET_FILTER_EXISTS * (len(facets) - 1)
+            params: list = [p for facet in facets for p in facet]
+            if platform:
+                where += " AND c.platform = ?"
+                params.append(platform)
+            total = conn.execute("SELECT COUNT(*)" + where, params).fetchone()[0]
+            if after:
+                where += " AND (c.ingested_at, c.conversation_id) < (?, ?)"
+                params.extend(after)
+            rows = conn.execute(
+                _FACET_FILTER_LIST + where + _FACET_FILTER_ORDER, [*params, limit + 1]
+            ).fetchall()
+        has_more = len(rows) > limit
+        rows = [dict(r) for r in rows[:limit]]
+        return {
+            "conversations": rows,
+            "total": total,
+            "next_cursor": encode_cursor(rows[-1]) if has_more else None,
+        }
+
+    def get_conversation(self, conversation_id: str) -> Optional[Dict]:
+        """Get full conversation including messages."""
+        with self.reader() as conn:
+            row = conn.execute(_SQL_GET_CONVERSATION, (conversation_id,)).fetchone()
+            if not row:
+                return None
+            messages = self._read_messages(conn, row)
+            intel_row = conn.execute(
+                _SQL_GET_INTELLIGENCE, (conversation_id,)
+            ).fetchone()
+        result = self._conversation_from_row(row, messages)
+        if intel_row:
+            result["intelligence"] = _intelligence_from_row(intel_row)
+        return result
+
+    def get_intelligence(self, conversation_id: str) -> Optional[Dict]:
+        """A conversation's intelligence, without reading its messages.
+
+        Returns None if the conversation does not exist; "intelligence"
+        is None until it has been analyzed.
+        """
+        with self.reader() as conn:
+            if conn.execute(_SQL_CONVERSATION_EXISTS, (conversation_id,)).fetchone() is None:
+                return None
+            intel_row = conn.execute(
+                _SQL_GET_INTELLIGENCE, (conversation_id,)
+            ).fetchone()
+        return {
+            "conversation_id": conversation_id,
+            "intelligence": _intelligence_from_row(intel_row) if intel_row else None,
+        }
+
+    def get_security_findings(self, conversation_id: str) -> Optional[List[Dict]]:
+        """A stored conversation's security findings, or None if it does not exist."""
+        with self.reader() as conn:
+            row = conn.execute(
+                _SQL_GET_SECURITY_FINDINGS, (conversation_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return self._load_json(row["storage_format"], row["security_findings_json"])
+
+    def get_watermark(self, consumer: str) -> Optional[Tuple[str, str]]:
+        """(ingested_at, conversation_id) a change-feed consumer has reached."""
+        with self.reader() as conn:
+            row = conn.execute(_SQL_GET_WATERMARK, (consumer,)).fetchone()
+        return (row["ingested_at"], row["conversation_id"]) if row else None
+
+    def set_watermark(self, consumer: str, watermark: Tuple[str, str]) -> None:
+        with self.writer() as conn:
+            conn.execute(
+                _SQL_SET_WATERMARK,
+                (consumer, *watermark, datetime.utcnow().isoformat()),
+            )
+
+    def feed_backlog(self, watermark: Optional[Tuple[str, str]]) -> Dict:
+        """Conversations past a watermark and the oldest one's ingested_at."""
+        with self.reader() as conn:
+            row = conn.execute(_SQL_FEED_BACKLOG, watermark or ("", "")).fetchone()
+        return {"pending": row["pending"], "oldest": row["oldest"]}
+
+    def _read_messages(self, conn: sqlite3.Connection, row: sqlite3.Row) -> List[Dict]:
+        """Messages of a chat_conversations row, from messages_json for
+        rows migrate_messages has not reached, else from chat_messages."""
+        if row["messages_json"]:
+            return self._load_json(row["storage_format"], row["messages_json"])
+        return [
+            _stored_message(r)
+            for r in conn.execute(_SQL_CONVERSATION_MESSAGES, (row["conversation_id"],))
+        ]
+
+    def _conversation_from_row(self, row: sqlite3.Row, messages: List[Dict]) -> Dict:
+        result = dict(row)
+        storage_format = result.pop("storage_format")
+        result.pop("payload_bytes")
+        result.pop("messages_json")
+        result["messages"] = messages
+        result["warnings"] = self._load_json(
+            storage_format, result.pop("warnings_json")
+        )
+        result["security_findings"] = self._load_json(
+            storage_format, result.pop("security_findings_json")
+        )
+        return result
+
+    def iter_export(
+        self,
+        platform: Optional[str] = None,
+        since: Optional[str] = None,
+        has_intelligence: Optional[bool] = None,
+        batch_size: int = 200,
+        after: Optional[Tuple[str, str]] = None,
+    ) -> Iterator[Dict]:
+        """Yield full conversations with their intelligence, oldest first.
+
+        since keeps conversations ingested at or after that ISO timestamp;
+        after, an (ingested_at, conversation_id) watermark, keeps those
+        strictly past it. has_intelligence keeps only analyzed (True) or
+        unanalyzed (False) ones. Rows are read in keyset batches on (ingested_at,
+        conversation_id), so memory stays flat and no reader connection
+        or WAL snapshot is held between batches.
+        """
+        sql = _SQL_EXPORT_BATCH.format(
+            platform=_SQL_EXPORT_PLATFORM if platform else "",
+            intelligence=_SQL_EXPORT_INTELLIGENCE.get(has_intelligence, ""),
+        )
+        key = max(after or ("", ""), (since or "", ""))
+        while True:
+            params = (*key, platform, batch_size) if platform else (*key, batch_size)
+            with self.reader() as conn:
+                rows = conn.execute(sql, params).fetchall()
+                if not rows:
+                    return
+                ids = [r["conversation_id"] for r in rows]
+                placeholders = ",".join("?" * len(ids))
+                intel_rows = conn.execute(
+                    "SELECT * FROM chat_intelligence "
+                    f"WHERE conversation_id IN ({placeholders})",
+                    ids,
+                ).fetchall()
+                messages: Dict[str, List[Dict]] = {}
+                for r in conn.execute(
+                    _SQL_BATCH_MESSAGES.format(placeholders=placeholders), ids
+                ):
+                    messages.setdefault(r["conversation_id"], []).append(
+                        _stored_message(r)
+                    )
+            intelligence = {
+                r["conversation_id"]: _intelligence_from_row(r) for r in intel_rows
+            }
+            for row in rows:
+                conversation = self._conversation_from_row(
+                    row,
+                    self._load_json(row["storage_format"], row["messages_json"])
+                    if row["messages_json"]
+                    else messages.get(row["conversation_id"], []),
+                )
+                conversation["intelligence"] = intelligence.get(row["conversation_id"])
+                yield conversation
+            key = (rows[-1]["ingested_at"], rows[-1]["conversation_id"])
+
+    def get_messages(
+        self, conversation_id: str, after_seq: int = -1, limit: int = 50
+    ) -> Optional[Dict]:
+        """One page of a conversation's messages, ordered by seq.
+
+        Reads the chat_messages table, so only the requested page is
+        decoded. Conversations the background migration has not reached
+        yet are served from messages_json. Returns None if the
+        conversation does not exist.
+        """
+        with self.reader() as conn:
+            rows = conn.execute(
+                _SQL_MESSAGES_PAGE, (conversation_id, after_seq, limit + 1)
+            ).fetchall()
+            if rows:
+                messages = [_message_from_row(r) for r in rows]
+            else:
+                row = conn.execute(
+                    _SQL_GET_MESSAGES_JSON, (conversation_id,)
+                ).fetchone()
+                if row is None:
+                    return None
+                messages = []
+                if row["messages_json"]:
+                    stored = self._load_json(row["storage_format"], row["messages_json"])
+                    start = max(after_seq + 1, 0)
+                    for seq in range(start, min(start + limit + 1, len(stored))):
+                        msg = {"seq": seq, **stored[seq]}
+                        msg.setdefault("metadata", {})
+                        messages.append(msg)
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        return {
+            "conversation_id": conversation_id,
+            "messages": messages,
+            "has_more": has_more,
+            "next_after_seq": messages[-1]["seq"] if has_more else None,
+        }
+
+    def migrate_messages(self, batch_size: int = 100) -> int:
+        """Move messages_json of older conversations into chat_messages,
+        which also makes their message text searchable.
+
+        Works in short write transactions so ingest is never blocked for
+        long, and stops early when the engine is closing. Returns the
+        number of conversations migrated.
+        """
+        migrated = 0
+        last_rowid = 0
+        while not self._stop.is_set():
+            with self.writer() as conn:
+                batch = conn.execute(
+                    _SQL_UNMIGRATED_BATCH, (last_rowid, batch_size)
+                ).fetchall()
+                for row in batch:
+                    conversation_id = row["conversation_id"]
+                    text = self.codec.decode(row["storage_format"], row["messages_json"])
+                    if self.fts_enabled:
+                        conn.execute(_SQL_FTS_UNINDEX, (conversation_id,))
+                    # Why: rows saved while messages were kept in both places
+                    conn.execute(_SQL_DELETE_MESSAGES, (conversation_id,))
+                    conn.executemany(
+                        _SQL_INSERT_MESSAGE,
+                        _message_rows(conversation_id, json.loads(text)),
+                    )
+                    conn.execute(
+                        _SQL_CLEAR_MESSAGES_JSON, (_payload_bytes(text), row["rowid"])
+                    )
+                    if self.fts_enabled:
+                        conn.execute(_SQL_FTS_INDEX, (conversation_id,))
+            if not batch:
+                break
+            last_rowid = batch[-1]["rowid"]
+            migrated += len(batch)
+        if migrated:
+            logger.info("Migrated messages of %d conversations", migrated)
+        return migrated
+
+    def start_message_migration(self) -> threading.Thread:
+        """Run migrate_messages, then backfill_fingerprints, in a background
+        thread (once per engine)."""
+        if self._migration_thread is None:
+            self._migration_thread = threading.Thread(
+                target=self._run_migration,
+                name="chat-messages-migration",
+                daemon=True,
+            )
+            self._migration_thread.start()
+        return self._migration_thread
+
+    def _run_migration(self) -> None:
+        try:
+            self.migrate_messages()
+            self.backfill_fingerprints()
+        except Exception:
+            logger.exception("Message migration failed")
+
+    def _encode_payloads(self, texts: Tuple[Optional[str], ...]) -> Tuple[int, list]:
+        encoded = []
+        storage_format = self.codec.format
+        for text in texts:
+            if text is None:
+                encoded.append(None)
+                continue
+            storage_format, value = self.codec.encode(text)
+            encoded.append(value)
+        return storage_format, encoded
+
+    def _load_json(self, storage_format: int, value) -> list:
+        text = self.codec.decode(storage_format, value)
+        return json.loads(text) if text else []
+
+    def _load_dictionaries(self) -> None:
+        with self.writer() as conn:
+            rows = conn.execute(_SQL_LOAD_DICTIONARIES).fetchall()
+        if rows and zstandard is None:
+            logger.warning("zstandard is not installed; zstd rows cannot be decoded")
+            return
+        for row in rows:
+            # Older dictionaries stay loaded to decode rows written with them
+            self.codec.add_dictionary(row["data"], active=True)
+
+    def train_compression_dictionary(
+        self, samples: int = 2000, dict_size: int = 112 * 1024
+    ) -> Optional[int]:
+        """Train a zstd dictionary on stored payloads and make it active.
+
+        Returns the dictionary id, or None when zstd is not the configured
+        codec or there are too few conversations to train on.
+        """
+        if self.codec.format != FORMAT_ZSTD:
+            return None
+        with self.reader() as conn:
+            rows = conn.execute(_SQL_DICTIONARY_SAMPLE, (samples,)).fetchall()
+        if len(rows) < _MIN_DICTIONARY_SAMPLES:
+            return None
+        data = train_dictionary(
+            [
+                self.codec.decode(r["storage_format"], r[column]).encode("utf-8")
+                for r in rows
+                for column in _PAYLOAD_COLUMNS
+                if r[column]
+            ],
+            dict_size,
+        )
+        dict_id = self.codec.add_dictionary(data, active=True)
+        with self.writer() as conn:
+            conn.execute(
+                _SQL_SAVE_DICTIONARY,
+                (dict_id, data, len(rows), datetime.utcnow().isoformat()),
+            )
+        logger.info("Trained zstd dictionary %d on %d conversations", dict_id, len(rows))
+        return dict_id
+
+    def recompress(self, batch_size: int = 100) -> Dict:
+        """Re-encode rows stored in another format with the configured codec.
+
+        Short write transactions, rowid keyset order; stops early when the
+        engine is closing. Progress is kept in self.recompression.
+        """
+        target = self.codec.format
+        stats = self.recompression = {
+            "status": "running",
+            "target_format": FORMAT_NAMES[target],
+            "conversations": 0,
+            "bytes_before": 0,
+            "bytes_after": 0,
+            "started_at": datetime.utcnow().isoformat(),
+        }
+        with self.reader() as conn:
+            db_before = _database_bytes(conn)["used_bytes"]
+        start = time.perf_counter()
+        last_rowid = 0
+        while not self._stop.is_set():
+            with self.writer() as conn:
+                batch = conn.execute(
+                    _SQL_RECOMPRESS_BATCH, (last_rowid, target, batch_size)
+                ).fetchall()
+                for row in batch:
+                    texts = tuple(
+                        self.codec.decode(row["storage_format"], row[column])
+                        for column in _PAYLOAD_COLUMNS
+                    )
+                    storage_format, encoded = self._encode_payloads(texts)
+                    conn.execute(
+                        _SQL_SET_PAYLOADS,
+                        (*encoded, storage_format, _payload_bytes(*texts), row["rowid"]),
+                    )
+                    stats["bytes_before"] += row["stored_bytes"]
+                    stats["bytes_after"] += sum(
+                        len(v.encode("utf-8")) if isinstance(v, str) else len(v)
+                        for v in encoded if v is not None
+                    )
+            if not batch:
+                break
+            last_rowid = batch[-1]["rowid"]
+            stats["conversations"] += len(batch)
+        stats["bytes_saved"] = stats["bytes_before"] - stats["bytes_after"]
+        with self.reader() as conn:
+            stats["db_bytes_saved"] = db_before - _database_bytes(conn)["used_bytes"]
+        stats["elapsed_s"] = round(time.perf_counter() - start, 3)
+        stats["status"] = "stopped" if self._stop.is_set() else "completed"
+        logger.info("Recompression: %s", stats)
+        return stats
+
+    def start_recompression(self) -> bool:
+        """Run recompress in a background thread. False if one is running."""
+        thread = self._recompression_thread
+        if thread is not None and thread.is_alive():
+            return False
+        self._recompression_thread = threading.Thread(
+            target=self._run_recompression,
+            name="chat-recompression",
+            daemon=True,
+        )
+        self.recompression = {"status": "starting"}
+        self._recompression_thread.start()
+        return True
+
+    def _run_recompression(self) -> None:
+        try:
+            if self.codec.format == FORMAT_ZSTD and self.codec.active_dictionary is None:
+                self.train_compression_dictionary()
+            self.recompress()
+        except Exception as e:
+            logger.exception("Recompression failed")
+            self.recompression = {**self.recompression, "status": "failed", "error": str(e)}
+
+    def compression_report(self, sample_size: int = 200) -> Dict:
+        """Bytes stored vs. uncompressed per storage format, the time to
+        decode and parse a random sample of each format's payloads, and
+        the size of the database file and of each table in it."""
+        with self.reader() as conn:
+            formats = [dict(r) for r in conn.execute(_SQL_COMPRESSION_STATS)]
+            for entry in formats:
+                rows = conn.execute(
+                    _SQL_DECODE_SAMPLE, (entry["storage_format"], sample_size)
+                ).fetchall()
+                entry.update(self._decode_timings(rows))
+            database = _database_bytes(conn)
+            try:
+                database["tables"] = {
+                    r["name"]: r["bytes"] for r in conn.execute(_SQL_TABLE_BYTES)
+                }
+            except sqlite3.OperationalError:
+                database["tables"] = None
+        for entry in formats:
+            entry["format"] = FORMAT_NAMES.get(entry["storage_format"], "unknown")
+            entry["bytes_saved"] = entry["payload_bytes"] - entry["stored_bytes"]
+            entry["ratio"] = (
+                round(entry["payload_bytes"] / entry["stored_bytes"], 2)
+                if entry["stored_bytes"] else None
+            )
+        bytes_saved = sum(e["bytes_saved"] for e in formats)
+        # Share of the uncompressed database that compression saves; message
+        # text lives uncompressed in chat_messages and the full-text index
+        uncompressed = database["used_bytes"] + bytes_saved
+        database["saved_share"] = (
+            round(bytes_saved / uncompressed, 4) if uncompressed else None
+        )
+        return {
+            "compression": self.codec.compression,
+            "zstd_dictionary": self.codec.active_dictionary,
+            "formats": formats,
+            "bytes_saved": bytes_saved,
+            "database": database,
+            "recompression": self.recompression,
+        }
+
+    def _decode_timings(self, rows: List[sqlite3.Row]) -> Dict:
+        decode_s, parse_s = [], []
+        for row in rows:
+            start = time.perf_counter()
+            texts = [
+                self.codec.decode(row["storage_format"], row[column])
+                for column in _PAYLOAD_COLUMNS
+            ]
+            decoded = time.perf_counter()
+            for text in texts:
+                if text:
+                    json.loads(text)
+            parse_s.append(time.perf_counter() - decoded)
+            decode_s.append(decoded - start)
+        if not rows:
+            return {"sampled": 0}
+        decode_s.sort()
+        parse_s.sort()
+        return {
+            "sampled": len(rows),
+            "decode_ms_p50": round(decode_s[len(decode_s) // 2] * 1000, 4),
+            "decode_ms_p95": round(decode_s[int(len(decode_s) * 0.95)] * 1000, 4),
+            "parse_ms_p50": round(parse_s[len(parse_s) // 2] * 1000, 4),
+        }
+
+    def search_conversations(
+        self,
+        query: str,
+        limit: int = 20,
+        platform: Optional[str] = None,
+        prefix: bool = True,
+    ) -> List[Dict]:
+        """Full-text search over titles and messages, best matches first.
+
+        Results carry a BM25 score (lower is better) and a highlighted
+        snippet. Falls back to LIKE when SQLite lacks FTS5.
+        """
+        if not self.fts_enabled:
+            return self._search_like(query, limit, platform)
+        match = _fts_query(query, prefix=prefix)
+        if not match:
+            return []
+        with self.reader() as conn:
+            if platform:
+                rows = conn.execute(
+                    _SQL_SEARCH_FTS_PLATFORM, (match, platform, limit)
+                ).fetchall()
+            else:
+                rows = conn.execute(_SQL_SEARCH_FTS, (match, limit)).fetchall()
+        return [dict(r) for r in rows]
+
+    def _search_like(
+        self, query: str, limit: int, platform: Optional[str]
+    ) -> List[Dict]:
+        with self.reader() as conn:
+            if platform:
+                rows = conn.execute(
+                    _SQL_SEARCH_LIKE_PLATFORM, (f"%{query}%", limit, platform)
+                ).fetchall()
+            else:
+                rows = conn.execute(_SQL_SEARCH_LIKE, (f"%{query}%", limit)).fetchall()
+        return [dict(r) for r in rows]
+
+
+_ENGINES: Dict[Path, StorageEngine] = {}
+_ENGINES_LOCK = threading.Lock()
+
+
+def get_engine(db_path: Path = _DEFAULT_DB) -> StorageEngine:
+    """Return the shared StorageEngine for db_path, creating it on first use."""
+    key = db_path.resolve()
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(key)
+        if engine is None:
+            engine = StorageEngine(db_path)
+            _ENGINES[key] = engine
+        return engine
+
+
+# Module-level functions kept for existing callers; they delegate to the
+# shared engine for the given database path.
+
+def init_db(db_path: Path = _DEFAULT_DB) -> None:
+    """Create tables if they do not exist."""
+    get_engine(db_path).init_schema()
 
 
 def save_conversation(
     conversation: ParsedConversation, db_path: Path = _DEFAULT_DB
 ) -> str:
     """Persist a ParsedConversation. Returns conversation_id."""
-    conn = _get_conn(db_path)
-    now = datetime.utcnow().isoformat()
-    conn.execute(
-        """INSERT OR REPLACE INTO chat_conversations
-           (conversation_id, platform, title, source_url, message_count,
-            created_at, ingested_at, messages_json, warnings_json,
-            security_findings_json)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (
-            conversation.conversation_id,
-            conversation.platform,
-            conversation.title,
-            conversation.source_url,
-            len(conversation.messages),
-            conversation.created_at.isoformat() if conversation.created_at else None,
-            now,
-            json.dumps([m.to_dict() for m in conversation.messages], ensure_ascii=False),
-            json.dumps(conversation.warnings, ensure_ascii=False),
-            json.dumps(conversation.security_findings, ensure_ascii=False),
-        ),
-    )
-    conn.commit()
-    conn.close()
-    return conversation.conversation_id
+    return get_engine(db_path).save_conversation(conversation)
 
 
 def save_intelligence(
     intel: ConversationIntelligence, db_path: Path = _DEFAULT_DB
 ) -> None:
     """Persist intelligence analysis results."""
-    conn = _get_conn(db_path)
-    now = datetime.utcnow().isoformat()
-    conn.execute(
-        """INSERT OR REPLACE INTO chat_intelligence
-           (conversation_id, platform, summary, main_topics_json,
-            technologies_json, decisions_json, code_artifacts_json,
-            knowledge_json, osint_relevance, analyzed_at)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (
-            intel.conversation_id,
-            intel.platform,
-            intel.summary,
-            json.dumps(intel.main_topics, ensure_ascii=False),
-            json.dumps(intel.technologies_mentioned, ensure_ascii=False),
-            json.dumps(intel.decisions_made, ensure_ascii=False),
-            json.dumps(intel.code_artifacts, ensure_ascii=False),
-            json.dumps(intel.knowledge_extracted, ensure_ascii=False),
-            intel.osint_relevance,
-            now,
-        ),
-    )
-    conn.commit()
-    conn.close()
+    get_engine(db_path).save_intelligence(intel)
 
 
 def list_conversations(
@@ -124,67 +1879,18 @@ def list_conversations(
     db_path: Path = _DEFAULT_DB,
 ) -> List[Dict]:
     """List stored conversations (metadata only, no messages)."""
-    conn = _get_conn(db_path)
-    q = (
-        "SELECT conversation_id, platform, title, source_url, "
-        "message_count, created_at, ingested_at "
-        "FROM chat_conversations"
-    )
-    params: list = []
-    if platform:
-        q += " WHERE platform = ?"
-        params.append(platform)
-    q += " ORDER BY ingested_at DESC LIMIT ?"
-    params.append(limit)
-    rows = conn.execute(q, params).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    return get_engine(db_path).list_conversations(limit=limit, platform=platform)
 
 
 def get_conversation(
     conversation_id: str, db_path: Path = _DEFAULT_DB
 ) -> Optional[Dict]:
     """Get full conversation including messages."""
-    conn = _get_conn(db_path)
-    row = conn.execute(
-        "SELECT * FROM chat_conversations WHERE conversation_id = ?",
-        (conversation_id,),
-    ).fetchone()
-    intel_row = conn.execute(
-        "SELECT * FROM chat_intelligence WHERE conversation_id = ?",
-        (conversation_id,),
-    ).fetchone()
-    conn.close()
-    if not row:
-        return None
-    result = dict(row)
-    result["messages"] = json.loads(result.pop("messages_json", "[]"))
-    result["warnings"] = json.loads(result.pop("warnings_json", "[]"))
-    result["security_findings"] = json.loads(
-        result.pop("security_findings_json", "[]")
-    )
-    if intel_row:
-        intel = dict(intel_row)
-        intel["main_topics"] = json.loads(intel.pop("main_topics_json", "[]"))
-        intel["technologies"] = json.loads(intel.pop("technologies_json", "[]"))
-        intel["decisions"] = json.loads(intel.pop("decisions_json", "[]"))
-        intel["code_artifacts"] = json.loads(intel.pop("code_artifacts_json", "[]"))
-        intel["knowledge"] = json.loads(intel.pop("knowledge_json", "[]"))
-        result["intelligence"] = intel
-    return result
+    return get_engine(db_path).get_conversation(conversation_id)
 
 
 def search_conversations(
     query: str, limit: int = 20, db_path: Path = _DEFAULT_DB
 ) -> List[Dict]:
-    """Full-text search over conversation messages (SQLite LIKE)."""
-    conn = _get_conn(db_path)
-    rows = conn.execute(
-        """SELECT conversation_id, platform, title, message_count, ingested_at
-           FROM chat_conversations
-           WHERE messages_json LIKE ?
-           ORDER BY ingested_at DESC LIMIT ?""",
-        (f"%{query}%", limit),
-    ).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    """Full-text search over conversation titles and messages."""
+    return get_engine(db_path).search_conversations(query, limit=limit)
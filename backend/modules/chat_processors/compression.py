@@ -0,0 +1,158 @@
+"""
+Module: compression.py
+Project: MW-Vision | MindWareHouse
+Author: Claudia CLI (AI Field Commander)
+Date: 2026-02-25
+Purpose: Transparent streaming decompression for archived transcripts and
+         exports (.gz, .bz2, .xz, and .zst when zstandard is installed).
+         Compression is detected by file extension, then by magic bytes.
+Dependencies: gzip, bz2, lzma, zlib, zstandard (optional)
+Integration Points: export_claude.py, export_gemini.py, parallel_scan.py
+"""
+
+from __future__ import annotations
+
+import bz2
+import gzip
+import logging
+import lzma
+import zlib
+from pathlib import Path
+from typing import IO
+
+logger = logging.getLogger("mw.export.compression")
+
+COMPRESSION_SUFFIXES: dict[str, str] = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+}
+
+_MAGIC_BYTES: list[tuple[bytes, str]] = [
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+]
+
+# Why: errors a corrupt or truncated archive can raise while streaming
+DECOMPRESSION_ERRORS: tuple[type[BaseException], ...] = (
+    OSError,
+    EOFError,
+    lzma.LZMAError,
+    zlib.error,
+)
+
+
+def _zstd():
+    """Return the zstandard module, or raise if it is not installed."""
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise OSError(
+            "zstd input requires the zstandard package"
+        ) from exc
+    return zstandard
+
+
+def detect_compression(path: Path, head: bytes | None = None) -> str | None:
+    """
+    Detect the compression of a file.
+
+    Args:
+        path: File path (its last suffix is checked first).
+        head: Optional leading bytes; read from path if omitted and the
+            suffix is not a known compression suffix.
+
+    Returns:
+        "gzip", "bz2", "xz", "zstd", or None for uncompressed input.
+    """
+    by_suffix = COMPRESSION_SUFFIXES.get(path.suffix.lower())
+    if by_suffix:
+        return by_suffix
+
+    if head is None:
+        with path.open("rb") as fh:
+            head = fh.read(6)
+    for magic, name in _MAGIC_BYTES:
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def logical_path(path: Path) -> Path:
+    """Strip a compression suffix: "a.jsonl.gz" -> "a.jsonl"."""
+    if path.suffix.lower() in COMPRESSION_SUFFIXES:
+        return path.with_suffix("")
+    return path
+
+
+def find_inputs(directory: Path, suffix: str) -> list[Path]:
+    """
+    List files with the given suffix, plain or compressed.
+
+    Args:
+        directory: Directory to scan (non-recursive).
+        suffix: Logical suffix such as ".jsonl" or ".json".
+
+    Returns:
+        Sorted paths matching *{suffix} and *{suffix}.{gz,bz2,xz,zst}.
+    """
+    paths = list(directory.glob(f"*{suffix}"))
+    for compressed_suffix in COMPRESSION_SUFFIXES:
+        paths.extend(directory.glob(f"*{suffix}{compressed_suffix}"))
+    return sorted(paths)
+
+
+def open_binary(path: Path) -> IO[bytes]:
+    """
+    Open a file for streaming binary reads, decompressing if needed.
+
+    Args:
+        path: Plain or compressed file.
+
+    Returns:
+        Readable binary file object (use as a context manager).
+
+    Raises:
+        FileNotFoundError: If path does not exist.
+        OSError: If the file is zstd-compressed and zstandard is missing.
+    """
+    compression = detect_compression(path)
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "bz2":
+        return bz2.open(path, "rb")
+    if compression == "xz":
+        return lzma.open(path, "rb")
+    if compression == "zstd":
+        zstandard = _zstd()
+        return zstandard.ZstdDecompressor().stream_reader(
+            path.open("rb"), closefd=True
+        )
+    return path.open("rb")
+
+
+def decompress_bytes(data: bytes, path: Path) -> bytes:
+    """
+    Decompress an in-memory file read from path, if it is compressed.
+
+    Args:
+        data: Raw file contents.
+        path: Originating path (for suffix detection).
+
+    Returns:
+        Decompressed bytes (data itself when uncompressed).
+    """
+    compression = detect_compression(path, head=data[:6])
+    if compression == "gzip":
+        return gzip.decompress(data)
+    if compression == "bz2":
+        return bz2.decompress(data)
+    if compression == "xz":
+        return lzma.decompress(data)
+    if compression == "zstd":
+        # Why: decompressobj copes with frames that omit the content size
+        return _zstd().ZstdDecompressor().decompressobj().decompress(data)
+    return data
@@ -6,7 +6,8 @@ Date: 2026-02-25
 Purpose: Merge all chat exports (Claude, Gemini, etc.) into a unified
          knowledge corpus. Deduplicates, tags, and prepares for RAG indexing.
 Dependencies: json, pathlib, hashlib
-Integration Points: export_claude.py, export_gemini.py, rag/indexer.py
+Integration Points: export_claude.py, export_gemini.py, parallel_scan.py,
+                    rag/indexer.py
 """
 
 from __future__ import annotations
@@ -21,10 +22,12 @@ from typing import Any
 
 from export_claude import (
     ConversationExport,
+    TranscriptEvent,
     export_to_unified_format,
     scan_claude_transcripts,
 )
 from export_gemini import scan_gemini_exports
+from parallel_scan import scan_exports_parallel
 
 logger = logging.getLogger("mw.consolidator")
 
@@ -102,6 +105,7 @@ def consolidate_exports(
 def consolidate_from_directories(
     claude_dir: Path | None = None,
     gemini_dir: Path | None = None,
+    parallel: bool = False,
 ) -> ConsolidatedCorpus:
     """
     Scan directories and consolidate all chat exports.
@@ -109,6 +113,8 @@ def consolidate_from_directories(
     Args:
         claude_dir: Directory with Claude JSONL transcripts.
         gemini_dir: Directory with Gemini JSON exports.
+        parallel: Use the concurrent scanner (for large archives or
+            network storage).
 
     Returns:
         ConsolidatedCorpus.
@@ -116,11 +122,17 @@ def consolidate_from_directories(
     all_exports: list[ConversationExport] = []
 
     if claude_dir and claude_dir.exists():
-        claude_exports = scan_claude_transcripts(claude_dir)
+        if parallel:
+            claude_exports = scan_exports_parallel(claude_dir, "claude")
+        else:
+            claude_exports = scan_claude_transcripts(claude_dir)
         all_exports.extend(claude_exports)
 
     if gemini_dir and gemini_dir.exists():
-        gemini_exports = scan_gemini_exports(gemini_dir)
+        if parallel:
+            gemini_exports = scan_exports_parallel(gemini_dir, "gemini")
+        else:
+            gemini_exports = scan_gemini_exports(gemini_dir)
         all_exports.extend(gemini_exports)
 
     return consolidate_exports(all_exports)
@@ -255,3 +267,55 @@ def extract_knowledge_chunks(
         corpus.total_conversations,
     )
     return chunks
+
+
+def extract_event_chunks(
+    events: list[TranscriptEvent],
+    max_chunk_chars: int = 2000,
+) -> list[dict[str, Any]]:
+    """
+    Build indexable chunks from incremental transcript events.
+
+    Used with TranscriptFollower to feed newly appended messages to the
+    RAG indexer without re-consolidating whole transcripts. Consecutive
+    events of the same conversation are packed into chunks shaped like
+    those of extract_knowledge_chunks.
+
+    Args:
+        events: TranscriptEvents in arrival order.
+        max_chunk_chars: Maximum characters per chunk.
+
+    Returns:
+        List of chunk dicts with text, metadata, and source info.
+    """
+    if max_chunk_chars < 1:
+        raise ValueError(f"max_chunk_chars must be >= 1, got {max_chunk_chars}")
+
+    chunks: list[dict[str, Any]] = []
+    current: dict[str, Any] | None = None
+
+    for event in events:
+        text = f"[{event.message.role}]: {event.message.content}\n"
+        if (
+            current is None
+            or current["conversation_id"] != event.conversation_id
+            or len(current["text"]) + len(text) > max_chunk_chars
+        ):
+            if current and current["text"].strip():
+                current["text"] = current["text"].strip()
+                chunks.append(current)
+            current = {
+                "text": "",
+                "source": event.source,
+                "conversation_id": event.conversation_id,
+                "title": event.title,
+                "message_count": 0,
+            }
+        current["text"] += text
+        current["message_count"] += 1
+
+    if current and current["text"].strip():
+        current["text"] = current["text"].strip()
+        chunks.append(current)
+
+    return chunks
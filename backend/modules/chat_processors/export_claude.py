@@ -5,9 +5,10 @@ Author: Claudia CLI (AI Field Commander)
 Date: 2026-02-25
 Purpose: Export and parse Claude conversation transcripts into a unified
          format for knowledge consolidation. Handles Claude Code JSONL
-         transcripts and Anthropic API conversation logs.
+         transcripts and Anthropic API conversation logs, including
+         tail-following of live transcripts via byte-offset checkpoints.
 Dependencies: json, pathlib, dataclasses
-Integration Points: consolidator.py, rag/indexer.py
+Integration Points: compression.py, consolidator.py, rag/indexer.py
 """
 
 from __future__ import annotations
@@ -16,25 +17,64 @@ import json
 import logging
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from pathlib import Path
 from typing import Any
 
+from compression import (
+    DECOMPRESSION_ERRORS,
+    decompress_bytes,
+    detect_compression,
+    find_inputs,
+    logical_path,
+    open_binary,
+)
+
 logger = logging.getLogger("mw.export.claude")
 
 
-@dataclass
+def _intern(value: Any) -> Any:
+    """Intern short repeated strings (roles, models, sources)."""
+    return sys.intern(value) if type(value) is str else value
+
+
+@dataclass(slots=True)
 class ConversationMessage:
-    """A single message in a conversation."""
+    """
+    A single message in a conversation.
+
+    Slotted, with interned role/model strings and an empty tuple standing
+    in for tool_calls until a message actually has some, since corpora
+    hold millions of these.
+    """
 
     role: str  # "human", "assistant", "system"
     content: str
     timestamp: str = ""
     model: str = ""
-    tool_calls: list[str] = field(default_factory=list)
+    tool_calls: Sequence[str] = ()
     token_count: int = 0
 
+    def __post_init__(self) -> None:
+        self.role = _intern(self.role)
+        self.model = _intern(self.model)
+        if not self.tool_calls:
+            self.tool_calls = ()
 
-@dataclass
+    def to_unified(self) -> dict[str, Any]:
+        """Unified-format message dict sharing this message's strings."""
+        return {
+            "role": self.role,
+            "content": self.content,
+            "timestamp": self.timestamp,
+            "model": self.model,
+            "token_count": self.token_count,
+        }
+
+
+@dataclass(slots=True)
 class ConversationExport:
     """Exported conversation with metadata."""
 
@@ -45,7 +85,11 @@ class ConversationExport:
     messages: list[ConversationMessage] = field(default_factory=list)
     total_tokens: int = 0
     model: str = ""
-    tags: list[str] = field(default_factory=list)
+    tags: Sequence[str] = ()
+
+    def __post_init__(self) -> None:
+        self.source = _intern(self.source)
+        self.model = _intern(self.model)
 
     @property
     def message_count(self) -> int:
@@ -65,7 +109,9 @@ def parse_jsonl_transcript(file_path: Path) -> ConversationExport:
     Parse a Claude Code JSONL transcript file.
 
     Claude Code stores transcripts as JSONL with one JSON object
-    per line, each containing role, content, and metadata.
+    per line, each containing role, content, and metadata. Archived
+    transcripts (.jsonl.gz, .bz2, .xz, .zst) are decompressed while
+    streaming.
 
     Args:
         file_path: Path to the .jsonl transcript file.
@@ -79,26 +125,42 @@ def parse_jsonl_transcript(file_path: Path) -> ConversationExport:
     if not file_path.exists():
         raise FileNotFoundError(f"Transcript not found: {file_path}")
 
+    with open_binary(file_path) as fh:
+        return _build_transcript_export(fh, file_path)
+
+
+def parse_jsonl_bytes(data: bytes, file_path: Path) -> ConversationExport:
+    """
+    Parse an already-read Claude Code JSONL transcript.
+
+    Used by the parallel scanner, which reads files in I/O threads and
+    decodes them in worker processes.
+
+    Args:
+        data: Raw file contents, possibly compressed.
+        file_path: Originating path (for conversation id and logging).
+
+    Returns:
+        ConversationExport with all messages.
+    """
+    data = decompress_bytes(data, file_path)
+    return _build_transcript_export(data.splitlines(), file_path)
+
+
+def _build_transcript_export(
+    lines: Iterable[str] | Iterable[bytes], file_path: Path
+) -> ConversationExport:
+    """Assemble a ConversationExport from transcript lines."""
     export = ConversationExport(
         source="claude_code",
-        conversation_id=file_path.stem,
+        conversation_id=logical_path(file_path).stem,
         timestamp=datetime.now(UTC).isoformat(),
     )
 
-    lines = file_path.read_text(encoding="utf-8").strip().split("\n")
-
     for line in lines:
-        if not line.strip():
-            continue
-        try:
-            entry = json.loads(line)
-            msg = _parse_jsonl_entry(entry)
-            if msg:
-                export.messages.append(msg)
-        except json.JSONDecodeError:
-            logger.warning(
-                "Skipping malformed JSONL line in %s", file_path
-            )
+        msg = _parse_jsonl_line(line, file_path)
+        if msg:
+            export.messages.append(msg)
 
     if export.messages:
         export.title = _infer_title(export.messages)
@@ -106,6 +168,22 @@ def parse_jsonl_transcript(file_path: Path) -> ConversationExport:
     return export
 
 
+def _parse_jsonl_line(
+    line: str | bytes, file_path: Path
+) -> ConversationMessage | None:
+    """Decode one JSONL line, logging and skipping malformed input."""
+    if not line.strip():
+        return None
+    try:
+        entry = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        logger.warning("Skipping malformed JSONL line in %s", file_path)
+        return None
+    if not isinstance(entry, dict):
+        return None
+    return _parse_jsonl_entry(entry)
+
+
 def _parse_jsonl_entry(entry: dict[str, Any]) -> ConversationMessage | None:
     """Parse a single JSONL entry into a ConversationMessage."""
     role = entry.get("role", "")
@@ -138,7 +216,7 @@ def _parse_jsonl_entry(entry: dict[str, Any]) -> ConversationMessage | None:
         content=content,
         timestamp=entry.get("timestamp", ""),
         model=entry.get("model", ""),
-        tool_calls=entry.get("tool_calls", []),
+        tool_calls=entry.get("tool_calls") or (),
         token_count=entry.get("usage", {}).get("total_tokens", 0),
     )
 
@@ -208,17 +286,8 @@ def export_to_unified_format(
         "timestamp": export.timestamp,
         "model": export.model,
         "message_count": export.message_count,
-        "messages": [
-            {
-                "role": m.role,
-                "content": m.content,
-                "timestamp": m.timestamp,
-                "model": m.model,
-                "token_count": m.token_count,
-            }
-            for m in export.messages
-        ],
-        "tags": export.tags,
+        "messages": [m.to_unified() for m in export.messages],
+        "tags": list(export.tags),
     }
 
 
@@ -226,7 +295,8 @@ def scan_claude_transcripts(
     directory: Path,
 ) -> list[ConversationExport]:
     """
-    Scan a directory for Claude Code JSONL transcripts.
+    Scan a directory for Claude Code JSONL transcripts, plain or
+    compressed.
 
     Args:
         directory: Directory to scan.
@@ -235,7 +305,7 @@ def scan_claude_transcripts(
         List of parsed ConversationExports.
     """
     exports = []
-    for jsonl_file in sorted(directory.glob("*.jsonl")):
+    for jsonl_file in find_inputs(directory, ".jsonl"):
         try:
             export = parse_jsonl_transcript(jsonl_file)
             exports.append(export)
@@ -244,8 +314,218 @@ def scan_claude_transcripts(
                 jsonl_file.name,
                 export.message_count,
             )
-        except (json.JSONDecodeError, FileNotFoundError) as exc:
+        except (json.JSONDecodeError, *DECOMPRESSION_ERRORS) as exc:
             logger.warning("Skipping %s: %s", jsonl_file, exc)
 
     logger.info("Scanned %d Claude transcripts", len(exports))
     return exports
+
+
+@dataclass
+class TranscriptCheckpoint:
+    """Last consumed position of a followed transcript file."""
+
+    path: str
+    offset: int = 0
+    inode: int = 0
+    size: int = 0
+    title: str = ""
+
+
+@dataclass
+class TranscriptEvent:
+    """A message newly appended to a followed transcript."""
+
+    conversation_id: str
+    message: ConversationMessage
+    offset: int = 0  # byte offset just past the line that produced it
+    title: str = ""
+    source: str = "claude_code"
+
+    def to_unified(self) -> dict[str, Any]:
+        """Convert to a unified-format message tagged with its conversation."""
+        return {
+            "source": self.source,
+            "conversation_id": self.conversation_id,
+            "title": self.title,
+            "role": self.message.role,
+            "content": self.message.content,
+            "timestamp": self.message.timestamp,
+            "model": self.message.model,
+            "token_count": self.message.token_count,
+        }
+
+
+class TranscriptFollower:
+    """
+    Tail-follow growing Claude Code JSONL transcripts.
+
+    Keeps one byte-offset checkpoint per file and only parses complete
+    lines appended since the last poll. A trailing partial line is left
+    unconsumed until its newline arrives. Truncation or rotation is
+    detected by an inode change or the file shrinking below the
+    checkpoint, in which case the file is re-read from the start.
+    """
+
+    def __init__(self, checkpoint_path: Path | None = None):
+        self.checkpoint_path = checkpoint_path
+        self.checkpoints: dict[str, TranscriptCheckpoint] = {}
+        if checkpoint_path and checkpoint_path.exists():
+            self._load_checkpoints()
+
+    def poll_file(self, file_path: Path) -> list[TranscriptEvent]:
+        """
+        Parse lines appended to file_path since its last checkpoint.
+
+        Args:
+            file_path: Path to a .jsonl transcript.
+
+        Returns:
+            New TranscriptEvents in file order (possibly empty). Always
+            empty for compressed files, which cannot be tailed by offset.
+
+        Raises:
+            FileNotFoundError: If file_path does not exist.
+        """
+        if not file_path.exists():
+            raise FileNotFoundError(f"Transcript not found: {file_path}")
+        if detect_compression(file_path) is not None:
+            logger.debug("Not tailing compressed transcript %s", file_path)
+            return []
+
+        key = str(file_path.resolve())
+        stat = file_path.stat()
+        checkpoint = self.checkpoints.get(key)
+        if checkpoint is None:
+            checkpoint = TranscriptCheckpoint(path=key, inode=stat.st_ino)
+            self.checkpoints[key] = checkpoint
+        elif checkpoint.inode != stat.st_ino or stat.st_size < checkpoint.offset:
+            # Why: rotated (new inode) or truncated in place (size reset)
+            logger.info("Transcript %s rotated or truncated, rereading", file_path)
+            checkpoint.offset = 0
+            checkpoint.inode = stat.st_ino
+            checkpoint.title = ""
+
+        checkpoint.size = stat.st_size
+        if stat.st_size == checkpoint.offset:
+            return []
+
+        with file_path.open("rb") as fh:
+            fh.seek(checkpoint.offset)
+            data = fh.read(stat.st_size - checkpoint.offset)
+
+        # Why: only consume up to the last newline; the rest is a line
+        # still being written
+        end = data.rfind(b"\n")
+        if end < 0:
+            return []
+
+        events: list[TranscriptEvent] = []
+        position = checkpoint.offset
+        for raw_line in data[: end + 1].splitlines(keepends=True):
+            position += len(raw_line)
+            msg = _parse_jsonl_line(raw_line, file_path)
+            if msg is None:
+                continue
+            if not checkpoint.title and msg.role == "human" and msg.content:
+                checkpoint.title = _infer_title([msg])
+            events.append(
+                TranscriptEvent(
+                    conversation_id=file_path.stem,
+                    message=msg,
+                    offset=position,
+                    title=checkpoint.title,
+                )
+            )
+
+        checkpoint.offset += end + 1
+        return events
+
+    def poll(self, directory: Path) -> list[TranscriptEvent]:
+        """
+        Poll every plain JSONL transcript in a directory once.
+
+        Compressed archives (*.jsonl.gz etc.) are finished transcripts;
+        read them with parse_jsonl_transcript instead.
+
+        Args:
+            directory: Directory containing .jsonl transcripts.
+
+        Returns:
+            New TranscriptEvents across all files.
+        """
+        events: list[TranscriptEvent] = []
+        for jsonl_file in sorted(directory.glob("*.jsonl")):
+            try:
+                events.extend(self.poll_file(jsonl_file))
+            except OSError as exc:
+                # Why: file may be removed between glob and open
+                logger.warning("Skipping %s: %s", jsonl_file, exc)
+        return events
+
+    def follow(
+        self,
+        directory: Path,
+        interval: float = 1.0,
+        should_stop: Callable[[], bool] | None = None,
+    ) -> Iterator[TranscriptEvent]:
+        """
+        Yield new TranscriptEvents as transcripts grow.
+
+        Checkpoints are saved after every poll that produced events, so
+        a restarted follower resumes where the previous one stopped.
+
+        Args:
+            directory: Directory containing .jsonl transcripts.
+            interval: Seconds to sleep between polls.
+            should_stop: Optional callable; following ends when it
+                returns True.
+
+        Yields:
+            TranscriptEvent for each newly appended message.
+        """
+        if interval <= 0:
+            raise ValueError(f"interval must be > 0, got {interval}")
+
+        while not (should_stop and should_stop()):
+            events = self.poll(directory)
+            if events:
+                yield from events
+                self.save_checkpoints()
+            time.sleep(interval)
+
+    def save_checkpoints(self) -> None:
+        """Persist checkpoints to checkpoint_path, if configured."""
+        if not self.checkpoint_path:
+            return
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        data = [
+            {
+                "path": cp.path,
+                "offset": cp.offset,
+                "inode": cp.inode,
+                "size": cp.size,
+                "title": cp.title,
+            }
+            for cp in self.checkpoints.values()
+        ]
+        self.checkpoint_path.write_text(
+            json.dumps(data, ensure_ascii=False),
+            encoding="utf-8",
+        )
+
+    def _load_checkpoints(self) -> None:
+        """Load checkpoints saved by a previous follower."""
+        try:
+            data = json.loads(
+                self.checkpoint_path.read_text(encoding="utf-8")
+            )
+            self.checkpoints = {
+                c["path"]: TranscriptCheckpoint(**c) for c in data
+            }
+        except (json.JSONDecodeError, OSError, TypeError, KeyError) as exc:
+            logger.warning(
+                "Ignoring unreadable checkpoints %s: %s",
+                self.checkpoint_path,
+                exc,
+            )
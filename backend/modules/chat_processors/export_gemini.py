@@ -5,30 +5,48 @@ Author: Claudia CLI (AI Field Commander)
 Date: 2026-02-25
 Purpose: Export and parse Google Gemini conversation logs into the unified
          MindWareHouse format. Handles Gemini API response format and
-         Google AI Studio exports.
-Dependencies: json, pathlib, dataclasses
-Integration Points: consolidator.py, rag/indexer.py
+         Google AI Studio exports, streaming very large exports message
+         by message.
+Dependencies: json, pathlib, dataclasses, ijson (optional)
+Integration Points: compression.py, json_stream.py, consolidator.py,
+                    rag/indexer.py
 """
 
 from __future__ import annotations
 
+import io
 import json
 import logging
+from collections.abc import Iterator
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any
-
+from typing import IO, Any
+
+from compression import (
+    DECOMPRESSION_ERRORS,
+    decompress_bytes,
+    detect_compression,
+    find_inputs,
+    logical_path,
+    open_binary,
+)
 from export_claude import ConversationExport, ConversationMessage
+from json_stream import JsonStream
 
 logger = logging.getLogger("mw.export.gemini")
 
+# Why: exports above this size are parsed incrementally instead of
+# being loaded whole with json.loads
+STREAMING_THRESHOLD_BYTES = 32 * 1024 * 1024
+
 
 def parse_gemini_json(file_path: Path) -> ConversationExport:
     """
     Parse a Gemini conversation JSON export.
 
     Google AI Studio exports conversations as JSON with contents[]
-    array containing parts[].text for each role.
+    array containing parts[].text for each role. Compressed exports
+    (.json.gz, .bz2, .xz, .zst) are decompressed while streaming.
 
     Args:
         file_path: Path to the Gemini JSON export.
@@ -42,18 +60,43 @@ def parse_gemini_json(file_path: Path) -> ConversationExport:
     if not file_path.exists():
         raise FileNotFoundError(f"Gemini export not found: {file_path}")
 
+    # Why: a compressed export may be many times its on-disk size
+    if (
+        detect_compression(file_path) is not None
+        or file_path.stat().st_size > STREAMING_THRESHOLD_BYTES
+    ):
+        return parse_gemini_json_streaming(file_path)
+
+    return parse_gemini_bytes(file_path.read_bytes(), file_path)
+
+
+def parse_gemini_bytes(data: bytes, file_path: Path) -> ConversationExport:
+    """
+    Parse an already-read Gemini JSON export.
+
+    Used by the parallel scanner, which reads files in I/O threads and
+    decodes them in worker processes.
+
+    Args:
+        data: Raw file contents, possibly compressed.
+        file_path: Originating path (for conversation id and logging).
+
+    Returns:
+        ConversationExport (empty if the JSON is malformed).
+    """
+    conversation_id = logical_path(file_path).stem
     try:
-        data = json.loads(file_path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError as exc:
+        data = json.loads(decompress_bytes(data, file_path))
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
         logger.error("Failed to parse Gemini JSON %s: %s", file_path, exc)
         return ConversationExport(
             source="gemini",
-            conversation_id=file_path.stem,
+            conversation_id=conversation_id,
             timestamp=datetime.now(UTC).isoformat(),
         )
     export = ConversationExport(
         source="gemini",
-        conversation_id=file_path.stem,
+        conversation_id=conversation_id,
         timestamp=datetime.now(UTC).isoformat(),
     )
 
@@ -73,8 +116,154 @@ def parse_gemini_json(file_path: Path) -> ConversationExport:
     return export
 
 
+def parse_gemini_json_streaming(file_path: Path) -> ConversationExport:
+    """
+    Parse a Gemini JSON export without loading the whole document.
+
+    Memory is bounded by the largest single contents[] entry rather
+    than by the export size. On malformed JSON the messages decoded
+    before the error are kept and the error is logged.
+
+    Args:
+        file_path: Path to the Gemini JSON export.
+
+    Returns:
+        ConversationExport with all messages.
+
+    Raises:
+        FileNotFoundError: If file_path does not exist.
+    """
+    export = ConversationExport(
+        source="gemini",
+        conversation_id=logical_path(file_path).stem,
+        timestamp=datetime.now(UTC).isoformat(),
+    )
+    meta: dict[str, Any] = {}
+
+    try:
+        for msg in iter_gemini_messages(file_path, meta):
+            export.messages.append(msg)
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+        logger.error("Failed to parse Gemini JSON %s: %s", file_path, exc)
+
+    if export.messages:
+        export.title = _infer_gemini_title(export.messages)
+
+    model = meta.get("model")
+    export.model = model if isinstance(model, str) and model else "gemini"
+
+    return export
+
+
+def iter_gemini_messages(
+    file_path: Path,
+    meta: dict[str, Any] | None = None,
+) -> Iterator[ConversationMessage]:
+    """
+    Stream ConversationMessages from a Gemini JSON export one at a time.
+
+    Walks the top-level contents[] array (or a top-level array) with
+    ijson when installed, otherwise with a chunked incremental decoder.
+
+    Args:
+        file_path: Path to the Gemini JSON export.
+        meta: Optional dict filled with top-level scalar fields (e.g.
+            "model") as they are encountered.
+
+    Yields:
+        ConversationMessage per non-empty contents[] entry.
+
+    Raises:
+        FileNotFoundError: If file_path does not exist.
+        json.JSONDecodeError: If the document is malformed.
+    """
+    if not file_path.exists():
+        raise FileNotFoundError(f"Gemini export not found: {file_path}")
+
+    meta = meta if meta is not None else {}
+
+    with open_binary(file_path) as fh:
+        try:
+            import ijson
+        except ImportError:
+            entries = _iter_entries_chunked(
+                io.TextIOWrapper(fh, encoding="utf-8-sig"), meta
+            )
+        else:
+            entries = _iter_entries_ijson(ijson, fh, meta)
+
+        for entry in entries:
+            msg = _parse_gemini_entry(entry)
+            if msg:
+                yield msg
+
+
+def _iter_entries_ijson(
+    ijson: Any, fh: IO[bytes], meta: dict[str, Any]
+) -> Iterator[Any]:
+    """Yield contents[] entries using ijson parse events."""
+    from ijson.common import ObjectBuilder
+
+    item_prefix = None
+    builder = None
+    depth = 0
+
+    try:
+        for prefix, event, value in ijson.parse(fh):
+            if builder is not None:
+                builder.event(event, value)
+                if event in ("start_map", "start_array"):
+                    depth += 1
+                elif event in ("end_map", "end_array"):
+                    depth -= 1
+                    if depth == 0:
+                        yield builder.value
+                        builder = None
+                continue
+
+            if item_prefix is None:
+                # Why: first event tells a bare array from an object
+                item_prefix = "item" if event == "start_array" else "contents.item"
+            elif prefix == item_prefix and event in ("start_map", "start_array"):
+                builder = ObjectBuilder()
+                builder.event(event, value)
+                depth = 1
+            elif (
+                item_prefix == "contents.item"
+                and prefix
+                and "." not in prefix
+                and event in ("string", "number", "boolean")
+            ):
+                meta[prefix] = value
+    except ijson.JSONError as exc:
+        raise json.JSONDecodeError(str(exc), "", 0) from exc
+
+
+def _iter_entries_chunked(
+    fh: IO[str], meta: dict[str, Any]
+) -> Iterator[Any]:
+    """Yield contents[] entries with a chunked raw_decode walker."""
+    stream = JsonStream(fh)
+    ch = stream.peek()
+    if ch == "[":
+        yield from stream.iter_array()
+    elif ch == "{":
+        for key in stream.iter_object():
+            if key == "contents" and stream.peek() == "[":
+                yield from stream.iter_array()
+            else:
+                value = stream.decode_value()
+                if not isinstance(value, (dict, list)):
+                    meta[key] = value
+    else:
+        raise stream.error("Expected object or array")
+    stream.expect_end()
+
+
 def _parse_gemini_entry(entry: dict[str, Any]) -> ConversationMessage | None:
     """Parse a single Gemini content entry."""
+    if not isinstance(entry, dict):
+        return None
     role = entry.get("role", "")
     # Why: Gemini uses "user"/"model", normalize to "human"/"assistant"
     if role == "user":
@@ -172,7 +361,7 @@ def scan_gemini_exports(
     directory: Path,
 ) -> list[ConversationExport]:
     """
-    Scan a directory for Gemini JSON exports.
+    Scan a directory for Gemini JSON exports, plain or compressed.
 
     Args:
         directory: Directory to scan for .json files.
@@ -181,7 +370,7 @@ def scan_gemini_exports(
         List of parsed ConversationExports.
     """
     exports = []
-    for json_file in sorted(directory.glob("*.json")):
+    for json_file in find_inputs(directory, ".json"):
         try:
             export = parse_gemini_json(json_file)
             exports.append(export)
@@ -190,7 +379,7 @@ def scan_gemini_exports(
                 json_file.name,
                 export.message_count,
             )
-        except (json.JSONDecodeError, FileNotFoundError) as exc:
+        except (json.JSONDecodeError, *DECOMPRESSION_ERRORS) as exc:
             logger.warning("Skipping %s: %s", json_file, exc)
 
     logger.info("Scanned %d Gemini exports", len(exports))
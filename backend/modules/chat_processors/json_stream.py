@@ -0,0 +1,171 @@
+"""
+Module: json_stream.py
+Project: MW-Vision | MindWareHouse
+Author: Claudia CLI (AI Field Commander)
+Date: 2026-10-19
+Purpose: Strict incremental reader for very large JSON documents, used
+         when ijson is not installed. Values are decoded one at a time
+         with json.JSONDecoder.raw_decode over a growing text buffer, so
+         only the current array element is held in memory.
+Dependencies: json
+Integration Points: export_gemini.py, chat_processor/bulk.py
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from typing import IO, Any
+
+STREAM_CHUNK_CHARS = 64 * 1024
+
+_WHITESPACE = frozenset(" \t\r\n")
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+
+class JsonStream:
+    """
+    Incremental reader over a text stream of JSON.
+
+    Separators are checked as strictly as json.loads: a missing, leading
+    or trailing comma raises json.JSONDecodeError.
+    """
+
+    def __init__(self, fh: IO[str], chunk_chars: int = STREAM_CHUNK_CHARS):
+        if chunk_chars < 1:
+            raise ValueError(f"chunk_chars must be >= 1, got {chunk_chars}")
+        self._fh = fh
+        self._chunk_chars = chunk_chars
+        self._decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def error(self, msg: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(msg, self.buf, self.pos)
+
+    def _fill(self) -> None:
+        """Drop consumed text and read at least as much as is buffered."""
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+        # Why: grow reads geometrically so a huge value is re-scanned
+        # O(log n) times rather than once per chunk
+        chunk = self._fh.read(max(self._chunk_chars, len(self.buf)))
+        if not chunk:
+            self.eof = True
+        self.buf += chunk
+
+    def _next_char(self) -> str:
+        """Next non-whitespace character, or "" at the end of the stream."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return ""
+            self._fill()
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        ch = self._next_char()
+        if not ch:
+            raise self.error("Unexpected end of JSON")
+        return ch
+
+    def advance(self) -> None:
+        self.pos += 1
+
+    def expect(self, ch: str) -> None:
+        """Consume the next non-whitespace character, which must be ch."""
+        if self.peek() != ch:
+            raise self.error(f"Expected {ch!r}")
+        self.advance()
+
+    def expect_end(self) -> None:
+        """Require that only whitespace is left in the stream."""
+        if self._next_char():
+            raise self.error("Extra data")
+
+    def decode_value(self) -> Any:
+        """Decode one JSON value at the current position."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill()
+                continue
+            # Why: a number cut at the buffer edge ("1." of "1.5") decodes
+            # as a shorter number; only trust it once a delimiter follows
+            if (
+                isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and not self.eof
+                and (end == len(self.buf) or self.buf[end] in _NUMBER_CHARS)
+            ):
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def iter_array(self) -> Iterator[Any]:
+        """Yield the elements of the array starting at the current position."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.advance()
+            return
+        while True:
+            yield self.decode_value()
+            ch = self.peek()
+            self.advance()
+            if ch == "]":
+                return
+            if ch != ",":
+                raise self.error("Expected ',' or ']'")
+
+    def iter_object(self) -> Iterator[str]:
+        """
+        Yield the keys of the object starting at the current position.
+
+        After each key the stream is positioned at its value, which the
+        caller must consume (decode_value or iter_array) before resuming.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.advance()
+            return
+        while True:
+            if self.peek() != '"':
+                raise self.error("Expected property name")
+            key = self.decode_value()
+            self.expect(":")
+            yield key
+            ch = self.peek()
+            self.advance()
+            if ch == "}":
+                return
+            if ch != ",":
+                raise self.error("Expected ',' or '}'")
+
+
+def iter_json_items(
+    fh: IO[str], chunk_chars: int = STREAM_CHUNK_CHARS
+) -> Iterator[Any]:
+    """
+    Yield the items of a top-level JSON array without loading it whole.
+
+    A top-level value of any other type is yielded as a single item; an
+    empty document yields nothing.
+    """
+    stream = JsonStream(fh, chunk_chars)
+    ch = stream._next_char()
+    if not ch:
+        return
+    if ch == "[":
+        yield from stream.iter_array()
+    else:
+        yield stream.decode_value()
+    stream.expect_end()
@@ -0,0 +1,274 @@
+"""
+Module: parallel_scan.py
+Project: MW-Vision | MindWareHouse
+Author: Claudia CLI (AI Field Commander)
+Date: 2026-02-25
+Purpose: Concurrent directory scanning for Claude and Gemini exports.
+         Files are read in an I/O thread pool and decoded in a process
+         pool, with results yielded as they complete under a cap on the
+         bytes held in flight.
+Dependencies: concurrent.futures, threading, pathlib
+Integration Points: compression.py, export_claude.py, export_gemini.py,
+                    consolidator.py
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
+from pathlib import Path
+
+from compression import find_inputs
+from export_claude import ConversationExport, parse_jsonl_bytes
+from export_gemini import parse_gemini_bytes
+
+logger = logging.getLogger("mw.export.parallel")
+
+# Why: (file suffix, decoder) per export kind; decoders are top-level
+# functions so they can be pickled into worker processes, and they
+# decompress archived inputs there as well
+SCAN_KINDS: dict[str, tuple[str, Callable[[bytes, Path], ConversationExport]]] = {
+    "claude": (".jsonl", parse_jsonl_bytes),
+    "gemini": (".json", parse_gemini_bytes),
+}
+
+DEFAULT_MAX_INFLIGHT_BYTES = 256 * 1024 * 1024
+
+
+@dataclass
+class ScanResult:
+    """Outcome of scanning a single file."""
+
+    path: Path
+    export: ConversationExport | None = None
+    error: str = ""
+    size_bytes: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.export is not None
+
+
+@dataclass
+class ScanStats:
+    """Throughput of a parallel scan."""
+
+    files: int = 0
+    failed: int = 0
+    bytes_read: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def files_per_s(self) -> float:
+        return self.files / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        if self.elapsed_s <= 0:
+            return 0.0
+        return self.bytes_read / (1024 * 1024) / self.elapsed_s
+
+
+class _ByteBudget:
+    """Blocks readers while too many bytes are held in flight."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self.closed = False
+        self._cond = threading.Condition()
+
+    def acquire(self, amount: int) -> None:
+        with self._cond:
+            # Why: a single file larger than the cap may still proceed
+            # once nothing else is in flight
+            while (
+                not self.closed
+                and self.used > 0
+                and self.used + amount > self.limit
+            ):
+                self._cond.wait()
+            if self.closed:
+                raise RuntimeError("scan cancelled")
+            self.used += amount
+
+    def release(self, amount: int) -> None:
+        with self._cond:
+            self.used -= amount
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+def _read_file(path: Path, budget: _ByteBudget) -> tuple[bytes, int]:
+    """Read a file once its size fits in the in-flight budget."""
+    size = path.stat().st_size
+    budget.acquire(size)
+    try:
+        return path.read_bytes(), size
+    except BaseException:
+        budget.release(size)
+        raise
+
+
+def scan_parallel(
+    directory: Path,
+    kind: str = "claude",
+    io_workers: int = 16,
+    decode_workers: int | None = None,
+    max_inflight_bytes: int = DEFAULT_MAX_INFLIGHT_BYTES,
+    stats: ScanStats | None = None,
+) -> Iterator[ScanResult]:
+    """
+    Scan a directory concurrently, yielding results as they complete.
+
+    Args:
+        directory: Directory to scan.
+        kind: "claude" (*.jsonl) or "gemini" (*.json), each optionally
+            compressed.
+        io_workers: Threads used for file reads.
+        decode_workers: Processes used for JSON decoding; None uses the
+            CPU count, 0 decodes in a thread pool instead.
+        max_inflight_bytes: Cap on bytes read but not yet decoded
+            (on-disk size, i.e. before decompression).
+        stats: Optional ScanStats updated in place with throughput.
+
+    Yields:
+        ScanResult per file, in completion order. Failures are reported
+        as results with error set and never abort the scan.
+    """
+    if kind not in SCAN_KINDS:
+        raise ValueError(f"kind must be one of {sorted(SCAN_KINDS)}, got {kind!r}")
+    if io_workers < 1:
+        raise ValueError(f"io_workers must be >= 1, got {io_workers}")
+    if max_inflight_bytes < 1:
+        raise ValueError(
+            f"max_inflight_bytes must be >= 1, got {max_inflight_bytes}"
+        )
+
+    suffix, decoder = SCAN_KINDS[kind]
+    files = find_inputs(directory, suffix)
+    stats = stats if stats is not None else ScanStats()
+    budget = _ByteBudget(max_inflight_bytes)
+    started = time.perf_counter()
+
+    if decode_workers is None:
+        decode_workers = os.cpu_count() or 1
+
+    io_pool = ThreadPoolExecutor(
+        max_workers=io_workers, thread_name_prefix="mw-scan-io"
+    )
+    # Why: decoding never shares the I/O pool, otherwise readers blocked
+    # on the budget could starve the decodes that would release it
+    decode_pool: Executor = (
+        ProcessPoolExecutor(max_workers=decode_workers)
+        if decode_workers > 0
+        else ThreadPoolExecutor(
+            max_workers=io_workers, thread_name_prefix="mw-scan-decode"
+        )
+    )
+
+    pending_files = iter(files)
+    reads: dict[Future, Path] = {}
+    decodes: dict[Future, tuple[Path, int]] = {}
+    # Why: bound queued reads so each wait() only inspects a small window
+    max_queued_reads = io_workers * 2
+
+    try:
+        while True:
+            for path in pending_files:
+                reads[io_pool.submit(_read_file, path, budget)] = path
+                if len(reads) >= max_queued_reads:
+                    break
+            if not reads and not decodes:
+                break
+            done, _ = wait(
+                list(reads) + list(decodes), return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                if future in reads:
+                    path = reads.pop(future)
+                    try:
+                        data, size = future.result()
+                    except Exception as exc:
+                        stats.files += 1
+                        stats.failed += 1
+                        logger.warning("Skipping %s: %s", path, exc)
+                        yield ScanResult(path=path, error=str(exc))
+                        continue
+                    decodes[decode_pool.submit(decoder, data, path)] = (
+                        path,
+                        size,
+                    )
+                    del data
+                else:
+                    path, size = decodes.pop(future)
+                    budget.release(size)
+                    stats.files += 1
+                    stats.bytes_read += size
+                    stats.elapsed_s = time.perf_counter() - started
+                    try:
+                        export = future.result()
+                    except Exception as exc:
+                        stats.failed += 1
+                        logger.warning("Skipping %s: %s", path, exc)
+                        yield ScanResult(
+                            path=path, error=str(exc), size_bytes=size
+                        )
+                        continue
+                    yield ScanResult(path=path, export=export, size_bytes=size)
+    finally:
+        # Why: unblock readers waiting on the budget if the caller
+        # stopped consuming early
+        budget.close()
+        for future in list(reads) + list(decodes):
+            future.cancel()
+        io_pool.shutdown(wait=True, cancel_futures=True)
+        decode_pool.shutdown(wait=True, cancel_futures=True)
+        stats.elapsed_s = time.perf_counter() - started
+        logger.info(
+            "Scanned %d %s files (%d failed) in %.2fs: %.1f files/s, %.2f MB/s",
+            stats.files,
+            kind,
+            stats.failed,
+            stats.elapsed_s,
+            stats.files_per_s,
+            stats.mb_per_s,
+        )
+
+
+def scan_exports_parallel(
+    directory: Path,
+    kind: str = "claude",
+    **kwargs,
+) -> list[ConversationExport]:
+    """
+    Parallel counterpart of scan_claude_transcripts/scan_gemini_exports.
+
+    Args:
+        directory: Directory to scan.
+        kind: "claude" or "gemini".
+        **kwargs: Passed through to scan_parallel.
+
+    Returns:
+        Successfully parsed ConversationExports, ordered by file name so
+        downstream deduplication stays deterministic.
+    """
+    results = [r for r in scan_parallel(directory, kind, **kwargs) if r.ok]
+    results.sort(key=lambda r: r.path.name)
+    return [r.export for r in results]
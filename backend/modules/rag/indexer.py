@@ -14,6 +14,8 @@ from __future__ import annotations
 
 import json
 import logging
+import sys
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from pathlib import Path
@@ -24,7 +26,12 @@ logger = logging.getLogger("mw.rag.indexer")
 INDEX_DIR = Path(__file__).parent.parent.parent / "data" / "rag_index"
 
 
-@dataclass
+def _intern(value: Any) -> Any:
+    """Intern repeated metadata strings."""
+    return sys.intern(value) if type(value) is str else value
+
+
+@dataclass(slots=True)
 class IndexedChunk:
     """A chunk stored in the index."""
 
@@ -33,7 +40,13 @@ class IndexedChunk:
     source: str = ""
     conversation_id: str = ""
     title: str = ""
-    embedding: list[float] = field(default_factory=list)
+    embedding: Sequence[float] = ()
+
+    def __post_init__(self) -> None:
+        # Why: chunks of one conversation repeat these strings
+        self.source = _intern(self.source)
+        self.conversation_id = _intern(self.conversation_id)
+        self.title = _intern(self.title)
 
 
 @dataclass
@@ -68,6 +81,7 @@ class KnowledgeIndexer:
         self.index_dir = index_dir or INDEX_DIR
         self.embedding_dim = embedding_dim
         self.chunks: list[IndexedChunk] = []
+        self._next_id = 0
         self._faiss_index = None
         self._use_faiss = False
 
@@ -91,6 +105,9 @@ class KnowledgeIndexer:
         """
         Add knowledge chunks to the index.
 
+        Embeddings are computed for the whole batch at once and added
+        to FAISS in a single call.
+
         Args:
             chunks: List of chunk dicts from consolidator.
             compute_embeddings: Whether to compute embeddings.
@@ -98,32 +115,144 @@ class KnowledgeIndexer:
         Returns:
             Number of chunks added.
         """
-        added = 0
+        pending: list[IndexedChunk] = []
 
         for chunk_data in chunks:
-            chunk = IndexedChunk(
-                chunk_id=len(self.chunks),
-                text=chunk_data.get("text", ""),
-                source=chunk_data.get("source", ""),
-                conversation_id=chunk_data.get(
-                    "conversation_id", ""
-                ),
-                title=chunk_data.get("title", ""),
+            text = chunk_data.get("text", "")
+            if not text:
+                continue
+
+            pending.append(
+                IndexedChunk(
+                    chunk_id=self._next_id,
+                    text=text,
+                    source=chunk_data.get("source", ""),
+                    conversation_id=chunk_data.get(
+                        "conversation_id", ""
+                    ),
+                    title=chunk_data.get("title", ""),
+                )
             )
+            self._next_id += 1
 
-            if not chunk.text:
-                continue
+        if pending and compute_embeddings and self._use_faiss:
+            embeddings = self._compute_embeddings(
+                [c.text for c in pending]
+            )
+            for chunk, embedding in zip(pending, embeddings, strict=True):
+                chunk.embedding = embedding
+            self._add_to_faiss_batch(embeddings)
+
+        self.chunks.extend(pending)
+        logger.info("Added %d chunks to index", len(pending))
+        return len(pending)
+
+    def remove_conversations(self, conversation_ids: set[str]) -> int:
+        """
+        Remove every chunk of the given conversations.
 
-            if compute_embeddings and self._use_faiss:
-                embedding = self._compute_embedding(chunk.text)
+        Args:
+            conversation_ids: Conversations to drop from the index.
+
+        Returns:
+            Number of chunks removed.
+        """
+        positions = [
+            i for i, c in enumerate(self.chunks)
+            if c.conversation_id in conversation_ids
+        ]
+        if not positions:
+            return 0
+
+        # Why: IndexFlat.remove_ids compacts in order, so FAISS rows stay
+        # aligned with self.chunks positions
+        in_sync = self._faiss_in_sync()
+        if in_sync and self._use_faiss and self._faiss_index is not None:
+            import numpy as np
+
+            self._faiss_index.remove_ids(
+                np.array(positions, dtype=np.int64)
+            )
+
+        self.chunks = [
+            c for c in self.chunks
+            if c.conversation_id not in conversation_ids
+        ]
+        if not in_sync:
+            self._rebuild_faiss()
+        return len(positions)
+
+    def upsert_conversations(
+        self,
+        chunks: list[dict[str, Any]],
+        conversation_ids: set[str] | None = None,
+    ) -> tuple[int, int]:
+        """
+        Replace the chunks of the conversations present in `chunks`.
+
+        Args:
+            chunks: Chunk dicts, grouped by conversation_id.
+            conversation_ids: Conversations to clear even if they have
+                no chunks now (e.g. emptied). Defaults to those in
+                `chunks`.
+
+        Returns:
+            (chunks removed, chunks added).
+        """
+        ids = set(conversation_ids or ())
+        ids.update(c.get("conversation_id", "") for c in chunks)
+        ids.discard("")
+        removed = self.remove_conversations(ids)
+        added = self.add_chunks(chunks)
+        return removed, added
+
+    def _faiss_in_sync(self) -> bool:
+        """Whether FAISS holds exactly one row per chunk (or is unused)."""
+        if not self._use_faiss or self._faiss_index is None:
+            return True
+        if self._faiss_index.ntotal == len(self.chunks):
+            return True
+        logger.warning(
+            "FAISS index out of sync with chunks (%d vs %d); rebuilding",
+            self._faiss_index.ntotal,
+            len(self.chunks),
+        )
+        return False
+
+    def _rebuild_faiss(self) -> None:
+        """
+        Re-create the FAISS index from self.chunks.
+
+        chunks.json does not keep embeddings, so chunks loaded from disk
+        are embedded again.
+        """
+        import faiss
+        import numpy as np
+
+        missing = [c for c in self.chunks if not len(c.embedding)]
+        if missing:
+            embeddings = self._compute_embeddings([c.text for c in missing])
+            for chunk, embedding in zip(missing, embeddings, strict=True):
                 chunk.embedding = embedding
-                self._add_to_faiss(embedding)
+        index = faiss.IndexFlatL2(self.embedding_dim)
+        if self.chunks:
+            index.add(
+                np.array([c.embedding for c in self.chunks], dtype=np.float32)
+            )
+        self._faiss_index = index
 
-            self.chunks.append(chunk)
-            added += 1
+    def _compute_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """Compute embeddings for a batch of texts in one model call."""
+        try:
+            from sentence_transformers import SentenceTransformer
 
-        logger.info("Added %d chunks to index", added)
-        return added
+            if not hasattr(self, "_model"):
+                self._model = SentenceTransformer(
+                    "all-MiniLM-L6-v2"
+                )
+            return self._model.encode(texts).tolist()
+        except ImportError:
+            return [self._simple_embedding(t) for t in texts]
 
     def _compute_embedding(self, text: str) -> list[float]:
         """
@@ -181,6 +310,13 @@ class KnowledgeIndexer:
             vec = np.array([embedding], dtype=np.float32)
             self._faiss_index.add(vec)
 
+    def _add_to_faiss_batch(self, embeddings: list[list[float]]) -> None:
+        """Add a batch of embeddings to the FAISS index."""
+        if self._faiss_index is not None and embeddings:
+            import numpy as np
+
+            self._faiss_index.add(np.array(embeddings, dtype=np.float32))
+
     def save(self) -> Path:
         """
         Save the index to disk.
@@ -202,19 +338,24 @@ class KnowledgeIndexer:
             }
             for c in self.chunks
         ]
-        chunks_path.write_text(
+        # Why: write then rename, so a crash mid-save keeps the old index
+        tmp_path = chunks_path.with_suffix(".json.tmp")
+        tmp_path.write_text(
             json.dumps(chunks_data, ensure_ascii=False),
             encoding="utf-8",
         )
+        tmp_path.replace(chunks_path)
 
         # Why: save FAISS index if available
         if self._use_faiss and self._faiss_index is not None:
             import faiss
 
             faiss_path = self.index_dir / "faiss.index"
+            tmp_path = faiss_path.with_suffix(".index.tmp")
             faiss.write_index(
-                self._faiss_index, str(faiss_path)
+                self._faiss_index, str(tmp_path)
             )
+            tmp_path.replace(faiss_path)
 
         # Why: save metadata
         stats = self.get_stats()
@@ -257,6 +398,9 @@ class KnowledgeIndexer:
             self.chunks = [
                 IndexedChunk(**c) for c in chunks_data
             ]
+            self._next_id = max(
+                (c.chunk_id for c in self.chunks), default=-1
+            ) + 1
 
             # Why: reload FAISS index
             faiss_path = self.index_dir / "faiss.index"
@@ -266,6 +410,10 @@ class KnowledgeIndexer:
                 self._faiss_index = faiss.read_index(
                     str(faiss_path)
                 )
+            # Why: a crash between the chunks.json and faiss.index
+            # renames leaves them out of step
+            if not self._faiss_in_sync():
+                self._rebuild_faiss()
 
             logger.info(
                 "Index loaded: %d chunks", len(self.chunks)
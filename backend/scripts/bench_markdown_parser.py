@@ -0,0 +1,106 @@
+"""
+MW-Vision markdown transcript parser benchmark
+Compares the legacy DOTALL/lookahead regex parser with the single-pass
+line scanner behind _parse_markdown_generic on large pasted transcripts
+in the three supported formats, and checks both extract the same
+messages.
+
+Run with: python scripts/bench_markdown_parser.py --megabytes 4
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.chat_processor.platforms import _parse_markdown_generic  # noqa: E402
+
+LEGACY_PATTERNS = [
+    r"(?:^|\n)##\s*(User|Human|You|Assistant|AI|Claude|Gemini|GPT|DeepSeek|Perplexity):\s*\n(.*?)(?=\n##\s|\Z)",
+    r"(?:^|\n)\*\*(User|Human|You|Assistant|AI|Claude|Gemini|GPT|DeepSeek):\*\*\s*\n(.*?)(?=\n\*\*|\Z)",
+    r"(?:^|\n)(Human|User|Assistant|AI):\s*\n(.*?)(?=\n(?:Human|User|Assistant|AI):|\Z)",
+]
+
+HEADERS = {
+    "heading": ("## User:", "## Assistant:"),
+    "bold": ("**User:**", "**Claude:**"),
+    "plain": ("Human:", "Assistant:"),
+}
+
+WORDS = ["docker", "compose", "network", "python", "asyncio", "the", "a",
+         "deploy", "config", "value", "error", "retry", "user", "you"]
+
+
+def legacy_parse(content: str):
+    """The pre-rewrite algorithm: three DOTALL regexes compiled per call."""
+    for pattern in LEGACY_PATTERNS:
+        matches = list(re.finditer(pattern, content, re.IGNORECASE | re.DOTALL))
+        if matches:
+            out = []
+            for m in matches:
+                speaker = m.group(1).strip().lower()
+                text = m.group(2).strip()
+                if text:
+                    role = "user" if speaker in ("user", "human", "you") else "assistant"
+                    out.append((role, text))
+            return out
+    return []
+
+
+def make_transcript(fmt: str, megabytes: float, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    user, assistant = HEADERS[fmt]
+    parts = []
+    size = 0
+    target = int(megabytes * 1024 * 1024)
+    turn = 0
+    while size < target:
+        header = user if turn % 2 == 0 else assistant
+        lines = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 16)))
+            for _ in range(rng.randint(1, 40))
+        ]
+        if rng.random() < 0.2:
+            lines.insert(rng.randint(0, len(lines)), "```python\nprint('hi')\n```")
+        block = header + "\n" + "\n".join(lines) + "\n"
+        parts.append(block)
+        size += len(block)
+        turn += 1
+    return "\n".join(parts)
+
+
+def timed(fn, content):
+    start = time.perf_counter()
+    result = fn(content)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--megabytes", type=float, default=4.0)
+    args = parser.parse_args()
+
+    for fmt in HEADERS:
+        content = make_transcript(fmt, args.megabytes)
+        legacy, legacy_s = timed(legacy_parse, content)
+        current, current_s = timed(
+            lambda c: [
+                (m.role, m.content)
+                for m in _parse_markdown_generic(c, "unknown").messages
+            ],
+            content,
+        )
+        same = "same output" if legacy == current else "OUTPUT DIFFERS"
+        print(
+            f"{fmt:8s} {args.megabytes:.1f} MB, {len(current):6d} msgs: "
+            f"legacy {legacy_s:6.3f}s  scanner {current_s:6.3f}s  "
+            f"({legacy_s / current_s:4.1f}x, {same})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+MW-Vision message memory benchmark
+Compares the legacy dict-backed message dataclasses with the slotted,
+interned ConversationMessage/ConversationExport used by the exporters.
+
+Run with: python scripts/bench_message_memory.py --messages 1000000
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "modules" / "chat_processors"))
+
+from export_claude import ConversationExport, ConversationMessage  # noqa: E402
+
+
+@dataclass
+class LegacyMessage:
+    role: str
+    content: str
+    timestamp: str = ""
+    model: str = ""
+    tool_calls: list = field(default_factory=list)
+    token_count: int = 0
+
+
+@dataclass
+class LegacyExport:
+    source: str = "claude"
+    conversation_id: str = ""
+    title: str = ""
+    timestamp: str = ""
+    messages: list = field(default_factory=list)
+    total_tokens: int = 0
+    model: str = ""
+    tags: list = field(default_factory=list)
+
+
+def _decoded(text: str) -> str:
+    # Why: strings coming out of json.loads are fresh objects, not the
+    # interned literals the interpreter would otherwise share
+    return "".join(list(text))
+
+
+def build(message_cls, export_cls, total: int, per_conversation: int) -> list:
+    exports = []
+    for conv in range(total // per_conversation):
+        export = export_cls(
+            source=_decoded("claude_code"),
+            conversation_id=f"conv-{conv}",
+            model=_decoded("claude-sonnet-4"),
+        )
+        for i in range(per_conversation):
+            export.messages.append(
+                message_cls(
+                    role=_decoded("human" if i % 2 == 0 else "assistant"),
+                    content=f"message {conv}:{i}",
+                    model=_decoded("claude-sonnet-4"),
+                )
+            )
+        exports.append(export)
+    return exports
+
+
+def measure(message_cls, export_cls, total: int, per_conversation: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    exports = build(message_cls, export_cls, total, per_conversation)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del exports
+    gc.collect()
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--per-conversation", type=int, default=200)
+    args = parser.parse_args()
+
+    legacy = measure(LegacyMessage, LegacyExport, args.messages, args.per_conversation)
+    slotted = measure(
+        ConversationMessage, ConversationExport, args.messages, args.per_conversation
+    )
+
+    mib = 1024 * 1024
+    print(f"messages:  {args.messages:,}")
+    print(f"legacy:    {legacy / mib:8.1f} MiB ({legacy / args.messages:.0f} B/msg)")
+    print(f"slotted:   {slotted / mib:8.1f} MiB ({slotted / args.messages:.0f} B/msg)")
+    print(f"saved:     {(legacy - slotted) / mib:8.1f} MiB ({1 - slotted / legacy:.0%})")
+
+
+if __name__ == "__main__":
+    main()
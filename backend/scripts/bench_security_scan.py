@@ -0,0 +1,87 @@
+"""
+MW-Vision security scan benchmark
+Compares the legacy per-pattern scan (every pattern run through the re
+cache over every message) with the literal-prefiltered scanner on large
+pasted logs.
+
+Run with: python scripts/bench_security_scan.py --megabytes 8
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.chat_processor.models import ParsedMessage  # noqa: E402
+from modules.chat_processor.security import (  # noqa: E402
+    _PII_PATTERNS,
+    _SECRET_PATTERNS,
+    scan_messages,
+)
+
+
+def legacy_scan(messages):
+    """The pre-rewrite algorithm: every pattern over every message."""
+    detected = set()
+    findings = []
+    for i, msg in enumerate(messages):
+        for name, pattern in _SECRET_PATTERNS.items():
+            for match in re.finditer(pattern, msg.content, re.IGNORECASE):
+                if match.group(0) not in detected:
+                    detected.add(match.group(0))
+                    findings.append((i, name))
+        for name, pattern in _PII_PATTERNS.items():
+            if re.search(pattern, msg.content, re.IGNORECASE):
+                findings.append((i, name))
+    return findings
+
+
+def make_log(megabytes: float, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    lines = []
+    size = 0
+    target = int(megabytes * 1024 * 1024)
+    while size < target:
+        line = (
+            f"2026-02-25T10:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d} "
+            f"INFO worker-{rng.randint(1, 32)} request_id={rng.getrandbits(64):x} "
+            f"path=/api/v1/items/{rng.randint(1, 10**6)} status=200 took={rng.random():.3f}s"
+        )
+        if rng.random() < 0.001:
+            line += " AKIA" + "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789") for _ in range(16))
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--megabytes", type=float, default=8.0)
+    parser.add_argument("--messages", type=int, default=4)
+    args = parser.parse_args()
+
+    messages = [
+        ParsedMessage(role="user", content=make_log(args.megabytes / args.messages, seed=i))
+        for i in range(args.messages)
+    ]
+
+    start = time.perf_counter()
+    legacy = legacy_scan(messages)
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    current = scan_messages(messages)
+    current_s = time.perf_counter() - start
+
+    print(f"input:     {args.megabytes:.1f} MB in {args.messages} messages")
+    print(f"legacy:    {legacy_s:6.2f}s ({len(legacy)} findings)")
+    print(f"current:   {current_s:6.2f}s ({len(current)} findings)")
+    print(f"speedup:   {legacy_s / current_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
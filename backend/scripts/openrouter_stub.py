@@ -0,0 +1,112 @@
+"""
+MW-Vision OpenRouter stub
+Local stand-in for the OpenRouter chat completions API, for exercising
+the chat processor analyzer without network access or API credits.
+Answers POST /chat/completions (with or without the /api/v1 prefix)
+with a canned analysis after an optional delay, and can inject
+retryable failures.
+
+Run with: python scripts/openrouter_stub.py --port 8787 --delay 2 --fail-rate 0.2
+Then start the backend with:
+    OPENROUTER_BASE_URL=http://127.0.0.1:8787 OPENROUTER_API_KEY=stub
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_ANALYSIS = {
+    "summary": "Stub analysis of the conversation.",
+    "main_topics": ["stub"],
+    "technologies_mentioned": ["Python"],
+    "decisions_made": [],
+    "code_artifacts": [],
+    "knowledge_extracted": ["Generated by openrouter_stub.py"],
+    "osint_relevance": "none",
+    "content_type": "GENERIC",
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    delay_s = 0.0
+    fail_rate = 0.0
+    requests_served = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        if self.path.rstrip("/") not in ("/chat/completions", "/api/v1/chat/completions"):
+            self._reply(404, {"error": {"message": "not found"}})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._reply(400, {"error": {"message": "invalid JSON"}})
+            return
+
+        with StubHandler.lock:
+            StubHandler.requests_served += 1
+        time.sleep(self.delay_s)
+        if random.random() < self.fail_rate:
+            status = random.choice((429, 503))
+            self._reply(status, {"error": {"message": "injected failure"}}, retry_after="0.1")
+            return
+
+        # Why: roughly 4 characters per token, enough to exercise accounting
+        prompt_chars = sum(len(m.get("content") or "") for m in body.get("messages", []))
+        prompt_tokens = prompt_chars // 4 + 1
+        completion_tokens = len(json.dumps(CANNED_ANALYSIS)) // 4 + 1
+        self._reply(200, {
+            "id": f"stub-{StubHandler.requests_served}",
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(CANNED_ANALYSIS)},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    def _reply(self, status: int, payload: dict, retry_after: str = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if retry_after:
+            self.send_header("Retry-After", retry_after)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds per response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of 429/503 replies")
+    args = parser.parse_args()
+
+    StubHandler.delay_s = args.delay
+    StubHandler.fail_rate = args.fail_rate
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"OpenRouter stub listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Tests for tail-following Claude Code transcripts (export_claude.py)."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "modules" / "chat_processors"))
+
+from export_claude import TranscriptFollower  # noqa: E402
+
+
+def _line(role: str, text: str) -> str:
+    return json.dumps({"role": role, "content": text}) + "\n"
+
+
+def test_follow_survives_idle_polls(tmp_path: Path) -> None:
+    transcript = tmp_path / "session.jsonl"
+    transcript.write_text(_line("human", "hello"), encoding="utf-8")
+    polls = []
+
+    def should_stop() -> bool:
+        polls.append(None)
+        # Why: the second and third polls find nothing new and must sleep
+        return len(polls) > 3
+
+    follower = TranscriptFollower()
+    events = list(follower.follow(tmp_path, interval=0.01, should_stop=should_stop))
+
+    assert len(polls) == 4
+    assert [e.message.content for e in events] == ["hello"]
+
+
+def test_poll_skips_compressed_transcripts(tmp_path: Path, caplog) -> None:
+    import gzip
+
+    (tmp_path / "old.jsonl.gz").write_bytes(
+        gzip.compress(_line("human", "archived").encode("utf-8"))
+    )
+    (tmp_path / "live.jsonl").write_text(_line("human", "live"), encoding="utf-8")
+
+    follower = TranscriptFollower()
+    events = follower.poll(tmp_path)
+    assert follower.poll_file(tmp_path / "old.jsonl.gz") == []
+
+    assert [e.message.content for e in events] == ["live"]
+    assert "malformed" not in caplog.text
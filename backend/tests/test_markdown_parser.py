@@ -0,0 +1,53 @@
+"""Tests for splitting pasted Markdown transcripts (chat_processor/platforms.py)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.chat_processor.platforms import (  # noqa: E402
+    _parse_markdown_generic,
+    parse_conversation,
+)
+
+
+def _messages(content: str):
+    return [
+        (m.role, m.content)
+        for m in _parse_markdown_generic(content, "unknown").messages
+    ]
+
+
+def test_reply_may_open_with_a_terminator_line() -> None:
+    heading = "## User:\nhow do I deploy?\n## Assistant:\n## Overview\nUse compose.\n"
+    bold = "**User:**\nhow do I deploy?\n**Claude:**\n\n**Short answer:** compose\n"
+
+    assert _messages(heading) == [
+        ("user", "how do I deploy?"),
+        ("assistant", "## Overview\nUse compose."),
+    ]
+    assert _messages(bold) == [
+        ("user", "how do I deploy?"),
+        ("assistant", "**Short answer:** compose"),
+    ]
+
+
+def test_speaker_header_on_first_body_line_ends_the_message() -> None:
+    content = "**User:**\n**Claude:**\nhello\n**User:**\nthanks\n"
+
+    assert _messages(content) == [("assistant", "hello"), ("user", "thanks")]
+
+
+def test_paste_mentioning_a_platform_is_parsed_as_markdown() -> None:
+    content = "## User:\nIs ChatGPT or DeepSeek better at SQL?\n## Assistant:\nBoth work.\n"
+
+    conversation = parse_conversation(content)
+    from_url = parse_conversation(content, source_url="https://chatgpt.com/c/1")
+
+    assert conversation.platform == "unknown"
+    assert [m.content for m in conversation.messages] == [
+        "Is ChatGPT or DeepSeek better at SQL?",
+        "Both work.",
+    ]
+    assert from_url.platform == "chatgpt"
+    assert len(from_url.messages) == 2